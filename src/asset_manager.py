@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUNDS_DIR = os.path.join(BASE_DIR, "sounds")
+
+# Aset yang dimuat di latar belakang selama main menu
+PRELOAD_IMAGES = [
+    ("foto-1.png", (80, 80)),
+    ("foto-2.png", (80, 80)),
+    ("foto-3.png", (80, 80)),
+]
+# *** BARU: Manifest sfx: nama yang dipakai play_sfx() -> file di folder sounds ***
+SFX_MANIFEST = {
+    "click": "click.wav",
+    "error": "error.wav",
+    "build": "build.wav",
+    "coin": "coin.wav",
+    "happy": "happy.wav",
+    "levelup": "levelup.wav",
+    "quest_complete": "quest_complete.wav",
+}
+PRELOAD_SOUNDS = list(SFX_MANIFEST.values())
+PRELOAD_MUSIC = ["bgm_menu.mp3", "bgm_gameplay.mp3"]
+
+
+class AssetManager:
+    """
+    Cache gambar, efek suara dan musik bersama.
+    start_preload() memuat dari disk di thread latar belakang; get_*() melayani
+    dari memori dan hanya menunggu/memuat sinkron jika aset belum siap.
+    """
+
+    def __init__(self, base_dir=BASE_DIR, sounds_dir=SOUNDS_DIR):
+        self.base_dir = base_dir
+        self.sounds_dir = sounds_dir
+        self._cache = {}
+        self._pending = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._converted = {}
+
+        # Statistik untuk mengukur latensi
+        self.load_times = {}
+        self.sync_loads = 0
+        self.preload_started = None
+        self.preload_finished = None
+
+    # ================= PRELOAD =================
+    def start_preload(self, images=PRELOAD_IMAGES, sounds=PRELOAD_SOUNDS, music=PRELOAD_MUSIC):
+        if self._thread is not None:
+            return
+        # Musik menu dibutuhkan paling awal, gambar customer baru saat game dimulai
+        jobs = [("music", filename, None) for filename in music]
+        # Sound butuh mixer yang sudah di-init
+        if pygame.mixer.get_init():
+            jobs += [("sound", filename, None) for filename in sounds]
+        jobs += [("image", filename, size) for filename, size in images]
+
+        with self._cond:
+            self._pending.update(jobs)
+        self.preload_started = time.perf_counter()
+        self._thread = threading.Thread(target=self._preload, args=(jobs,), name="asset-preload", daemon=True)
+        self._thread.start()
+
+    def _preload(self, jobs):
+        for key in jobs:
+            value = self._load(key)
+            with self._cond:
+                self._cache[key] = value
+                self._pending.discard(key)
+                self._cond.notify_all()
+        self.preload_finished = time.perf_counter()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_ready(self):
+        with self._cond:
+            return not self._pending
+
+    # ================= LOADING =================
+    def _load(self, key):
+        kind, filename, size = key
+        started = time.perf_counter()
+        value = None
+        try:
+            if kind == "image":
+                image = pygame.image.load(os.path.join(self.base_dir, filename))
+                if size is not None and image.get_bitsize() in (24, 32):
+                    image = pygame.transform.smoothscale(image, size)
+                value = image
+            elif kind == "sound":
+                # Sound() langsung men-decode ke buffer PCM di memori
+                path = os.path.join(self.sounds_dir, filename)
+                if os.path.exists(path):
+                    value = pygame.mixer.Sound(path)
+                else:
+                    print(f"⚠ Sound file not found: {filename}")
+            elif kind == "music":
+                path = os.path.join(self.sounds_dir, filename)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        value = f.read()
+        except Exception as e:
+            print(f"✗ Error loading asset {filename}: {e}")
+        self.load_times[key] = time.perf_counter() - started
+        return value
+
+    def _get(self, key):
+        with self._cond:
+            while key in self._pending:
+                self._cond.wait()
+            if key in self._cache:
+                return self._cache[key]
+        # Tidak ada di manifest preload: muat sinkron sekali lalu simpan
+        value = self._load(key)
+        self.sync_loads += 1
+        with self._cond:
+            self._cache[key] = value
+        return value
+
+    # ================= API =================
+    def get_image(self, filename, size=None):
+        """ Surface siap pakai (convert_alpha di thread utama), None jika gagal dimuat """
+        key = ("image", filename, size)
+        image = self._converted.get(key)
+        if image is None:
+            image = self._get(key)
+            if image is None:
+                return None
+            image = image.convert_alpha()
+            if size is not None and image.get_size() != size:
+                image = pygame.transform.smoothscale(image, size)
+            self._converted[key] = image
+        return image
+
+    def get_sound(self, filename):
+        return self._get(("sound", filename, None))
+
+    def get_music(self, filename):
+        """ Isi file musik (bytes) untuk pygame.mixer.music.load, None jika tidak ada """
+        return self._get(("music", filename, None))
+
+    def report(self):
+        preload = None
+        if self.preload_started is not None and self.preload_finished is not None:
+            preload = self.preload_finished - self.preload_started
+        return {
+            "preload_seconds": preload,
+            "sync_loads": self.sync_loads,
+            "slowest": sorted(((t, key[1]) for key, t in self.load_times.items()), reverse=True)[:5],
+        }
+
+
+# Satu instance bersama untuk seluruh game
+assets = AssetManager()
@@ -0,0 +1,464 @@
+"""
+Micro-benchmark untuk sistem-sistem performa game.
+
+Jalankan dari folder src:
+    python benchmark.py pool
+    python benchmark.py render
+    python benchmark.py assets
+    python benchmark.py audio
+    python benchmark.py lod
+    python benchmark.py demand
+    python benchmark.py influence
+    python benchmark.py zoom
+    python benchmark.py pan
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Benchmark berjalan tanpa jendela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from customer import Customer, CustomerPool, CustomerState
+from shop import Shop, ShopType, SHOP_TEMPLATES
+from decoration import Decoration, DecorationType
+from render_queue import RenderQueue
+from demand_model import DemandModel
+from influence_map import InfluenceMap, INFLUENCE_KERNEL
+import influence_map
+from sound_manager import SoundManager
+import asset_manager
+import customer as customer_module
+import game_clock
+
+
+class _DictCustomer:
+    """ Representasi lama (berbasis __dict__) sebagai pembanding ukuran memori """
+    pass
+
+
+def _measure_alloc(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    items = [factory() for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / count
+
+
+def _measure_gc(workload):
+    """ Waktu total workload, jeda tiap koleksi GC, dan jumlah koleksi per generasi (dari gc.get_stats()) """
+    pauses = []
+    started = {}
+
+    def callback(phase, info):
+        if phase == "start":
+            started["t"] = time.perf_counter()
+        elif "t" in started:
+            pauses.append(time.perf_counter() - started.pop("t"))
+
+    gc.collect()
+    before = [stats["collections"] for stats in gc.get_stats()]
+    gc.callbacks.append(callback)
+    try:
+        t0 = time.perf_counter()
+        workload()
+        total = time.perf_counter() - t0
+    finally:
+        gc.callbacks.remove(callback)
+    collections = [stats["collections"] - count for stats, count in zip(gc.get_stats(), before)]
+    return total, pauses, collections
+
+
+def bench_pool(count=10000, frames=20000):
+    Customer.images_loaded = True  # Lewati load gambar, yang diukur hanya objeknya
+    shop = Shop(ShopType.FOOD, 0, 0)
+
+    def make_dict_customer():
+        reference = Customer(shop, 400, 185)
+        obj = _DictCustomer()
+        for name in Customer.__slots__:
+            setattr(obj, name, getattr(reference, name))
+        return obj
+
+    dict_bytes = _measure_alloc(make_dict_customer, count)
+    slot_bytes = _measure_alloc(lambda: Customer(shop, 400, 185), count)
+    print(f"Memori per customer : __slots__ {slot_bytes:.0f} B, __dict__ {dict_bytes:.0f} B")
+
+    # Populasi hidup yang besar (seperti mall ramai) membuat tiap koleksi GC mahal;
+    # gelombang customer datang lalu pergi bersamaan, melewati ambang gen0 (700)
+    resident = [Customer(shop, 400, 185) for _ in range(count)]
+    wave = 1000
+    waves = frames // wave
+
+    def without_pool():
+        for _ in range(waves):
+            customers = [Customer(shop, 400, 185) for _ in range(wave)]
+            del customers
+
+    def with_pool():
+        pool = CustomerPool(max_size=wave)
+        for _ in range(waves):
+            customers = [pool.acquire(shop, 400, 185) for _ in range(wave)]
+            for customer in customers:
+                pool.release(customer)
+
+    print(f"Churn: {waves} gelombang x {wave} customer, {len(resident)} customer tetap hidup, "
+          f"ambang GC {gc.get_threshold()}")
+    for label, workload in (("Tanpa pool", without_pool), ("Dengan pool", with_pool)):
+        total, pauses, collections = _measure_gc(workload)
+        worst = max(pauses) * 1000 if pauses else 0.0
+        print(f"{label:<12}: {total * 1000:.1f} ms, GC gen0/1/2 {collections[0]}/{collections[1]}/{collections[2]}, "
+              f"total pause {sum(pauses) * 1000:.2f} ms, max {worst:.3f} ms")
+
+
+def _build_scene(slots_x, slots_y, customer_count):
+    shop_types = list(ShopType)
+    dec_types = list(DecorationType)
+    shops, decorations = [], []
+    for i in range(slots_x):
+        for j in range(slots_y):
+            if (i + j) % 4 == 0:
+                decorations.append(Decoration(dec_types[(i + j) % len(dec_types)], i * 100 + 30, j * 100 + 30))
+            else:
+                shop = Shop(shop_types[(i * slots_y + j) % len(shop_types)], i * 100, j * 100)
+                shop.start_production()
+                shops.append(shop)
+    customers = []
+    for n in range(customer_count):
+        customer = Customer(shops[n % len(shops)], 400, 185)
+        customer.state = CustomerState.SHOPPING
+        customer.x = (n * 37) % (slots_x * 100)
+        customer.y = (n * 53) % (slots_y * 100)
+        customers.append(customer)
+    return shops, decorations, customers
+
+
+def bench_render(frames=200):
+    screen = pygame.display.set_mode((1200, 700))
+    Customer.load_images()
+    shops, decorations, customers = _build_scene(12, 5, 300)
+    ox, oy = 15, 185
+
+    def per_object():
+        # Jalur lama: satu panggilan gambar (atau beberapa primitif) per objek
+        for decoration in decorations:
+            Decoration.draw_preview(screen, decoration.x + ox, decoration.y + oy, decoration.type)
+        for shop in shops:
+            Shop.draw_body(screen, shop.x + ox, shop.y + oy, SHOP_TEMPLATES[shop.type], shop.width, shop.height)
+            shop.draw_progress_bar(screen, ox, oy)
+        for customer in customers:
+            customer.draw(screen, ox, oy)
+
+    queue = RenderQueue()
+
+    def batched():
+        for decoration in decorations:
+            decoration.queue_draw(queue, ox, oy)
+        for shop in shops:
+            shop.queue_draw(queue, ox, oy)
+        for customer in customers:
+            customer.queue_draw(queue, ox, oy)
+        queue.flush(screen)
+        for shop in shops:
+            shop.draw_progress_bar(screen, ox, oy)
+
+    print(f"Scene: {len(shops)} toko, {len(decorations)} dekorasi, {len(customers)} customer")
+    for label, draw in (("Per objek", per_object), ("RenderQueue", batched)):
+        draw()  # pemanasan cache sprite
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            screen.fill((240, 240, 240))
+            draw()
+        elapsed = (time.perf_counter() - t0) / frames
+        print(f"{label:<12}: {elapsed * 1000:.3f} ms/frame")
+
+
+def _first_spawn_latency(manager):
+    # Reset cache gambar customer supaya spawn berikutnya adalah "spawn pertama"
+    customer_module.assets = manager
+    Customer.customer_images.clear()
+    Customer.images_loaded = False
+    shop = Shop(ShopType.FOOD, 0, 0)
+    t0 = time.perf_counter()
+    Customer(shop, 400, 185)
+    return time.perf_counter() - t0
+
+
+def bench_assets():
+    pygame.display.set_mode((1200, 700))
+
+    t0 = time.perf_counter()
+    sound_manager = SoundManager()
+    menu_ready = time.perf_counter() - t0
+    print(f"SoundManager siap (tanpa akses disk): {menu_ready * 1000:.2f} ms")
+
+    cold = _first_spawn_latency(asset_manager.AssetManager())
+    print(f"Spawn pertama tanpa preload : {cold * 1000:.2f} ms")
+
+    manager = asset_manager.AssetManager()
+    t0 = time.perf_counter()
+    manager.start_preload()
+    print(f"start_preload() kembali dalam : {(time.perf_counter() - t0) * 1000:.2f} ms")
+    manager.wait()
+    warm = _first_spawn_latency(manager)
+    print(f"Spawn pertama setelah preload: {warm * 1000:.2f} ms")
+    report = manager.report()
+    print(f"Preload latar belakang      : {report['preload_seconds'] * 1000:.2f} ms, muat sinkron: {report['sync_loads']}")
+    customer_module.assets = asset_manager.assets
+    sound_manager.stop_bgm()
+
+
+def bench_audio(clicks=50):
+    # Buffer besar (default lama pygame 1.x) dibandingkan AUDIO_CONFIG
+    for label, config in (("buffer 4096", {"buffer": 4096}), ("AUDIO_CONFIG", None)):
+        sound_manager = SoundManager(audio_config=config)
+        frequency = pygame.mixer.get_init()[0]
+        click = pygame.mixer.Sound(buffer=bytes(frequency // 10 * 4))
+        sound_manager.sfx["click"] = click
+        dispatch = []
+        for _ in range(clicks):
+            t0 = time.perf_counter()
+            sound_manager.play_sfx("click")
+            sound_manager.flush_sfx()
+            dispatch.append(time.perf_counter() - t0)
+            click.stop()
+            sound_manager.last_played.clear()
+        output = sound_manager.get_output_latency()
+        mean_dispatch = sum(dispatch) / len(dispatch)
+        # Dispatch diukur; buffer hanya estimasi teoretis (pygame tidak melaporkan buffer asli)
+        print(f"{label:<12}: dispatch {mean_dispatch * 1000:.3f} ms (terukur) + buffer ~{output * 1000:.1f} ms "
+              f"(estimasi teoretis) = klik-ke-suara ~{(mean_dispatch + output) * 1000:.1f} ms")
+
+
+def _run_lod_game(lod, camera, seconds, fps=60):
+    import random
+    from main import Game
+
+    random.seed(7)
+    clock = game_clock.SimulatedClock()
+    game_clock.use_clock(clock)
+    try:
+        game = Game(save_slot=9, headless=True)
+        game.simulation_lod = lod
+        game.coins = 10 ** 6
+        game.level = 10
+        game.customer_spawn_interval = 0.25
+        shop_types = list(ShopType)
+        for i in range(8):
+            for j in range(5):
+                game.build_shop(shop_types[(i + j) % len(shop_types)], i * 100, j * 100)
+        game.camera_x, game.camera_y = camera
+        ticks = []
+        awake = 0
+        for _ in range(int(seconds * fps)):
+            t0 = time.perf_counter()
+            game.update()
+            ticks.append(time.perf_counter() - t0)
+            awake += len(game.awake_customers)
+            clock.advance(1.0 / fps)
+    finally:
+        game_clock.use_clock(None)
+    outcome = (game.coins, [quest.progress for quest in game.quests])
+    return sum(ticks) / len(ticks), awake / len(ticks), len(game.customers), outcome
+
+
+def bench_lod(seconds=300):
+    pygame.display.set_mode((1200, 700))
+    # Kamera di mall (semua terlihat) dan kamera digeser jauh (semua di luar layar)
+    for label, camera in (("di layar", (0, 0)), ("luar layar", (-3000, 0))):
+        results = {lod: _run_lod_game(lod, camera, seconds) for lod in (False, True)}
+        for lod, (tick, awake, total, _) in results.items():
+            name = f"{label}, LOD {'on' if lod else 'off'}"
+            print(f"{name:<20}: {tick * 1000:.3f} ms/tick, rata-rata {awake:.0f} dari ~{total} customer disimulasikan")
+        same = results[False][3] == results[True][3]
+        print(f"{'':<20}  hasil koin/quest identik: {'✓' if same else '✗'}")
+
+
+def bench_demand(samples=100000):
+    import random
+
+    rng = random.Random(3)
+    for count in (50, 500, 5000):
+        shops = [Shop(list(ShopType)[n % len(ShopType)], (n % 20) * 100, (n // 20) * 100) for n in range(count)]
+        model = DemandModel(InfluenceMap(20, count // 20 + 1), shops)
+        weights = [model.get_weight(shop) for shop in shops]
+
+        # Jalur naif: bobot dijumlah ulang tiap spawn, O(n)
+        t0 = time.perf_counter()
+        for _ in range(samples // 10):
+            rng.choices(shops, weights)
+        naive = (time.perf_counter() - t0) / (samples // 10)
+
+        t0 = time.perf_counter()
+        for _ in range(samples):
+            model.sample(rng.random())
+        fenwick = (time.perf_counter() - t0) / samples
+
+        t0 = time.perf_counter()
+        for shop in shops[:100]:
+            shop.level += 1
+            model.update_shop(shop)
+        update = (time.perf_counter() - t0) / 100
+        print(f"{count:>5} toko: naif {naive * 1e6:7.2f} us/sampel, Fenwick {fenwick * 1e6:5.2f} us/sampel, "
+              f"update bobot {update * 1e6:5.2f} us")
+
+
+def bench_influence(placements=500):
+    import random
+
+    rng = random.Random(4)
+    slots_x, slots_y = 20, 20
+    shops = [Shop(ShopType.FOOD, x * 100, y * 100) for x in range(slots_x) for y in range(slots_y)]
+    decorations = [Decoration(rng.choice(list(DecorationType)), rng.randrange(slots_x) * 100 + 30,
+                              rng.randrange(slots_y) * 100 + 30) for _ in range(placements)]
+
+    # Jalur naif: tiap dekorasi baru, bonus semua pasangan toko-dekorasi dihitung ulang
+    t0 = time.perf_counter()
+    placed = []
+    for decoration in decorations[:100]:
+        placed.append(decoration)
+        bonus = {}
+        for shop in shops:
+            total = 0.0
+            for other in placed:
+                dx = abs((other.x + 20) // 100 - shop.x // 100)
+                dy = abs((other.y + 20) // 100 - shop.y // 100)
+                if dx <= 1 and dy <= 1:
+                    total += other.template["appeal"] * INFLUENCE_KERNEL[dy + 1][dx + 1]
+            bonus[id(shop)] = total
+    naive = (time.perf_counter() - t0) / 100
+
+    influence = InfluenceMap(slots_x, slots_y)
+    t0 = time.perf_counter()
+    for decoration in decorations:
+        influence.add_decoration(decoration)
+    patch = (time.perf_counter() - t0) / placements
+
+    t0 = time.perf_counter()
+    influence.resize(slots_x, slots_y)
+    full = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for shop in shops:
+        influence.get_bonus(shop.x, shop.y)
+    read = (time.perf_counter() - t0) / len(shops)
+    backend = "numpy" if influence_map.np is not None else "list Python"
+    print(f"Peta {slots_x}x{slots_y}, {placements} dekorasi ({backend})")
+    print(f"Hitung ulang semua pasangan : {naive * 1000:.3f} ms/dekorasi (100 dekorasi pertama)")
+    print(f"Tambal kernel inkremental   : {patch * 1e6:.2f} us/dekorasi")
+    print(f"Konvolusi penuh (resize)    : {full * 1000:.3f} ms")
+    print(f"Baca bonus toko             : {read * 1e6:.2f} us")
+
+
+def bench_zoom(frames=60):
+    import random
+    from main import Game, FPS
+    from mipmap import ZOOM_LEVELS
+
+    pygame.display.set_mode((1200, 700))
+    random.seed(5)
+    clock = game_clock.SimulatedClock()
+    game_clock.use_clock(clock)
+    try:
+        game = Game(save_slot=9, headless=True)
+        game.coins = 10 ** 12
+        game.level = 50
+        while game.expand_mall():
+            pass
+        slots_x, slots_y = game.mall.get_shop_slots()
+        shop_types = list(ShopType)
+        for y in range(slots_y):
+            for x in range(slots_x):
+                if random.random() < 0.5:
+                    game.build_shop(random.choice(shop_types), x * 100, y * 100)
+        game.customer_spawn_interval = 0
+        for _ in range(300):
+            game.update()
+            clock.advance(1.0 / FPS)
+        print(f"Mall {slots_x}x{slots_y} slot, {len(game.shops)} toko, budget frame {1000 / FPS:.1f} ms")
+        for level, zoom in enumerate(ZOOM_LEVELS):
+            game.set_zoom_level(level)
+            game.draw()
+            # Buffer dunia dibatalkan tiap frame: yang diukur biaya gambar penuh per zoom,
+            # bukan sekadar blit buffer yang sudah ter-cache
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                game.world_buffer_key = None
+                game.draw()
+            draw = (time.perf_counter() - t0) / frames
+            blit_calls = game.render_queue.blit_calls
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                game.draw()
+            cached = (time.perf_counter() - t0) / frames
+            print(f"zoom {zoom:<6}: draw {draw * 1000:6.2f} ms/frame (ter-cache {cached * 1000:5.2f} ms), "
+                  f"{blit_calls} panggilan blits")
+    finally:
+        game_clock.use_clock(None)
+
+
+def bench_pan(frames=120, speed=10):
+    import random
+    from main import Game
+
+    pygame.display.set_mode((1200, 700))
+    random.seed(6)
+    game = Game(save_slot=9, headless=True)
+    game.coins = 10 ** 12
+    game.level = 50
+    for _ in range(40):
+        game.expand_mall()
+    slots_x, slots_y = game.mall.get_shop_slots()
+    shop_types = list(ShopType)
+    for y in range(slots_y):
+        for x in range(slots_x):
+            if random.random() < 0.5:
+                game.build_shop(shop_types[(x + y) % len(shop_types)], x * 100, y * 100)
+    print(f"Mall {slots_x}x{slots_y} slot, geser {speed} px/frame diagonal")
+    for label, scroll in (("gambar ulang penuh", False), ("scroll-blit", True)):
+        game.camera_x = game.camera_y = 0
+        game.update_world_buffer()
+        area = 0
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            game.pan_camera(-speed, -speed)
+            if not scroll:
+                game.world_buffer_key = None
+            game.update_world_buffer()
+            area += game.world_redraw_area
+        elapsed = (time.perf_counter() - t0) / frames
+        print(f"{label:<19}: {elapsed * 1000:.3f} ms/frame, {area / frames:,.0f} px digambar ulang per frame")
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "render": bench_render,
+    "assets": bench_assets,
+    "audio": bench_audio,
+    "lod": bench_lod,
+    "demand": bench_demand,
+    "influence": bench_influence,
+    "zoom": bench_zoom,
+    "pan": bench_pan,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Cozy Idle Builder")
+    parser.add_argument("name", choices=sorted(BENCHMARKS), help="benchmark yang dijalankan")
+    args = parser.parse_args(argv)
+    pygame.init()
+    BENCHMARKS[args.name]()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
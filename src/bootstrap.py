@@ -0,0 +1,81 @@
+import time
+from contextlib import contextmanager
+
+import pygame
+
+from asset_manager import assets
+from save_manager import SaveManager
+from sound_manager import SoundManager
+
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 700
+
+# Target waktu dari start sampai frame menu pertama tampil
+FIRST_FRAME_BUDGET_MS = 500
+
+
+class StartupProfiler:
+    """ Mencatat durasi tiap langkah startup untuk laporan time-to-first-frame """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+        self.first_frame = None
+
+    @contextmanager
+    def step(self, label):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - t0))
+
+    def mark_first_frame(self):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.started
+            self.report()
+
+    def report(self):
+        print("Startup:")
+        for label, seconds in self.steps:
+            print(f"  {label:<16} {seconds * 1000:7.1f} ms")
+        total_ms = self.first_frame * 1000
+        status = "✓" if total_ms <= FIRST_FRAME_BUDGET_MS else "⚠ di atas budget"
+        print(f"  {'first frame':<16} {total_ms:7.1f} ms ({status} {FIRST_FRAME_BUDGET_MS} ms)")
+
+
+class AppContext:
+    """
+    Subsistem yang dibuat tepat sekali dan dipakai bersama oleh menu dan game.
+    SaveManager baru dibuat saat pertama dibutuhkan (tidak perlu untuk frame menu).
+    """
+
+    def __init__(self, screen, sound_manager, profiler):
+        self.screen = screen
+        self.sound_manager = sound_manager
+        self.profiler = profiler
+        self._save_manager = None
+
+    @property
+    def save_manager(self):
+        if self._save_manager is None:
+            self._save_manager = SaveManager()
+        return self._save_manager
+
+
+def bootstrap():
+    """ Inisialisasi display, font dan mixer sekali saja, lalu mulai preload aset """
+    profiler = StartupProfiler()
+
+    with profiler.step("display"):
+        pygame.display.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Cozy Idle Builder")
+    with profiler.step("font"):
+        pygame.font.init()
+    with profiler.step("mixer"):
+        sound_manager = SoundManager()
+    with profiler.step("asset preload"):
+        assets.start_preload()
+
+    return AppContext(screen, sound_manager, profiler)
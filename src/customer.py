@@ -1,13 +1,20 @@
 import random
 import pygame
 import math
-import time
+import game_clock
+from collections import namedtuple
 from enum import Enum
 from color import *
+from render_queue import LAYER_SHADOW, LAYER_CUSTOMER
+from mipmap import ZOOM_LEVELS, FLAT_DETAIL_LEVEL, build_mips
+from asset_manager import assets
 
 SCREEN_WIDTH = 1200
 # *** BARU: Menambahkan BORDER_THICKNESS di sini untuk konversi ***
 BORDER_THICKNESS = 15
+# Jarak antar customer di barisan antrean toko, dan panjang barisan yang digambar
+QUEUE_SPACING = 14
+QUEUE_VISIBLE = 6
 
 class CustomerMood(Enum):
     HAPPY = "happy"
@@ -23,32 +30,143 @@ class CustomerState(Enum):
     LEAVING = "leaving"
     LEAVING_ON_ROAD = "leaving_on_road"
 
+# State yang posisinya memakai koordinat internal mall
+IN_MALL_STATES = frozenset((CustomerState.SHOPPING, CustomerState.EXITING_MALL))
+
+# *** BARU: Data gambar satu customer (tuple biasa, aman dibaca thread render) ***
+# image None = digambar sebagai figur lingkaran
+CustomerView = namedtuple("CustomerView", "x y in_mall direction image mood has_purchased")
+
 class Customer:
     customer_images = []
     images_loaded = False
+    # *** BARU: Sprite bersama, dibuat sekali untuk semua customer ***
+    shadow_sprite = None
+    composed_sprites = {}
+    # Titik pengganti sprite saat zoom jauh, per (warna mood, level)
+    dot_sprites = {}
         
     @classmethod
     def load_images(cls):
+        # *** DIUBAH: Gambar diambil dari AssetManager (sudah dimuat di latar belakang saat menu) ***
         if not cls.images_loaded:
             try:
-                import os
-                current_dir = os.path.dirname(os.path.abspath(__file__))
                 for i in range(1, 4):
-                    image_path = os.path.join(current_dir, f'foto-{i}.png')
-                    img = pygame.image.load(image_path).convert_alpha()
-                    img = pygame.transform.smoothscale(img, (80, 80))
+                    img = assets.get_image(f'foto-{i}.png', (80, 80))
+                    if img is None:
+                        raise FileNotFoundError(f'foto-{i}.png')
                     cls.customer_images.append(img)
                 cls.images_loaded = True
             except Exception as e:
                 print(f"✗ Error loading customer images: {e}")
+                cls.customer_images.clear()
                 cls.images_loaded = False
 
-    def __init__(self, target_shop=None, mall_entrance_x=None, mall_entrance_y=None):
+    @classmethod
+    def get_shadow_sprite(cls, level=0):
+        """ *** BARU: Bayangan 30x30 (beserta mip-nya) dibuat sekali lalu dipakai semua customer *** """
+        if cls.shadow_sprite is None:
+            shadow_radius = 15
+            shadow_surf = pygame.Surface((shadow_radius * 2, shadow_radius * 2), pygame.SRCALPHA)
+            pygame.draw.ellipse(shadow_surf, (0, 0, 0, 30), (0, 0, shadow_radius * 2, shadow_radius * 2))
+            cls.shadow_sprite = build_mips(shadow_surf)
+        return cls.shadow_sprite[level]
+
+    @classmethod
+    def get_composed_sprite(cls, image, mood, has_bag, level=0):
+        """
+        *** BARU: Gambar customer + emoji + tas belanja digabung jadi satu Surface.
+        Variannya sedikit (gambar x mood x tas), jadi semuanya di-cache
+        bersama rantai mip untuk tiap level zoom.
+        image=None menghasilkan figur lingkaran cadangan.
+        """
+        key = (image, mood, has_bag)
+        mips = cls.composed_sprites.get(key)
+        if mips is None:
+            if image is not None:
+                sprite = cls._compose_image_sprite(image, mood, has_bag)
+            else:
+                sprite = cls._compose_fallback_sprite(mood, has_bag)
+            mips = cls.composed_sprites[key] = build_mips(sprite)
+        return mips[level]
+
+    @classmethod
+    def get_dot_sprite(cls, color, level):
+        """ Titik kecil berwarna mood untuk zoom jauh (level >= FLAT_DETAIL_LEVEL) """
+        key = (color, level)
+        dot = cls.dot_sprites.get(key)
+        if dot is None:
+            size = max(2, int(24 * ZOOM_LEVELS[level]))
+            dot = pygame.Surface((size, size))
+            dot.fill(color)
+            cls.dot_sprites[key] = dot
+        return dot
+
+    @staticmethod
+    def _compose_image_sprite(image, mood, has_bag):
+        sprite = image.copy()
+        # Koordinat relatif terhadap pusat gambar 80x80
+        cx, cy = sprite.get_width() // 2, sprite.get_height() // 2
+        if mood == CustomerMood.HAPPY:
+            emoji_y = cy - 28
+            pygame.draw.circle(sprite, GREEN, (cx + 15, emoji_y), 6)
+            pygame.draw.circle(sprite, WHITE, (cx + 15, emoji_y), 6, 1)
+            pygame.draw.arc(sprite, WHITE, (cx + 12, emoji_y - 1, 6, 4), 3.14, 0, 1)
+        if has_bag:
+            bag_x = cx + 20; bag_y = cy + 8
+            bag_points = [(bag_x, bag_y), (bag_x + 10, bag_y), (bag_x + 9, bag_y + 12), (bag_x + 1, bag_y + 12)]
+            pygame.draw.polygon(sprite, ORANGE, bag_points)
+            pygame.draw.polygon(sprite, (139, 69, 19), bag_points, 1)
+            pygame.draw.arc(sprite, (139, 69, 19), (bag_x + 2, bag_y - 3, 6, 5), 0, 3.14, 1)
+        return sprite
+
+    @staticmethod
+    def _compose_fallback_sprite(mood, has_bag):
+        radius = 40
+        sprite = pygame.Surface((radius * 2 + 4, radius * 2 + 4), pygame.SRCALPHA)
+        cx, cy = sprite.get_width() // 2, sprite.get_height() // 2
+        color = GREEN if mood == CustomerMood.HAPPY else RED if mood == CustomerMood.ANGRY else BLUE
+        pygame.draw.circle(sprite, color, (cx, cy), radius)
+        pygame.draw.circle(sprite, BLACK, (cx, cy), radius, 2)
+        pygame.draw.circle(sprite, (255, 220, 177), (cx, cy - 10), 6)
+        pygame.draw.circle(sprite, BLACK, (cx, cy - 10), 6, 1)
+        pygame.draw.circle(sprite, BLACK, (cx - 2, cy - 11), 1)
+        pygame.draw.circle(sprite, BLACK, (cx + 2, cy - 11), 1)
+        if mood == CustomerMood.HAPPY: pygame.draw.arc(sprite, BLACK, (cx - 3, cy - 8, 6, 4), math.pi, 0, 1)
+        elif mood == CustomerMood.ANGRY: pygame.draw.line(sprite, BLACK, (cx - 3, cy - 7), (cx + 3, cy - 7), 1)
+        if has_bag:
+            bag_points = [(cx + 8, cy + 5), (cx + 14, cy + 5), (cx + 13, cy + 12), (cx + 9, cy + 12)]
+            pygame.draw.polygon(sprite, ORANGE, bag_points)
+            pygame.draw.polygon(sprite, BLACK, bag_points, 1)
+        return sprite
+
+    # *** BARU: __slots__ agar tiap customer tidak membawa __dict__ sendiri ***
+    __slots__ = (
+        "target_shop", "mall_entrance_x", "mall_entrance_y", "spawn_side",
+        "x", "y", "state", "speed", "mood", "radius", "color",
+        "has_purchased", "direction", "waiting_time", "image", "use_image",
+        # Fase gerak lurus saat ini (posisi = origin + dir * steps * speed)
+        "phase_axis", "phase_origin", "phase_dir", "steps", "phase_steps",
+        # Level-of-detail: frame mulai tidur dan token entri heap di Game
+        "sleep_frame", "sleep_token",
+        # Antrean toko: nomor tiket, waktu mulai antre, waktu layanan selesai
+        "queue_ticket", "queued_at", "service_end",
+        # Pintu masuk yang dituju dan jadwal boleh masuk dari antrean pintu
+        "entrance", "admit_at",
+    )
+
+    def __init__(self, target_shop=None, mall_entrance_x=None, mall_entrance_y=None, entrance=None):
         # mall_entrance_x dan y sekarang adalah KOORDINAT DUNIA (sudah + border)
+        # entrance: objek Entrance mall untuk antrean pintu (None = tanpa batas throughput)
         if not Customer.images_loaded:
             Customer.load_images()
-        
+        self.reset(target_shop, mall_entrance_x, mall_entrance_y, entrance)
+
+    def reset(self, target_shop=None, mall_entrance_x=None, mall_entrance_y=None, entrance=None):
+        """ *** BARU: Mengisi ulang semua atribut agar objek bisa dipakai ulang oleh CustomerPool *** """
         self.target_shop = target_shop
+        self.entrance = entrance
+        self.admit_at = None
         self.mall_entrance_x = mall_entrance_x 
         self.mall_entrance_y = mall_entrance_y
         
@@ -75,141 +193,310 @@ class Customer:
         else:
             self.image = None
             self.use_image = False
+
+        self.sleep_frame = None
+        self.sleep_token = None
+        self.queue_ticket = None
+        self.queued_at = None
+        self.service_end = None
+        if mall_entrance_x is not None:
+            self.begin_phase("x", self.x, mall_entrance_x)
         
     def get_color_by_mood(self):
-        if self.mood == CustomerMood.HAPPY: return GREEN
-        elif self.mood == CustomerMood.ANGRY: return RED
+        return Customer.color_of_mood(self.mood)
+
+    @staticmethod
+    def color_of_mood(mood):
+        if mood == CustomerMood.HAPPY: return GREEN
+        elif mood == CustomerMood.ANGRY: return RED
         return BLUE
     
+    # ================= GERAK PER FASE =================
+    # Setiap fase adalah gerak lurus pada satu sumbu dengan kecepatan tetap.
+    # Posisi dihitung dari jumlah langkah (bukan dijumlahkan tiap frame), jadi
+    # melompati banyak frame sekaligus memberi hasil yang persis sama.
+    def begin_phase(self, axis, origin, target):
+        self.phase_axis = axis
+        self.phase_origin = origin
+        self.phase_dir = 1 if target > origin else -1
+        self.steps = 0
+        self.phase_steps = self._count_steps(target)
+
+    def _position_at(self, steps):
+        return self.phase_origin + self.phase_dir * steps * self.speed
+
+    def _count_steps(self, target):
+        """ Jumlah langkah sampai sisa jarak <= speed (sama dengan loop 'if abs(d) > speed' lama) """
+        distance = abs(target - self.phase_origin)
+        if distance <= self.speed:
+            return 0
+        steps = max(0, math.ceil((distance - self.speed) / self.speed))
+        while abs(target - self._position_at(steps)) > self.speed:
+            steps += 1
+        while steps > 0 and abs(target - self._position_at(steps - 1)) <= self.speed:
+            steps -= 1
+        return steps
+
+    def _step(self):
+        """ Maju satu langkah di fase saat ini; False jika fase sudah selesai """
+        if self.steps >= self.phase_steps:
+            return False
+        self.steps += 1
+        if self.phase_axis == "x":
+            self.x = self._position_at(self.steps)
+        else:
+            self.y = self._position_at(self.steps)
+        return True
+
+    def in_mall(self):
+        return self.state in IN_MALL_STATES
+
+    def get_shop_target(self):
+        return (self.target_shop.x + self.target_shop.width // 2,
+                self.target_shop.y + self.target_shop.height // 2)
+
     def update(self):
         self.direction += 0.1
         
         if self.state == CustomerState.WALKING_ON_ROAD:
             # 1. Bergerak di jalan ke Pintu Masuk (Koordinat Dunia)
-            dx = self.mall_entrance_x - self.x
-            if abs(dx) > self.speed:
-                self.x += self.speed if dx > 0 else -self.speed
-            else:
+            if not self._step():
                 self.x = self.mall_entrance_x
                 self.state = CustomerState.WALKING_TO_MALL
+                self.begin_phase("y", self.y, self.mall_entrance_y)
 
         elif self.state == CustomerState.WALKING_TO_MALL:
             # 2. Bergerak di trotoar ke Pintu Masuk (Koordinat Dunia)
-            dy = self.mall_entrance_y - self.y
-            if abs(dy) > self.speed:
-                self.y += self.speed
-            else:
+            if not self._step():
+                if self.entrance is not None:
+                    # *** BARU: Antre di pintu sesuai throughput pintu ***
+                    now = game_clock.now()
+                    if self.admit_at is None:
+                        self.admit_at = self.entrance.request_entry(self, now)
+                    if now < self.admit_at:
+                        position = self.entrance.get_queue_position(self.admit_at, now)
+                        self.y = self.mall_entrance_y - QUEUE_SPACING * (1 + min(position, QUEUE_VISIBLE))
+                        return
                 self.y = self.mall_entrance_y
                 self.state = CustomerState.SHOPPING
                 
                 # *** FIX: Konversi ke Koordinat INTERNAL Mal ***
                 self.x = self.x - BORDER_THICKNESS
                 self.y = 0 
+                self.begin_phase("x", self.x, self.get_shop_target()[0])
                 
         elif self.state == CustomerState.SHOPPING:
-            # 3. Bergerak ke toko (Koordinat Internal)
-            target_x = self.target_shop.x + self.target_shop.width // 2
-            target_y = self.target_shop.y + self.target_shop.height // 2
-            
-            dx = target_x - self.x
-            dy = target_y - self.y
-            
-            if abs(dx) > self.speed:
-                self.x += self.speed if dx > 0 else -self.speed
-            elif abs(dy) > self.speed:
-                self.y += self.speed if dy > 0 else -self.speed
-            else:
+            # 3. Bergerak ke toko (Koordinat Internal): sumbu x dulu, lalu y
+            target_x, target_y = self.get_shop_target()
+            if self.phase_axis == "x":
+                if self._step():
+                    return
+                self.begin_phase("y", self.y, target_y)
+            if self._step():
+                return
+            # *** DIUBAH: sampai di toko -> antrean FIFO toko, dilayani sesuai kapasitas ***
+            now = game_clock.now()
+            if self.queue_ticket is None:
+                self.target_shop.arrive(self, now)
+            if self.service_end is None:
+                # Masih antre: berbaris di bawah titik layanan
+                position = self.target_shop.get_queue_position(self)
                 self.x = target_x
-                self.y = target_y
-                if not self.has_purchased:
-                    self.has_purchased = True
-                    self.mood = CustomerMood.HAPPY
-                    self.color = self.get_color_by_mood()
-                    self.waiting_time = time.time()
-                elif time.time() - self.waiting_time > 1:
-                    self.state = CustomerState.EXITING_MALL
+                self.y = target_y + QUEUE_SPACING * (1 + min(position, QUEUE_VISIBLE))
+                return
+            slot = self.queue_ticket % self.target_shop.capacity
+            self.x = target_x + (slot - (self.target_shop.capacity - 1) / 2) * QUEUE_SPACING
+            self.y = target_y
+            if now > self.service_end:
+                self.target_shop.finish(self, now)
+                self.state = CustomerState.EXITING_MALL
+                self.begin_phase("y", self.y, 0)
                         
         elif self.state == CustomerState.EXITING_MALL:
-            # 4. Kembali ke pintu (Koordinat Internal)
-            # Hitung target X internal pintu
+            # 4. Kembali ke pintu (Koordinat Internal): sumbu y dulu, lalu x
             target_x = self.mall_entrance_x - BORDER_THICKNESS 
-            target_y = 0 
+            if self.phase_axis == "y":
+                if self._step():
+                    return
+                self.begin_phase("x", self.x, target_x)
+            if self._step():
+                return
+            self.x = target_x
+            self.y = 0
+            self.state = CustomerState.LEAVING
             
-            dx = target_x - self.x
-            dy = target_y - self.y
-
-            if abs(dy) > self.speed:
-                self.y += self.speed if dy > 0 else -self.speed
-            elif abs(dx) > self.speed:
-                self.x += self.speed if dx > 0 else -self.speed
-            else:
-                self.x = target_x
-                self.y = target_y
-                self.state = CustomerState.LEAVING
-                
-                # *** FIX: Konversi kembali ke Koordinat DUNIA ***
-                self.x = self.x + BORDER_THICKNESS
-                self.y = self.mall_entrance_y 
+            # *** FIX: Konversi kembali ke Koordinat DUNIA ***
+            self.x = self.x + BORDER_THICKNESS
+            self.y = self.mall_entrance_y 
+            self.begin_phase("y", self.y, 100)
 
         elif self.state == CustomerState.LEAVING:
             # 5. Bergerak kembali ke jalan (Koordinat Dunia)
-            target_y = 100
-            dy = target_y - self.y
-            if abs(dy) > self.speed:
-                self.y -= self.speed
-            else:
-                self.y = target_y
+            if not self._step():
+                self.y = 100
                 self.state = CustomerState.LEAVING_ON_ROAD
+                exit_x = -50 if self.spawn_side == 1 else SCREEN_WIDTH + 50
+                self.begin_phase("x", self.x, exit_x)
 
         elif self.state == CustomerState.LEAVING_ON_ROAD:
             # 6. Bergerak keluar layar (Koordinat Dunia)
-            exit_x = -50 if self.spawn_side == 1 else SCREEN_WIDTH + 50
-            dx = exit_x - self.x
-            if abs(dx) > self.speed:
-                self.x += self.speed if dx > 0 else -self.speed
-            else:
+            if not self._step():
                 self.y = -100
+
+    def begin_service(self, service_end):
+        """ Dipanggil toko saat customer mulai dilayani """
+        self.service_end = service_end
+        self.has_purchased = True
+        self.mood = CustomerMood.HAPPY
+        self.color = self.get_color_by_mood()
+        self.waiting_time = service_end - self.target_shop.service_time
+
+    # ================= LEVEL OF DETAIL =================
+    def frames_until_event(self):
+        """
+        *** BARU: Jumlah frame gerak murni sebelum frame berikutnya yang mengubah fase/state.
+        None jika customer sedang di toko (antre/dilayani; bangun berdasarkan waktu, bukan frame).
+        """
+        if self.steps < self.phase_steps:
+            return self.phase_steps - self.steps
+        if self.state == CustomerState.SHOPPING and self.queue_ticket is not None:
+            return None
+        if self.state == CustomerState.WALKING_TO_MALL and self.admit_at is not None:
+            return None
+        return 0
+
+    def wake_time(self):
+        """
+        Waktu game paling awal customer yang menunggu perlu di-update lagi: jadwal masuk
+        pintu, selesai dilayani, atau (saat antre di toko) slot layanan pertama yang
+        kosong sebagai batas bawah. Selalu float, karena dipakai sebagai kunci heap.
+        """
+        if self.state == CustomerState.WALKING_TO_MALL:
+            return self.admit_at
+        if self.service_end is not None:
+            return self.service_end
+        service_end = self.target_shop.next_service_end()
+        # Tidak ada yang sedang dilayani: bangunkan di update berikutnya
+        return game_clock.now() if service_end is None else service_end
+
+    def frames_until_visible(self, view):
+        """
+        *** BARU: Berapa frame lagi customer masuk ke view (left, top, right, bottom)
+        dalam koordinatnya sendiri selama fase ini; None jika tidak akan masuk.
+        """
+        if self.steps >= self.phase_steps:
+            return None
+        left, top, right, bottom = view
+        if self.phase_axis == "x":
+            if not top <= self.y <= bottom:
+                return None
+            low, high = left, right
+        else:
+            if not left <= self.x <= right:
+                return None
+            low, high = top, bottom
+        if self.phase_dir > 0:
+            steps = math.ceil((low - self.phase_origin) / self.speed)
+        else:
+            steps = math.ceil((self.phase_origin - high) / self.speed)
+        steps = max(steps, self.steps + 1)
+        if steps > self.phase_steps or not low <= self._position_at(steps) <= high:
+            return None
+        return steps - self.steps
+
+    def advance(self, frames):
+        """
+        *** BARU: Melompati beberapa frame gerak murni sekaligus. Hasilnya sama dengan
+        memanggil update() sebanyak itu selama tidak melewati frame event.
+        """
+        if frames <= 0:
+            return
+        self.direction += 0.1 * frames
+        moves = min(frames, self.phase_steps - self.steps)
+        if moves > 0:
+            self.steps += moves
+            if self.phase_axis == "x":
+                self.x = self._position_at(self.steps)
+            else:
+                self.y = self._position_at(self.steps)
     
+    def position_after(self, frames):
+        """ *** BARU: Posisi (x, y) setelah beberapa frame gerak murni, tanpa mengubah customer *** """
+        steps = min(self.steps + max(frames, 0), self.phase_steps)
+        if steps == self.steps:
+            return self.x, self.y
+        if self.phase_axis == "x":
+            return self._position_at(steps), self.y
+        return self.x, self._position_at(steps)
+
     def should_remove(self):
         return self.y < 0
     
+    def get_view(self):
+        return CustomerView(self.x, self.y, self.state in IN_MALL_STATES, self.direction,
+                            self.image if self.use_image else None, self.mood, self.has_purchased)
+
+    @staticmethod
+    def get_render_items(view, offset_x, offset_y, level=0):
+        """
+        *** BARU: Mengembalikan (bayangan, posisi) dan (sprite, posisi) untuk satu CustomerView.
+        Bayangan None jika customer digambar sebagai figur lingkaran atau titik.
+        """
+        zoom = ZOOM_LEVELS[level]
+        draw_x = int(view.x * zoom + offset_x)
+        draw_y = int(view.y * zoom + offset_y)
+        if level >= FLAT_DETAIL_LEVEL:
+            dot = Customer.get_dot_sprite(Customer.color_of_mood(view.mood), level)
+            return None, dot, (draw_x, draw_y)
+        offset = int(math.sin(view.direction) * 3 * zoom)
+        image = view.image
+        sprite = Customer.get_composed_sprite(image, view.mood, view.has_purchased, level)
+        sprite_pos = (draw_x - sprite.get_width() // 2, draw_y + offset - sprite.get_height() // 2)
+        if image is None:
+            return None, sprite, sprite_pos
+        return (draw_x - int(15 * zoom), draw_y + int(10 * zoom)), sprite, sprite_pos
+
+    @staticmethod
+    def queue_draw_view(render_queue, view, offset_x, offset_y, level=0):
+        shadow_pos, sprite, sprite_pos = Customer.get_render_items(view, offset_x, offset_y, level)
+        sort_y = view.y * ZOOM_LEVELS[level] + offset_y
+        if shadow_pos is not None:
+            render_queue.add(LAYER_SHADOW, sort_y, Customer.get_shadow_sprite(level), shadow_pos)
+        render_queue.add(LAYER_CUSTOMER, sort_y, sprite, sprite_pos)
+
+    def queue_draw(self, render_queue, offset_x, offset_y, level=0):
+        Customer.queue_draw_view(render_queue, self.get_view(), offset_x, offset_y, level)
+
     def draw(self, screen, offset_x, offset_y): 
-        draw_x = int(self.x + offset_x)
-        draw_y = int(self.y + offset_y)
-        
-        offset = math.sin(self.direction) * 3
-        
-        if self.use_image and self.image:
-            img_rect = self.image.get_rect(center=(draw_x, draw_y + int(offset)))
-            shadow_radius = 15
-            shadow_surf = pygame.Surface((shadow_radius * 2, shadow_radius * 2), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow_surf, (0, 0, 0, 30), (0, 0, shadow_radius * 2, shadow_radius * 2))
-            shadow_rect = shadow_surf.get_rect(center=(draw_x, draw_y + 25))
-            screen.blit(shadow_surf, shadow_rect)
-            screen.blit(self.image, img_rect)
-            
-            if self.mood == CustomerMood.HAPPY:
-                emoji_y = draw_y + int(offset) - 28
-                pygame.draw.circle(screen, GREEN, (draw_x + 15, emoji_y), 6)
-                pygame.draw.circle(screen, WHITE, (draw_x + 15, emoji_y), 6, 1)
-                pygame.draw.arc(screen, WHITE, (draw_x + 12, emoji_y - 1, 6, 4), 3.14, 0, 1)
-            
-            if self.has_purchased:
-                bag_x = draw_x + 20; bag_y = draw_y + int(offset) + 8
-                bag_points = [(bag_x, bag_y), (bag_x + 10, bag_y), (bag_x + 9, bag_y + 12), (bag_x + 1, bag_y + 12)]
-                pygame.draw.polygon(screen, ORANGE, bag_points)
-                pygame.draw.polygon(screen, (139, 69, 19), bag_points, 1)
-                pygame.draw.arc(screen, (139, 69, 19), (bag_x + 2, bag_y - 3, 6, 5), 0, 3.14, 1)
+        # Dua blit saja: bayangan bersama + sprite yang sudah digabung
+        shadow_pos, sprite, sprite_pos = Customer.get_render_items(self.get_view(), offset_x, offset_y)
+        if shadow_pos is not None:
+            screen.blit(Customer.get_shadow_sprite(), shadow_pos)
+        screen.blit(sprite, sprite_pos)
+
+
+class CustomerPool:
+    """ *** BARU: Pool objek Customer agar customer yang pergi dipakai ulang, bukan dibuang ke GC *** """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, target_shop=None, mall_entrance_x=None, mall_entrance_y=None, entrance=None):
+        if self.free:
+            customer = self.free.pop()
+            customer.reset(target_shop, mall_entrance_x, mall_entrance_y, entrance)
+            self.reused += 1
         else:
-            pygame.draw.circle(screen, self.color, (draw_x, draw_y + int(offset)), self.radius)
-            pygame.draw.circle(screen, BLACK, (draw_x, draw_y + int(offset)), self.radius, 2)
-            pygame.draw.circle(screen, (255, 220, 177), (draw_x, draw_y - 10 + int(offset)), 6)
-            pygame.draw.circle(screen, BLACK, (draw_x, draw_y - 10 + int(offset)), 6, 1)
-            pygame.draw.circle(screen, BLACK, (draw_x - 2, draw_y - 11 + int(offset)), 1)
-            pygame.draw.circle(screen, BLACK, (draw_x + 2, draw_y - 11 + int(offset)), 1)
-            if self.mood == CustomerMood.HAPPY: pygame.draw.arc(screen, BLACK, (draw_x - 3, draw_y - 8 + offset, 6, 4), math.pi, 0, 1)
-            elif self.mood == CustomerMood.ANGRY: pygame.draw.line(screen, BLACK, (draw_x - 3, draw_y - 7 + offset), (draw_x + 3, draw_y - 7 + offset), 1)
-            if self.has_purchased:
-                bag_points = [(draw_x + 8, draw_y + 5), (draw_x + 14, draw_y + 5), (draw_x + 13, draw_y + 12), (draw_x + 9, draw_y + 12)]
-                pygame.draw.polygon(screen, ORANGE, bag_points)
-                pygame.draw.polygon(screen, BLACK, bag_points, 1)
\ No newline at end of file
+            customer = Customer(target_shop, mall_entrance_x, mall_entrance_y, entrance)
+            self.created += 1
+        return customer
+
+    def release(self, customer):
+        # Lepaskan referensi ke toko supaya toko yang dihapus tidak tertahan di pool
+        customer.target_shop = None
+        customer.entrance = None
+        if len(self.free) < self.max_size:
+            self.free.append(customer)
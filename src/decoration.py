@@ -1,6 +1,11 @@
 import pygame
 from color import *
 from enum import Enum
+from render_queue import LAYER_DECORATION
+from mipmap import ZOOM_LEVELS, build_mips
+
+# Daun pohon sedikit keluar dari kotak 40x40, jadi sprite diberi padding
+SPRITE_PAD = 5
 
 # Baru: Enum untuk tipe dekorasi
 class DecorationType(Enum):
@@ -9,22 +14,33 @@ class DecorationType(Enum):
     FOUNTAIN = "fountain"
 
 # Baru: Template untuk harga dan nama
+# appeal: tambahan demand (fraksi) untuk toko di sekitar dekorasi
+# color: warna titik dekorasi saat zoom jauh
 DECORATION_TEMPLATES = {
     DecorationType.TREE: {
         "name": "Pohon Hias",
-        "cost": 100
+        "cost": 100,
+        "appeal": 0.1,
+        "color": GREEN
     },
     DecorationType.BENCH: {
         "name": "Bangku Taman",
-        "cost": 150
+        "cost": 150,
+        "appeal": 0.15,
+        "color": BROWN
     },
     DecorationType.FOUNTAIN: {
         "name": "Air Mancur",
-        "cost": 300
+        "cost": 300,
+        "appeal": 0.3,
+        "color": LIGHT_BLUE
     }
 }
 
 class Decoration:
+    __slots__ = ("type", "template", "x", "y", "width", "height")
+    sprite_cache = {}
+
     def __init__(self, dec_type, x, y):
         self.type = dec_type # Sekarang Enum, bukan string
         self.template = DECORATION_TEMPLATES[dec_type]
@@ -33,9 +49,23 @@ class Decoration:
         self.width = 40
         self.height = 40
         
+    @classmethod
+    def get_sprite(cls, dec_type, level=0):
+        """ *** DIUBAH: Dekorasi di-render sekali per tipe, lengkap dengan rantai mip untuk zoom *** """
+        mips = cls.sprite_cache.get(dec_type)
+        if mips is None:
+            sprite = pygame.Surface((40 + SPRITE_PAD * 2, 40 + SPRITE_PAD * 2), pygame.SRCALPHA)
+            Decoration.draw_preview(sprite, SPRITE_PAD, SPRITE_PAD, dec_type)
+            mips = cls.sprite_cache[dec_type] = build_mips(sprite)
+        return mips[level]
+
+    def queue_draw(self, render_queue, offset_x, offset_y, level=0):
+        zoom = ZOOM_LEVELS[level]
+        pos = (int((self.x - SPRITE_PAD) * zoom) + offset_x, int((self.y - SPRITE_PAD) * zoom) + offset_y)
+        render_queue.add(LAYER_DECORATION, self.y * zoom + offset_y, Decoration.get_sprite(self.type, level), pos)
+
     def draw(self, screen, offset_x, offset_y):
-        # Panggil fungsi draw_preview statis dengan posisi yang benar
-        Decoration.draw_preview(screen, self.x + offset_x, self.y + offset_y, self.type)
+        screen.blit(Decoration.get_sprite(self.type), (self.x + offset_x - SPRITE_PAD, self.y + offset_y - SPRITE_PAD))
 
     @staticmethod
     def draw_preview(screen, draw_x, draw_y, dec_type):
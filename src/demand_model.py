@@ -0,0 +1,121 @@
+class FenwickTree:
+    """
+    Binary indexed tree atas bobot float: ubah satu bobot, jumlah prefix dan
+    pencarian berdasarkan jumlah kumulatif, semuanya O(log n). Bisa tumbuh
+    satu elemen per append() tanpa membangun ulang.
+    """
+
+    def __init__(self):
+        self.tree = [0.0]  # indeks 1-based, tree[0] tidak dipakai
+        self.weights = []
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def append(self, weight):
+        self.weights.append(weight)
+        i = len(self.weights)
+        # Node i mencakup (i - lowbit(i), i]: bobot baru + jumlah anak-anaknya
+        self.tree.append(weight + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+        self.total += weight
+        return i - 1
+
+    def set(self, index, weight):
+        delta = weight - self.weights[index]
+        if delta == 0:
+            return
+        self.weights[index] = weight
+        self.total += delta
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        """ Jumlah bobot elemen [0, count) """
+        result = 0.0
+        while count > 0:
+            result += self.tree[count]
+            count -= count & -count
+        return result
+
+    def find(self, value):
+        """ Indeks pertama yang jumlah kumulatifnya melewati value (0 <= value < total) """
+        index = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = index + step
+            if nxt < len(self.tree) and self.tree[nxt] <= value:
+                index = nxt
+                value -= self.tree[nxt]
+            step >>= 1
+        # Pembulatan float bisa menunjuk ke elemen berbobot 0 / di luar batas
+        index = min(index, len(self.weights) - 1)
+        while index > 0 and self.weights[index] <= 0:
+            index -= 1
+        return index
+
+
+class DemandModel:
+    """
+    Bobot tiap toko untuk pemilihan target customer:
+        demand tipe toko * level toko * (1 + bonus dekorasi dari InfluenceMap)
+    Bobot diperbarui inkremental saat toko dibangun/di-upgrade atau dekorasi
+    ditaruh, dan sample() memilih toko dalam O(log n).
+    """
+
+    def __init__(self, influence, shops=()):
+        self.influence = influence
+        self.tree = FenwickTree()
+        self.shops = []
+        self.shop_index = {}
+        self.shop_cells = {}
+        for shop in shops:
+            self.add_shop(shop)
+
+    def get_weight(self, shop):
+        bonus = self.influence.get_bonus(shop.x, shop.y)
+        return shop.template["demand"] * shop.level * (1.0 + bonus)
+
+    def add_shop(self, shop):
+        index = self.tree.append(self.get_weight(shop))
+        self.shops.append(shop)
+        self.shop_index[id(shop)] = index
+        self.shop_cells.setdefault(self.influence.cell_of(shop.x, shop.y), []).append(shop)
+
+    def update_shop(self, shop):
+        """ Dipanggil setelah level toko berubah (upgrade) """
+        self.tree.set(self.shop_index[id(shop)], self.get_weight(shop))
+
+    def refresh_around(self, cell):
+        """ Menghitung ulang bobot toko dalam jangkauan kernel sebuah sel (setelah dekorasi ditaruh) """
+        cx, cy = cell
+        r = self.influence.radius
+        for x in range(cx - r, cx + r + 1):
+            for y in range(cy - r, cy + r + 1):
+                for shop in self.shop_cells.get((x, y), ()):
+                    self.update_shop(shop)
+
+    def refresh_cells(self, x0, y0, x1, y1):
+        """
+        Seperti refresh_around, tapi untuk banyak dekorasi sekaligus di sel
+        (x0, y0)..(x1, y1) inklusif: tiap toko di jangkauan dihitung ulang sekali saja
+        """
+        r = self.influence.radius
+        for x in range(x0 - r, x1 + r + 1):
+            for y in range(y0 - r, y1 + r + 1):
+                for shop in self.shop_cells.get((x, y), ()):
+                    self.update_shop(shop)
+
+    def sample(self, u):
+        """ Toko terpilih untuk u acak di [0, 1); None jika belum ada toko """
+        if not self.shops or self.tree.total <= 0:
+            return None
+        return self.shops[self.tree.find(u * self.tree.total)]
+
+    def get_share(self, shop):
+        """ Peluang toko ini dipilih (0..1) """
+        if self.tree.total <= 0:
+            return 0.0
+        return self.tree.weights[self.shop_index[id(shop)]] / self.tree.total
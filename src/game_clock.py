@@ -0,0 +1,28 @@
+import time
+
+
+class SimulatedClock:
+    """ Jam buatan untuk simulasi headless: waktu hanya maju saat advance() dipanggil """
+
+    def __init__(self, start=0.0):
+        self.current = start
+
+    def time(self):
+        return self.current
+
+    def advance(self, seconds):
+        self.current += seconds
+
+
+_active_clock = time
+
+
+def now():
+    """ Waktu game saat ini (detik). Semua logika produksi/spawn membaca dari sini """
+    return _active_clock.time()
+
+
+def use_clock(clock):
+    """ Mengganti sumber waktu, misalnya SimulatedClock; None kembali ke waktu nyata """
+    global _active_clock
+    _active_clock = clock if clock is not None else time
@@ -0,0 +1,95 @@
+from shop import SHOP_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional: tanpa numpy dipakai list Python biasa
+    np = None
+
+# Sebaran appeal satu dekorasi ke sel grid sekitarnya (pusat = sel dekorasi itu)
+INFLUENCE_KERNEL = (
+    (0.25, 0.5, 0.25),
+    (0.5,  1.0, 0.5),
+    (0.25, 0.5, 0.25),
+)
+# Batas bonus income agar dekorasi bertumpuk tidak melipatgandakan income tanpa batas
+MAX_INCOME_BONUS = 1.0
+
+
+class InfluenceMap:
+    """
+    Peta pengaruh dekorasi per sel grid toko (SHOP_SIZE). Nilai sel adalah
+    konvolusi appeal dekorasi dengan INFLUENCE_KERNEL; toko membaca bonus
+    income dari selnya dalam O(1). Menaruh satu dekorasi hanya menambahkan
+    kernel di sekitar selnya, konvolusi penuh hanya saat ukuran mall berubah.
+    """
+
+    def __init__(self, slots_x, slots_y, kernel=INFLUENCE_KERNEL, max_bonus=MAX_INCOME_BONUS):
+        self.kernel = [list(row) for row in kernel]
+        self.radius = len(kernel) // 2
+        self.max_bonus = max_bonus
+        # Total appeal per sel (sumber), dipakai saat peta dibangun ulang
+        self.sources = {}
+        self.grid = None
+        self.resize(slots_x, slots_y)
+
+    @staticmethod
+    def cell_of(x, y):
+        return (int(x // SHOP_SIZE), int(y // SHOP_SIZE))
+
+    def resize(self, slots_x, slots_y):
+        """ Mengalokasi ulang peta (misal setelah mall diperluas) lalu konvolusi penuh """
+        self.slots_x = slots_x
+        self.slots_y = slots_y
+        if np is not None:
+            self.grid = self._convolve_numpy()
+        else:
+            self.grid = [[0.0] * slots_x for _ in range(slots_y)]
+            for cell, appeal in self.sources.items():
+                self._patch(cell, appeal)
+
+    def _convolve_numpy(self):
+        r = self.radius
+        source = np.zeros((self.slots_y + 2 * r, self.slots_x + 2 * r))
+        for (cx, cy), appeal in self.sources.items():
+            if 0 <= cx < self.slots_x and 0 <= cy < self.slots_y:
+                source[cy + r, cx + r] += appeal
+        # Kernel simetris: konvolusi = jumlah salinan sumber yang digeser per elemen kernel
+        result = np.zeros((self.slots_y, self.slots_x))
+        for ky, row in enumerate(self.kernel):
+            for kx, weight in enumerate(row):
+                if weight:
+                    result += weight * source[2 * r - ky:2 * r - ky + self.slots_y,
+                                              2 * r - kx:2 * r - kx + self.slots_x]
+        return result
+
+    def _patch(self, cell, appeal):
+        """ Menambahkan kernel * appeal di sekitar satu sel (dipotong di tepi peta) """
+        cx, cy = cell
+        r = self.radius
+        x0, x1 = max(0, cx - r), min(self.slots_x, cx + r + 1)
+        y0, y1 = max(0, cy - r), min(self.slots_y, cy + r + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if np is not None:
+            kernel = np.asarray(self.kernel)
+            self.grid[y0:y1, x0:x1] += appeal * kernel[y0 - cy + r:y1 - cy + r, x0 - cx + r:x1 - cx + r]
+            return
+        for y in range(y0, y1):
+            row = self.kernel[y - cy + r]
+            for x in range(x0, x1):
+                self.grid[y][x] += appeal * row[x - cx + r]
+
+    def add_decoration(self, decoration):
+        cell = self.cell_of(decoration.x + decoration.width // 2, decoration.y + decoration.height // 2)
+        appeal = decoration.template["appeal"]
+        self.sources[cell] = self.sources.get(cell, 0.0) + appeal
+        self._patch(cell, appeal)
+        return cell
+
+    def get_bonus(self, x, y):
+        """ Bonus income (fraksi, 0..max_bonus) untuk toko di posisi internal (x, y) """
+        cx, cy = self.cell_of(x, y)
+        if not (0 <= cx < self.slots_x and 0 <= cy < self.slots_y):
+            return 0.0
+        value = float(self.grid[cy][cx])
+        return min(value, self.max_bonus)
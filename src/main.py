@@ -1,19 +1,31 @@
+import sys
 import pygame
 import random
-import time
+import heapq
+import collections
+import game_clock
 
 from mall import Mall
 from quest import Quest
-from customer import Customer, CustomerState
+from customer import Customer, CustomerPool, IN_MALL_STATES
 from shop import Shop, ShopType, SHOP_TEMPLATES
 from decoration import Decoration, DecorationType, DECORATION_TEMPLATES
 from save_manager import SaveManager
+from demand_model import DemandModel
+from influence_map import InfluenceMap
+from world_chunks import ChunkedWorld, CHUNK_SIZE
+from mipmap import ZOOM_LEVELS, FLAT_DETAIL_LEVEL
+from simulation_thread import SimulationThread
+from render_queue import RenderQueue
+from ui_panel import UIPanel, VirtualList, WidgetRegistry, PANEL_SHADOW
+from minimap import Minimap
+from metrics import MetricsStore
+from particles import ParticleSystem, PARTICLE_CAPACITY
 from sound_manager import SoundManager
+from bootstrap import bootstrap
 from main_menu import MainMenu
 from color import *
 
-pygame.init() 
-
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
 FPS = 60    
@@ -21,20 +33,61 @@ FPS = 60
 TILE_SIZE = 50
 SHOP_GRID_SIZE = 100 
 BORDER_THICKNESS = 15
+# Customer di luar layar dicek untuk ditidurkan (LOD) tiap sekian frame
+LOD_CHECK_INTERVAL = 8
+# Lantai pada zoom jauh (petak chunk datar)
+FLAT_FLOOR_COLOR = (235, 225, 215)
+# Batas jumlah petak chunk datar yang di-cache sebelum cache dikosongkan
+CHUNK_TILE_CACHE_SIZE = 1024
+# Progress bar produksi hanya digambar sampai level zoom ini (lebih jauh tidak terbaca)
+PROGRESS_BAR_MAX_LEVEL = 1
+# Geser kamera kontinu: kecepatan tombol panah / tepi layar (px layar per detik)
+PAN_SPEED = 600
+# Lebar zona di tepi layar yang menggeser kamera saat kursor ada di sana
+EDGE_SCROLL_MARGIN = 20
+# Posisi tengah-atas pintu masuk di dalam sprite pintu (papan nama menonjol ke atas)
+ENTRANCE_SPRITE_OFFSET = (60, 22)
+# Tombol toolbar HUD: (teks, panel yang dibuka, x, lebar, warna); semuanya y=10 tinggi 40
+TOOLBAR_BUTTONS = (
+    ("Build", "shop", 650, 80, BLUE),
+    ("Quest", "quest", 740, 80, PURPLE),
+    ("Deco", "decorate", 830, 70, GREEN),
+    ("Info", "info", 910, 70, ORANGE),
+    ("Expand", "expand", 990, 90, RED),
+    ("Save", "save", 1090, 100, (50, 150, 200)),
+)
+# Flag tampil tiap panel menu, sesuai urutan prioritas jika (seharusnya tidak) ada dua yang terbuka
+MENU_FLAGS = (("shop", "show_shop_menu"), ("decorate", "show_decorate_menu"), ("quest", "show_quest_menu"),
+              ("info", "show_mall_info"), ("expand", "show_expand_menu"), ("save", "show_save_menu"),
+              ("stats", "show_stats_menu"))
 
 class Game:
-    def __init__(self, save_slot=1, load_from_save=False):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Cozy Idle Builder")
+    def __init__(self, save_slot=1, load_from_save=False, headless=False,
+                 screen=None, sound_manager=None, save_manager=None, threaded_simulation=False):
+        # headless: tanpa jendela, suara dan autosave (dipakai simulator)
+        # screen/sound_manager/save_manager: instance bersama dari bootstrap, dibuat sendiri jika None
+        # threaded_simulation: update() di thread sendiri, run() menggambar dari snapshot
+        self.headless = headless
+        self.threaded_simulation = threaded_simulation
+        self.sim_thread = None
+        # Sumber data untuk menggambar: Game sendiri, atau WorldSnapshot di mode thread
+        self.view = self
+        if screen is not None:
+            self.screen = screen
+        elif headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Cozy Idle Builder")
         self.clock = pygame.time.Clock()
         self.running = True
         
-        self.save_manager = SaveManager()
+        self.save_manager = save_manager if save_manager is not None else SaveManager()
         self.save_slot = save_slot
-        self.last_autosave = time.time()
-        self.autosave_interval = 30
+        self.last_autosave = game_clock.now()
+        self.autosave_interval = None if headless else 30
         
-        self.sound_manager = SoundManager()
+        self.sound_manager = sound_manager if sound_manager is not None else SoundManager(enabled=not headless)
         
         if load_from_save:
             self.load_game_data()
@@ -54,19 +107,55 @@ class Game:
         self.show_mall_info = False
         self.show_expand_menu = False
         self.show_save_menu = False
+        self.show_stats_menu = False
+        # *** BARU: minimap seluruh mall di pojok kanan bawah (tombol M) ***
+        self.show_minimap = True
+        self.minimap = Minimap()
+        # *** BARU: efek payout. Simulasi hanya mengantrikan (x, y, income); partikel dibuat
+        # dan digerakkan di sisi gambar. Headless tidak menggambar, jadi tidak mengantri ***
+        self.particles = ParticleSystem()
+        self.payout_events = None if headless else collections.deque(maxlen=PARTICLE_CAPACITY)
+        self.particle_time = None
         
         self.shop_scroll_y = 0
         self.decorate_scroll_y = 0
         self.quest_scroll_y = 0
         
-        self.close_button_rect = pygame.Rect(0, 0, 24, 24)
+        self.hovered_widget = None
+        # *** BARU: sel grid (internal) tempat tarikan penempatan massal dimulai ***
+        self.placement_drag_start = None
 
         self.font_small = pygame.font.Font(None, 20)
         self.font_medium = pygame.font.Font(None, 28)
         self.font_large = pygame.font.Font(None, 36)
+        self.init_panels()
         
-        self.last_customer_spawn = time.time()
+        # Gambar customer disiapkan sekarang agar spawn pertama tidak tersendat
+        Customer.load_images()
+        self.last_customer_spawn = game_clock.now()
         self.customer_spawn_interval = 3
+        self.customer_pool = CustomerPool()
+        
+        # *** BARU: Level-of-detail simulasi. Customer di luar layar "tidur" dan dilompati
+        # secara analitis sampai frame event berikutnya atau saat terlihat di layar ***
+        self.simulation_lod = True
+        self.frame = 0
+        self.awake_customers = list(self.customers)
+        self.lod_frame_heap = []
+        self.lod_wait_heap = []
+        self.lod_seq = 0
+        self.lod_camera = (self.camera_x, self.camera_y, self.zoom_level)
+        self.lod_views = self.get_lod_views()
+        self.render_queue = RenderQueue()
+        self.floor_cache = {}
+        self.chunk_tile_cache = {}
+        # *** BARU: Lapisan dunia statis (jalan, lantai, toko, dekorasi) di buffer sendiri.
+        # Saat kamera bergeser buffer di-scroll dan hanya strip yang baru terlihat digambar ulang ***
+        self.world_buffer = pygame.Surface(self.screen.get_size())
+        self.world_buffer_key = None
+        self.world_buffer_camera = None
+        self.world_redraw_area = 0
+        self.entrance_sprites = {}
     
     def init_new_game(self):
         self.coins = 2000
@@ -77,9 +166,18 @@ class Game:
         self.mall = Mall(800, 500)
         self.camera_x = 0
         self.camera_y = 0
+        self.zoom_level = 0
         self.shops = []
         self.customers = []
         self.decorations = []
+        self.influence = InfluenceMap(*self.mall.get_shop_slots())
+        self.demand = DemandModel(self.influence)
+        self.chunks = ChunkedWorld(ShopType)
+        self.production_heap = []
+        # Naik setiap isi dunia statis berubah (bangun, dekorasi, perluas) agar buffer dunia digambar ulang
+        self.world_revision = 0
+        # *** BARU: riwayat statistik (ring buffer per deret) ***
+        self.metrics = MetricsStore(ShopType)
         self.init_quests()
     
     def init_quests(self):
@@ -137,6 +235,7 @@ class Game:
         
         success = self.save_manager.save_game(game_data, self.save_slot)
         if success:
+            self.save_manager.save_metrics(self.metrics.to_bytes(), self.save_slot)
             self.sound_manager.play_sfx('click')
             print(f"✓ Game saved to slot {self.save_slot}!")
         return success
@@ -161,6 +260,7 @@ class Game:
         
         self.camera_x = 0
         self.camera_y = 0
+        self.zoom_level = 0
         
         self.shops = []
         for shop_data in game_data.get('shops', []):
@@ -198,8 +298,34 @@ class Game:
             self.init_quests()
         
         self.customers = []
+        self.influence = InfluenceMap(*self.mall.get_shop_slots())
+        for decoration in self.decorations:
+            self.influence.add_decoration(decoration)
+        self.demand = DemandModel(self.influence, self.shops)
+        self.chunks = ChunkedWorld(ShopType, self.shops, self.decorations)
+        self.production_heap = []
+        self.world_revision = 0
+        for shop in self.shops:
+            self.schedule_production(shop)
+        self.metrics = MetricsStore(ShopType)
+        metrics_data = self.save_manager.load_metrics(self.save_slot)
+        if metrics_data is not None and not self.metrics.load_bytes(metrics_data):
+            print("⚠ Metrics history incompatible, starting fresh")
         print(f"✓ Game loaded from slot {self.save_slot}!")
     
+    def progress_quests(self, keyword, amount=1, cap_at_target=False):
+        """
+        Menambah progres semua quest aktif yang deskripsinya memuat keyword.
+        cap_at_target: progres massal (build_area) berhenti di target, sama seperti satu per satu
+        """
+        completed = False
+        for quest in self.quests:
+            if keyword in quest.description.lower() and not quest.completed:
+                quest.update_progress(min(amount, quest.target - quest.progress) if cap_at_target else amount)
+                completed = completed or quest.completed
+        if completed:
+            self.sound_manager.play_sfx('quest_complete')
+
     def add_xp(self, amount):
         old_level = self.level
         self.xp += amount
@@ -211,650 +337,1378 @@ class Game:
         if self.level > old_level:
             self.sound_manager.play_sfx('levelup')
     
+    @property
+    def customer_count(self):
+        return len(self.customers)
+
+    @property
+    def shop_count(self):
+        return len(self.shops)
+
+    def get_queue_summary(self):
+        """ Jumlah customer antre di semua toko dan rata-rata waktu tunggu (detik) """
+        waiting = sum(len(shop.queue) for shop in self.shops)
+        visits = sum(shop.visits for shop in self.shops)
+        total_wait = sum(shop.total_wait for shop in self.shops)
+        return waiting, (total_wait / visits if visits else 0.0)
+
+    def get_customer_density(self):
+        """ Jumlah customer di dalam mall per slot grid toko, untuk heatmap minimap """
+        density = {}
+        for customer in self.customers:
+            if customer.in_mall():
+                if customer.sleep_frame is None:
+                    x, y = customer.x, customer.y
+                else:
+                    # Customer tidur (LOD) posisinya beku; pakai posisi analitiknya saat ini
+                    x, y = customer.position_after(self.frame - customer.sleep_frame)
+                cell = (int(x // SHOP_GRID_SIZE), int(y // SHOP_GRID_SIZE))
+                density[cell] = density.get(cell, 0) + 1
+        return density
+
+    # ================= KAMERA & ZOOM =================
+    # Layar = kamera + dunia * zoom. Dunia memakai koordinat tata letak asli
+    # (mall dimulai di y=170), jadi simulasi tidak tahu apa-apa soal zoom.
+    @property
+    def zoom(self):
+        return ZOOM_LEVELS[self.zoom_level]
+
+    def get_internal_offset(self):
+        """ Posisi layar titik (0, 0) internal mall (integer: hasil scroll buffer harus sama persis) """
+        zoom = self.zoom
+        return (self.camera_x + int(BORDER_THICKNESS * zoom),
+                self.camera_y + int((170 + BORDER_THICKNESS) * zoom))
+
+    def screen_to_internal(self, pos):
+        offset_x, offset_y = self.get_internal_offset()
+        return (int((pos[0] - offset_x) // self.zoom), int((pos[1] - offset_y) // self.zoom))
+
+    def clamp_camera(self):
+        zoom = self.zoom
+        mall = self.view.mall
+        min_x = min(0, SCREEN_WIDTH - (mall.width + BORDER_THICKNESS * 2) * zoom)
+        min_y = min(0, SCREEN_HEIGHT - (170 + mall.height + BORDER_THICKNESS * 2) * zoom)
+        self.camera_x = int(max(min_x, min(self.camera_x, 0)))
+        self.camera_y = int(max(min_y, min(self.camera_y, 0)))
+
+    def center_camera_on(self, internal_x, internal_y):
+        """ Menggeser kamera agar titik internal mall ada di tengah layar """
+        zoom = self.zoom
+        self.camera_x = SCREEN_WIDTH // 2 - int(BORDER_THICKNESS * zoom) - int(internal_x * zoom)
+        self.camera_y = SCREEN_HEIGHT // 2 - int((170 + BORDER_THICKNESS) * zoom) - int(internal_y * zoom)
+        self.clamp_camera()
+
+    def pan_camera(self, dx, dy):
+        self.camera_x += dx
+        self.camera_y += dy
+        self.clamp_camera()
+
+    def scroll_camera(self, dt):
+        """ *** BARU: Geser kontinu selama tombol panah ditahan atau kursor di tepi layar *** """
+        keys = pygame.key.get_pressed()
+        dx = keys[pygame.K_LEFT] - keys[pygame.K_RIGHT]
+        dy = keys[pygame.K_UP] - keys[pygame.K_DOWN]
+        if self.get_open_menu() is None and pygame.mouse.get_focused():
+            mx, my = pygame.mouse.get_pos()
+            if mx < EDGE_SCROLL_MARGIN:
+                dx += 1
+            elif mx >= SCREEN_WIDTH - EDGE_SCROLL_MARGIN:
+                dx -= 1
+            # Tepi atas dihitung dari bawah bar UI supaya tombol tetap bisa diklik
+            if 60 <= my < 60 + EDGE_SCROLL_MARGIN:
+                dy += 1
+            elif my >= SCREEN_HEIGHT - EDGE_SCROLL_MARGIN:
+                dy -= 1
+        dx = max(-1, min(dx, 1))
+        dy = max(-1, min(dy, 1))
+        if dx or dy:
+            self.pan_camera(round(dx * PAN_SPEED * dt), round(dy * PAN_SPEED * dt))
+
+    def set_zoom_level(self, level, anchor=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)):
+        """ Ganti level zoom dengan titik dunia di bawah anchor (posisi layar) tetap di tempatnya """
+        level = max(0, min(level, len(ZOOM_LEVELS) - 1))
+        if level == self.zoom_level:
+            return
+        old_zoom = self.zoom
+        world_x = (anchor[0] - self.camera_x) / old_zoom
+        world_y = (anchor[1] - self.camera_y) / old_zoom
+        self.zoom_level = level
+        self.camera_x = round(anchor[0] - world_x * self.zoom)
+        self.camera_y = round(anchor[1] - world_y * self.zoom)
+        self.clamp_camera()
+
+    # ================= CHUNK & PRODUKSI =================
+    def get_view_rect(self, margin=0):
+        """ Area layar dalam koordinat internal mall (left, top, right, bottom) """
+        zoom = self.zoom
+        left = -self.camera_x / zoom - BORDER_THICKNESS - margin
+        top = -self.camera_y / zoom - 170 - BORDER_THICKNESS - margin
+        return (left, top, left + SCREEN_WIDTH / zoom + 2 * margin, top + SCREEN_HEIGHT / zoom + 2 * margin)
+
+    def get_visible_entities(self):
+        """ Toko dan dekorasi di chunk yang terlihat kamera (margin satu slot untuk sprite) """
+        return self.get_entities_in_rect(self.get_view_rect(SHOP_GRID_SIZE))
+
+    def get_entities_in_rect(self, rect, world=None):
+        """ world: ChunkedWorld yang dibaca (default dunia simulasi sendiri) """
+        world = world if world is not None else self.chunks
+        shops, decorations = [], []
+        for chunk in world.chunks_in_rect(*rect):
+            shops.extend(chunk.shops)
+            decorations.extend(chunk.decorations)
+        return shops, decorations
+
+    def get_shop_views(self):
+        """ *** BARU: ShopView toko yang terlihat (progress bar); WorldSnapshot menyimpan hasil yang sama *** """
+        return tuple(shop.get_view() for shop in self.get_visible_entities()[0])
+
+    def get_customer_views(self):
+        """ *** BARU: CustomerView customer yang bangun (yang tidur pasti di luar layar) *** """
+        return tuple(customer.get_view() for customer in self.awake_customers)
+
+    def get_area_rect(self, area, margin=0):
+        """ Persegi layar (pygame.Rect) dalam koordinat internal mall (left, top, right, bottom) """
+        offset_x, offset_y = self.get_internal_offset()
+        zoom = self.zoom
+        return ((area.left - offset_x) / zoom - margin, (area.top - offset_y) / zoom - margin,
+                (area.right - offset_x) / zoom + margin, (area.bottom - offset_y) / zoom + margin)
+
+    def schedule_production(self, shop):
+        # Toko dicek hanya saat produksinya selesai, bukan setiap frame
+        if shop.is_producing:
+            ready_at = shop.production_start + shop.template["production_time"]
+            heapq.heappush(self.production_heap, (ready_at, id(shop), shop))
+
+    def submit(self, name, *args):
+        """
+        *** BARU: Menjalankan aksi simulasi dari input. Di mode thread aksi diantrikan
+        ke thread simulasi dan hasilnya None; tanpa thread langsung dijalankan.
+        """
+        if self.sim_thread is not None:
+            self.sim_thread.submit(name, *args)
+            return None
+        return getattr(self, name)(*args)
+    
     def spawn_customer(self):
         if len(self.shops) > 0:
-            target_shop = random.choice(self.shops)
-            mall_entrance_x = self.mall.entrance_x + BORDER_THICKNESS
+            # *** DIUBAH: target dipilih sesuai bobot demand (O(log n)), bukan seragam ***
+            target_shop = self.demand.sample(random.random())
+            # *** DIUBAH: customer diarahkan ke pintu terdekat dari toko tujuannya ***
+            entrance = self.mall.get_nearest_entrance(target_shop.x + target_shop.width // 2)
+            mall_entrance_x = entrance.x + BORDER_THICKNESS
             mall_entrance_y = 170 + BORDER_THICKNESS 
-            customer = Customer(target_shop, mall_entrance_x, mall_entrance_y)
+            customer = self.customer_pool.acquire(target_shop, mall_entrance_x, mall_entrance_y, entrance)
             self.customers.append(customer)
+            self.awake_customers.append(customer)
     
+    # ================= LEVEL OF DETAIL CUSTOMER =================
+    def get_lod_views(self):
+        """ Area layar (+margin sprite) dalam koordinat dunia dan koordinat internal mall """
+        margin = 50
+        zoom = self.zoom
+        world = (-self.camera_x / zoom - margin, -self.camera_y / zoom - margin,
+                 (SCREEN_WIDTH - self.camera_x) / zoom + margin, (SCREEN_HEIGHT - self.camera_y) / zoom + margin)
+        inner_x = BORDER_THICKNESS
+        inner_y = 170 + BORDER_THICKNESS
+        mall = (world[0] - inner_x, world[1] - inner_y, world[2] - inner_x, world[3] - inner_y)
+        return world, mall
+
+    def get_customer_view(self, customer):
+        world, mall = self.lod_views
+        return mall if customer.in_mall() else world
+
+    def sleep_customer(self, customer, frame=None):
+        """
+        Menidurkan customer di luar layar sampai frame event berikutnya atau saat ia masuk layar.
+        frame: frame terakhir yang sudah diproses customer (default frame ini).
+        """
+        if frame is None:
+            frame = self.frame
+        self.lod_seq += 1
+        customer.sleep_frame = frame
+        customer.sleep_token = self.lod_seq
+        frames = customer.frames_until_event()
+        if frames is None:
+            # Sedang di toko: bangun saat game_clock.now() melewati wake_time()
+            heapq.heappush(self.lod_wait_heap, (customer.wake_time(), self.lod_seq, customer))
+            return
+        wake_frame = frame + frames + 1
+        visible_in = customer.frames_until_visible(self.get_customer_view(customer))
+        if visible_in is not None:
+            wake_frame = min(wake_frame, frame + visible_in)
+        heapq.heappush(self.lod_frame_heap, (wake_frame, self.lod_seq, customer))
+
+    def is_customer_in_view(self, customer):
+        left, top, right, bottom = self.get_customer_view(customer)
+        return left <= customer.x <= right and top <= customer.y <= bottom
+
+    def rekey_sleepers(self):
+        """
+        Kamera bergeser: customer tidur dicek terhadap view yang baru. Yang kini terlihat
+        dibangunkan; sisanya dijadwalkan ulang (frame masuk layar dihitung dari view baru)
+        tanpa di-step, jadi geser kamera tidak membuat seluruh kerumunan bangun.
+        """
+        sleepers = [customer for _, token, customer in self.lod_frame_heap if customer.sleep_token == token]
+        self.lod_frame_heap.clear()
+        for customer in sleepers:
+            # Kejar posisi analitik sampai frame sebelumnya; jadwal lama dihitung dari view lama
+            customer.advance(self.frame - customer.sleep_frame - 1)
+            customer.sleep_frame = self.frame - 1
+            if self.is_customer_in_view(customer):
+                self.wake_customer(customer)
+            else:
+                self.sleep_customer(customer, self.frame - 1)
+        # Customer yang menunggu di toko/pintu diam di tempat: cukup bangunkan yang terlihat
+        for _, token, customer in self.lod_wait_heap:
+            if customer.sleep_token == token and self.is_customer_in_view(customer):
+                self.wake_customer(customer)
+
+    def wake_customer(self, customer):
+        # Frame yang terlewat dilompati sekaligus; update() frame ini memproses event-nya
+        customer.advance(self.frame - customer.sleep_frame - 1)
+        customer.sleep_frame = None
+        customer.sleep_token = None
+        self.awake_customers.append(customer)
+
+    def wake_due_customers(self, now):
+        camera = (self.camera_x, self.camera_y, self.zoom_level)
+        if camera != self.lod_camera:
+            # Kamera bergeser: hanya customer tidur yang kini terlihat yang dibangunkan
+            self.lod_camera = camera
+            self.lod_views = self.get_lod_views()
+            self.rekey_sleepers()
+        heap = self.lod_frame_heap
+        while heap and heap[0][0] <= self.frame:
+            _, token, customer = heapq.heappop(heap)
+            if customer.sleep_token == token:
+                self.wake_customer(customer)
+        heap = self.lod_wait_heap
+        while heap and now >= heap[0][0]:
+            _, token, customer = heapq.heappop(heap)
+            if customer.sleep_token == token:
+                self.wake_customer(customer)
+
     def update(self):
-        if time.time() - self.last_autosave > self.autosave_interval:
+        now = game_clock.now()
+        if self.autosave_interval and now - self.last_autosave > self.autosave_interval:
             self.save_game_data()
-            self.last_autosave = time.time()
+            self.last_autosave = now
         
-        if time.time() - self.last_customer_spawn > self.customer_spawn_interval:
+        if now - self.last_customer_spawn > self.customer_spawn_interval:
             self.spawn_customer()
-            self.last_customer_spawn = time.time()
-        
-        for customer in self.customers[:]:
+            self.last_customer_spawn = now
+        
+        self.frame += 1
+        self.wake_due_customers(now)
+        for entrance in self.mall.entrances:
+            entrance.update(now)
+        
+        # *** DIUBAH: hanya customer yang bangun (terlihat / sedang ada event) yang di-step ***
+        still_awake = []
+        removed = set()
+        world_view, mall_view = self.lod_views
+        # Visibilitas cukup dicek tiap beberapa frame; tidur lebih lambat tetap exact
+        check_visibility = self.simulation_lod and self.frame % LOD_CHECK_INTERVAL == 0
+        for customer in self.awake_customers:
             customer.update()
             if customer.should_remove():
-                self.customers.remove(customer)
                 if customer.has_purchased:
                     self.sound_manager.play_sfx('happy')
-                    for quest in self.quests:
-                        if "customers" in quest.description.lower() and not quest.completed:
-                            quest.update_progress(1)
-                            if quest.completed:
-                                self.sound_manager.play_sfx('quest_complete')
-        
-        for shop in self.shops:
-            income = shop.collect_income()
+                    self.progress_quests("customers")
+                self.customer_pool.release(customer)
+                removed.add(id(customer))
+                continue
+            if check_visibility:
+                # Cek visibilitas inline: jalur terpanas saat banyak customer di layar
+                left, top, right, bottom = mall_view if customer.state in IN_MALL_STATES else world_view
+                if not (left <= customer.x <= right and top <= customer.y <= bottom):
+                    self.sleep_customer(customer)
+                    continue
+            still_awake.append(customer)
+        self.awake_customers = still_awake
+        if removed:
+            self.customers = [c for c in self.customers if id(c) not in removed]
+        
+        # *** DIUBAH: hanya toko yang produksinya jatuh tempo yang diproses (heap), O(k log n) ***
+        heap = self.production_heap
+        retry = []
+        while heap and heap[0][0] <= now:
+            _, _, shop = heapq.heappop(heap)
+            income = shop.collect_income(self.influence)
             if income > 0:
                 self.coins += income
                 self.sound_manager.play_sfx('coin')
                 shop.start_production()
+                self.schedule_production(shop)
                 shop.customers_served += 1
-                for quest in self.quests:
-                    if "earn" in quest.description.lower() and not quest.completed:
-                        quest.update_progress(income)
-                        if quest.completed:
-                            self.sound_manager.play_sfx('quest_complete')
+                self.metrics.add_income(shop.type, income)
+                if self.payout_events is not None:
+                    self.payout_events.append((shop.x + shop.width // 2, shop.y + 20, income))
+                self.progress_quests("earn", income)
+            elif shop.is_producing:
+                # Pembulatan float: progres belum tepat 100%, cek lagi frame berikutnya
+                retry.append(shop)
+        for shop in retry:
+            heapq.heappush(heap, (now, id(shop), shop))
+        
+        self.metrics.tick(now, self)
+        
+        # Semua sfx frame ini digabung dan diputar sekaligus sesuai budget suara
+        self.sound_manager.flush_sfx()
     
-    def draw_road_and_environment(self):
-        pygame.draw.rect(self.screen, ROAD_GRAY, (0, 60, SCREEN_WIDTH, 80))
-        for i in range(0, SCREEN_WIDTH, 60): 
-            pygame.draw.rect(self.screen, YELLOW, (i, 95, 40, 5))
-        pygame.draw.rect(self.screen, SIDEWALK, (0, 140, SCREEN_WIDTH, 30))
-        for i in range(0, SCREEN_WIDTH, 150):
-            pygame.draw.rect(self.screen, BROWN, (i + 20, 45, 8, 15))
-            pygame.draw.circle(self.screen, DARK_GREEN, (i + 24, 42), 12)
+    def draw_road_and_environment(self, surface):
+        # *** DIUBAH: jalan ikut transform kamera/zoom seperti customer yang berjalan di atasnya ***
+        zoom = self.zoom
+        top = self.camera_y
+        pygame.draw.rect(surface, ROAD_GRAY, (0, top + int(60 * zoom), SCREEN_WIDTH, int(80 * zoom)))
+        pygame.draw.rect(surface, SIDEWALK, (0, top + int(140 * zoom), SCREEN_WIDTH, int(30 * zoom)))
+        if self.zoom_level >= FLAT_DETAIL_LEVEL:
+            return
+        # Marka dan pohon ditambatkan ke dunia (bukan ke layar) agar strip hasil scroll menyambung
+        step = int(60 * zoom)
+        for i in range(self.camera_x % step - step, SCREEN_WIDTH, step): 
+            pygame.draw.rect(surface, YELLOW, (i, top + int(95 * zoom), int(40 * zoom), int(5 * zoom)))
+        step = int(150 * zoom)
+        for i in range(self.camera_x % step - step, SCREEN_WIDTH, step):
+            pygame.draw.rect(surface, BROWN, (i + int(20 * zoom), top + int(45 * zoom), int(8 * zoom), int(15 * zoom)))
+            pygame.draw.circle(surface, DARK_GREEN, (i + int(24 * zoom), top + int(42 * zoom)), int(12 * zoom))
     
-    def draw_mall_building(self):
+    def get_floor_surface(self, width, height, level=0):
+        """ Lantai kotak-kotak seukuran satu chunk; chunk berukuran sama memakai surface yang sama """
+        key = (width, height, level)
+        floor = self.floor_cache.get(key)
+        if floor is None:
+            if level > 0:
+                # Mip lantai diskalakan sekali dari lantai 1:1, bukan tiap frame
+                zoom = ZOOM_LEVELS[level]
+                size = (max(1, round(width * zoom)), max(1, round(height * zoom)))
+                floor = pygame.transform.scale(self.get_floor_surface(width, height), size)
+            else:
+                floor = pygame.Surface((width, height))
+                for i in range(0, width // TILE_SIZE + 1):
+                    for j in range(0, height // TILE_SIZE + 1):
+                        color = (240, 230, 220) if (i + j) % 2 == 0 else (230, 220, 210)
+                        pygame.draw.rect(floor, color, (i * TILE_SIZE, j * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+            self.floor_cache[key] = floor
+        return floor
+
+    def get_chunk_tile(self, chunk, width, height, level):
+        """
+        *** BARU: Satu chunk sebagai petak datar untuk zoom jauh: lantai polos, toko
+        jadi kotak warna tipe toko, dekorasi jadi titik. Dibuat ulang hanya jika isi
+        chunk (version) atau ukurannya berubah.
+        """
+        # version dibaca dulu: di mode thread chunk bisa bertambah saat petak sedang dibuat
+        signature = (chunk.version, width, height)
+        key = (chunk.cx, chunk.cy, level)
+        entry = self.chunk_tile_cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        if len(self.chunk_tile_cache) >= CHUNK_TILE_CACHE_SIZE:
+            self.chunk_tile_cache.clear()
+        zoom = ZOOM_LEVELS[level]
+        tile = pygame.Surface((max(1, round(width * zoom)), max(1, round(height * zoom))))
+        tile.fill(FLAT_FLOOR_COLOR)
+        origin_x = chunk.cx * CHUNK_SIZE
+        origin_y = chunk.cy * CHUNK_SIZE
+        shop_size = max(1, round(SHOP_GRID_SIZE * zoom))
+        for shop in list(chunk.shops):
+            rect = pygame.Rect(round((shop.x - origin_x) * zoom), round((shop.y - origin_y) * zoom), shop_size, shop_size)
+            tile.fill(SHOP_TEMPLATES[shop.type]["color"], rect)
+            if shop_size >= 8:
+                pygame.draw.rect(tile, BLACK, rect, 1)
+        for decoration in list(chunk.decorations):
+            dot_size = max(1, round(decoration.width * zoom))
+            tile.fill(decoration.template["color"], (round((decoration.x - origin_x) * zoom),
+                                                     round((decoration.y - origin_y) * zoom), dot_size, dot_size))
+        self.chunk_tile_cache[key] = (signature, tile)
+        return tile
+
+    def draw_mall_building(self, surface, area):
+        """ Dinding, lantai dan pintu mall; chunk lantai hanya yang beririsan dengan area (persegi layar) """
         mall_y_start = 170
+        zoom = self.zoom
+        mall = self.view.mall
         view_x = self.camera_x
-        view_y = self.camera_y + mall_y_start
-        pygame.draw.rect(self.screen, BROWN, (view_x, view_y, self.mall.width + (BORDER_THICKNESS*2), BORDER_THICKNESS))
-        pygame.draw.rect(self.screen, BROWN, (view_x, view_y, BORDER_THICKNESS, self.mall.height + (BORDER_THICKNESS*2)))
-        pygame.draw.rect(self.screen, BROWN, (view_x + self.mall.width + BORDER_THICKNESS, view_y, BORDER_THICKNESS, self.mall.height + (BORDER_THICKNESS*2)))
-        pygame.draw.rect(self.screen, BROWN, (view_x, view_y + self.mall.height + BORDER_THICKNESS, self.mall.width + (BORDER_THICKNESS*2), BORDER_THICKNESS))
-        internal_view_x = view_x + BORDER_THICKNESS
-        internal_view_y = view_y + BORDER_THICKNESS
-        start_tile_x = max(0, -internal_view_x // TILE_SIZE)
-        start_tile_y = max(0, -internal_view_y // TILE_SIZE)
-        for i in range(start_tile_x, start_tile_x + self.mall.width // TILE_SIZE + 2):
-            for j in range(start_tile_y, start_tile_y + self.mall.height // TILE_SIZE + 2):
-                if i*TILE_SIZE < self.mall.width and j*TILE_SIZE < self.mall.height:
-                    tile_x = i * TILE_SIZE + internal_view_x
-                    tile_y = j * TILE_SIZE + internal_view_y
-                    color = (240, 230, 220) if (i + j) % 2 == 0 else (230, 220, 210)
-                    pygame.draw.rect(self.screen, color, (tile_x, tile_y, TILE_SIZE, TILE_SIZE))
-        entrance_width = 80
-        entrance_x = view_x + BORDER_THICKNESS + self.mall.entrance_x - entrance_width // 2
-        entrance_y = view_y 
-        pygame.draw.rect(self.screen, (139, 90, 43), (entrance_x - 10, entrance_y, entrance_width + 20, BORDER_THICKNESS + 10))
-        pygame.draw.rect(self.screen, (101, 67, 33), (entrance_x, entrance_y, entrance_width, BORDER_THICKNESS + 5), border_radius=5)
-        glass_width = entrance_width - 20
-        pygame.draw.rect(self.screen, LIGHT_BLUE, (entrance_x + 10, entrance_y + 2, glass_width, 8), border_radius=3)
-        sign_text = self.font_small.render("MALL ENTRANCE", True, WHITE)
-        sign_rect = pygame.Rect(entrance_x + entrance_width // 2 - 60, entrance_y - 22, 120, 20)
-        pygame.draw.rect(self.screen, RED, sign_rect, border_radius=5)
-        pygame.draw.rect(self.screen, BLACK, sign_rect, 2, border_radius=5)
-        self.screen.blit(sign_text, (entrance_x + entrance_width // 2 - 55, entrance_y - 20))
+        view_y = self.camera_y + int(mall_y_start * zoom)
+        outer_width = int((mall.width + BORDER_THICKNESS * 2) * zoom)
+        outer_height = int((mall.height + BORDER_THICKNESS * 2) * zoom)
+        border = max(1, int(BORDER_THICKNESS * zoom))
+        pygame.draw.rect(surface, BROWN, (view_x, view_y, outer_width, border))
+        pygame.draw.rect(surface, BROWN, (view_x, view_y, border, outer_height))
+        pygame.draw.rect(surface, BROWN, (view_x + outer_width - border, view_y, border, outer_height))
+        pygame.draw.rect(surface, BROWN, (view_x, view_y + outer_height - border, outer_width, border))
+        internal_view_x, internal_view_y = self.get_internal_offset()
+        # *** DIUBAH: lantai digambar per chunk yang terlihat dari surface yang sudah di-cache ***
+        # Zoom jauh: chunk digambar sebagai petak datar (lantai + toko + dekorasi sekaligus)
+        flat = self.zoom_level >= FLAT_DETAIL_LEVEL
+        left, top, right, bottom = self.get_area_rect(area)
+        world = self.view.chunks
+        for cx, cy in world.chunk_coords_in_rect(max(0, left), max(0, top),
+                                                 min(right, mall.width - 1), min(bottom, mall.height - 1)):
+            chunk_x = cx * CHUNK_SIZE
+            chunk_y = cy * CHUNK_SIZE
+            width = min(CHUNK_SIZE, mall.width - chunk_x)
+            height = min(CHUNK_SIZE, mall.height - chunk_y)
+            pos = (internal_view_x + round(chunk_x * zoom), internal_view_y + round(chunk_y * zoom))
+            if not flat:
+                surface.blit(self.get_floor_surface(width, height, self.zoom_level), pos)
+                continue
+            chunk = world.get_chunk(cx, cy)
+            if chunk is None:
+                surface.fill(FLAT_FLOOR_COLOR, (pos, (round(width * zoom), round(height * zoom))))
+            else:
+                surface.blit(self.get_chunk_tile(chunk, width, height, self.zoom_level), pos)
+        # *** DIUBAH: Gambar semua pintu masuk (sprite jadi, sama persis walau terpotong strip) ***
+        sprite = self.get_entrance_sprite(self.zoom_level)
+        for entrance in mall.entrances:
+            surface.blit(sprite, (internal_view_x + int((entrance.x - ENTRANCE_SPRITE_OFFSET[0]) * zoom),
+                                  view_y - int(ENTRANCE_SPRITE_OFFSET[1] * zoom)))
+
+    def get_entrance_sprite(self, level):
+        """
+        Pintu masuk + papan nama sebagai satu sprite per level zoom. Rounded rect
+        yang digambar langsung dengan clip strip hasilnya beda di tepi clip,
+        jadi pintu dirender sekali lalu hanya di-blit.
+        """
+        sprite = self.entrance_sprites.get(level)
+        if sprite is None:
+            entrance_width = 80
+            # Titik (ox, oy) di sprite = tengah pintu di tepi atas dinding mall
+            ox, oy = ENTRANCE_SPRITE_OFFSET
+            base = pygame.Surface((120, oy + BORDER_THICKNESS + 10), pygame.SRCALPHA)
+            entrance_x = ox - entrance_width // 2
+            pygame.draw.rect(base, (139, 90, 43), (entrance_x - 10, oy, entrance_width + 20, BORDER_THICKNESS + 10))
+            pygame.draw.rect(base, (101, 67, 33), (entrance_x, oy, entrance_width, BORDER_THICKNESS + 5), border_radius=5)
+            glass_width = entrance_width - 20
+            pygame.draw.rect(base, LIGHT_BLUE, (entrance_x + 10, oy + 2, glass_width, 8), border_radius=3)
+            if level == 0:
+                sign_rect = pygame.Rect(entrance_x + entrance_width // 2 - 60, oy - 22, 120, 20)
+                pygame.draw.rect(base, RED, sign_rect, border_radius=5)
+                pygame.draw.rect(base, BLACK, sign_rect, 2, border_radius=5)
+                base.blit(self.font_small.render("MALL ENTRANCE", True, WHITE), (entrance_x + entrance_width // 2 - 55, oy - 20))
+                sprite = base
+            else:
+                # Papan nama tidak terbaca saat zoom keluar
+                zoom = ZOOM_LEVELS[level]
+                sprite = pygame.transform.smoothscale(base, (max(1, round(120 * zoom)), max(1, round(base.get_height() * zoom))))
+            self.entrance_sprites[level] = sprite
+        return sprite
     
     def draw_ui(self):
-        pygame.draw.rect(self.screen, LIGHT_GRAY, (0, 0, SCREEN_WIDTH, 60))
-        pygame.draw.rect(self.screen, BLACK, (0, 0, SCREEN_WIDTH, 60), 2)
+        # *** DIUBAH: HUD dan menu adalah panel retained-mode; tiap frame cukup blit surface-nya ***
+        self.panels["hud"].draw(self.screen)
+        self.draw_minimap()
+        panel = self.get_open_panel()
+        if panel is not None:
+            panel.draw(self.screen)
+        self.panels["customers"].draw(self.screen)
+
+    def draw_minimap(self):
+        """ *** BARU: minimap dari grid okupansi, persegi kamera dan heatmap customer *** """
+        if not self.show_minimap:
+            return
+        slots_x, slots_y = self.view.mall.get_shop_slots()
+        self.minimap.update(self.view.chunks, self.view.world_revision, slots_x, slots_y, self.view.get_customer_density)
+        width, height = self.minimap.get_size()
+        # Di luar zona edge-scroll (EDGE_SCROLL_MARGIN) agar kursor di minimap tidak menggeser kamera
+        rect = pygame.Rect(SCREEN_WIDTH - 24 - width, SCREEN_HEIGHT - 24 - height, width, height)
+        widget = self.widgets.widgets.get("minimap")
+        if widget is None or widget.rect != rect:
+            # Ukuran minimap berubah saat mall diperluas
+            self.widgets.register("minimap", rect, "hud", self.click_minimap)
+        self.minimap.draw(self.screen, rect, self.get_view_rect())
+
+    def toggle_minimap(self):
+        self.show_minimap = not self.show_minimap
+        if not self.show_minimap:
+            self.widgets.unregister("minimap")
+
+    def get_open_menu(self):
+        for name, flag in MENU_FLAGS:
+            if getattr(self, flag):
+                return name
+        return None
+
+    def get_open_panel(self):
+        name = self.get_open_menu()
+        return None if name is None else self.panels[name]
+
+    def init_panels(self):
+        """ *** BARU: Panel UI beserta data yang diikatnya; panel hanya di-render ulang jika data itu berubah *** """
+        def menu_panel(width, height, menu_y, render, bind):
+            rect = ((SCREEN_WIDTH - width) // 2, menu_y, width + PANEL_SHADOW, height + PANEL_SHADOW)
+            return UIPanel(rect, render, bind)
+
+        # *** BARU: daftar kartu virtual; hanya baris yang terlihat yang digambar dan dicek kliknya ***
+        self.shop_menu_items = sorted(SHOP_TEMPLATES.items(), key=lambda item: item[1]['level_required'])
+        self.decorate_menu_items = [(dec_type, DECORATION_TEMPLATES[dec_type]) for dec_type in DecorationType]
+        self.shop_list = VirtualList((10, 70, 380, 450 - 90))
+        self.decorate_list = VirtualList((10, 70, 380, 450 - 90))
+        self.quest_list = VirtualList((10, 70, 430, 400 - 90))
+
+        self.panels = {
+            "hud": UIPanel((0, 0, SCREEN_WIDTH, 60), self.draw_hud,
+                           lambda: (self.view.coins, self.view.gems, self.view.level, self.view.xp, self.view.xp_to_next_level,
+                                    self.get_hovered_toolbar()),
+                           alpha=False),
+            "customers": UIPanel((10, SCREEN_HEIGHT - 25, 200, 20), self.draw_customer_count,
+                                 lambda: (self.view.customer_count,)),
+            "shop": menu_panel(400, 450, 80, self.draw_shop_menu,
+                               lambda: (self.view.level, self.shop_scroll_y)),
+            "decorate": menu_panel(400, 450, 80, self.draw_decorate_menu,
+                                   lambda: (self.decorate_scroll_y,)),
+            "quest": menu_panel(450, 400, 100, self.draw_quest_menu,
+                                self.get_quest_binding),
+            "info": menu_panel(400, 340, 150, self.draw_mall_info, self.get_mall_info_binding),
+            "expand": menu_panel(400, 300, 150, self.draw_expand_menu, self.get_expand_binding),
+            "save": menu_panel(350, 200, 200, self.draw_save_menu, lambda: (self.save_slot,)),
+            # Grafik hanya berubah saat ada sampel baru (sekali per METRICS_SAMPLE_INTERVAL)
+            "stats": menu_panel(600, 420, 100, self.draw_stats_menu, lambda: (self.view.metrics.samples,)),
+        }
+        self.stats_chart_buffers = {}
+        self.init_widgets()
+
+    def init_widgets(self):
+        """
+        *** BARU: Semua area yang bisa diklik didaftarkan sekali di sini, dari layout yang
+        sama dengan yang dipakai fungsi gambar, lalu handle_click cukup bertanya ke registry ***
+        """
+        # Posisi tombol di dalam panel menu (koordinat lokal), dipakai juga oleh fungsi gambarnya
+        self.save_button_rect = pygame.Rect(350 // 2 - 100, 120, 200, 50)
+        self.upgrade_button_rect = pygame.Rect(400 // 2 - 100, 230, 200, 40)
+        self.stats_button_rect = pygame.Rect(400 // 2 - 100, 285, 200, 40)
+
+        self.widgets = WidgetRegistry()
+        self.widgets.register("hud", (0, 0, SCREEN_WIDTH, 60), "hud", lambda pos: None, z=-1)
+        for text, menu, x, width, color in TOOLBAR_BUTTONS:
+            self.widgets.register("toolbar." + menu, (x, 10, width, 40), "hud",
+                                  lambda pos, menu=menu: self.toggle_menu(menu))
+
+        for name, panel in self.panels.items():
+            if name in ("hud", "customers"):
+                continue
+            left, top = panel.rect.topleft
+            # Badan panel menahan klik agar tidak tembus ke dunia di belakangnya
+            self.widgets.register(name, (left, top, panel.rect.width - PANEL_SHADOW, panel.rect.height - PANEL_SHADOW),
+                                  name, lambda pos: None, z=1)
+            self.widgets.register(name + ".close", (panel.rect.right - PANEL_SHADOW - 30, top + 6, 24, 24),
+                                  name, self.close_menus, z=2)
+
+        for name, menu_list, on_click in (("shop", self.shop_list, self.click_shop_card),
+                                          ("decorate", self.decorate_list, self.click_decoration_card),
+                                          ("quest", self.quest_list, lambda pos: None)):
+            self.widgets.register(name + ".list", menu_list.rect.move(self.panels[name].rect.topleft),
+                                  name, on_click, z=2)
+        self.widgets.register("save.button", self.save_button_rect.move(self.panels["save"].rect.topleft),
+                              "save", self.click_save_button, z=2)
+        self.widgets.register("info.button", self.stats_button_rect.move(self.panels["info"].rect.topleft),
+                              "info", lambda pos: self.toggle_menu("stats"), z=2)
+        self.widgets.register("expand.button", self.upgrade_button_rect.move(self.panels["expand"].rect.topleft),
+                              "expand", self.click_upgrade_button, z=2)
+
+        # Grup widget yang aktif untuk tiap menu yang terbuka (None = tidak ada menu)
+        self.active_widget_groups = {None: frozenset(("hud",))}
+        for name, flag in MENU_FLAGS:
+            self.active_widget_groups[name] = frozenset(("hud", name))
+
+    def get_quest_binding(self):
+        # Hanya progres quest yang terlihat; quest di luar layar tidak memicu render ulang
+        quests = self.view.quests
+        scroll_y = self.quest_list.clamp_scroll(self.quest_scroll_y, len(quests))
+        first, last = self.quest_list.visible_range(scroll_y, len(quests))
+        return (scroll_y, len(quests),
+                tuple((quests[i].progress, quests[i].completed) for i in range(first, last)))
+
+    def get_mall_info_binding(self):
+        mall = self.view.mall
+        waiting, avg_wait = self.view.get_queue_summary()
+        expand_cost = mall.get_expand_cost() if mall.can_expand() else None
+        # Rata-rata tunggu dibulatkan seperti yang ditampilkan, supaya tidak render ulang tiap tick
+        return (mall.width, mall.height, self.view.shop_count, len(mall.entrances),
+                waiting, round(avg_wait, 1), expand_cost)
+
+    def get_expand_binding(self):
+        mall = self.view.mall
+        if not mall.can_expand():
+            return (mall.width, mall.height, None)
+        cost = mall.get_expand_cost()
+        return (mall.width, mall.height, cost, self.view.coins >= cost)
+
+    def get_hovered_toolbar(self):
+        widget = self.hovered_widget
+        if widget is not None and widget.widget_id.startswith("toolbar."):
+            return widget.widget_id
+        return None
+
+    def draw_hud(self, surface):
+        pygame.draw.rect(surface, LIGHT_GRAY, (0, 0, SCREEN_WIDTH, 60))
+        pygame.draw.rect(surface, BLACK, (0, 0, SCREEN_WIDTH, 60), 2)
         
-        coin_text = self.font_medium.render(f"Coins: {self.coins}", True, BLACK)
-        pygame.draw.circle(self.screen, YELLOW, (20, 20), 12)
-        pygame.draw.circle(self.screen, ORANGE, (20, 20), 8)
-        pygame.draw.circle(self.screen, BLACK, (20, 20), 12, 2)
-        self.screen.blit(coin_text, (40, 10))
+        coin_text = self.font_medium.render(f"Coins: {self.view.coins}", True, BLACK)
+        pygame.draw.circle(surface, YELLOW, (20, 20), 12)
+        pygame.draw.circle(surface, ORANGE, (20, 20), 8)
+        pygame.draw.circle(surface, BLACK, (20, 20), 12, 2)
+        surface.blit(coin_text, (40, 10))
         
-        gem_text = self.font_medium.render(f"Gems: {self.gems}", True, BLACK)
+        gem_text = self.font_medium.render(f"Gems: {self.view.gems}", True, BLACK)
         points = [(220, 15), (230, 25), (220, 35), (210, 25)]
-        pygame.draw.polygon(self.screen, BLUE, points)
-        pygame.draw.polygon(self.screen, LIGHT_BLUE, [(215, 20), (220, 25), (215, 30), (210, 25)])
-        pygame.draw.polygon(self.screen, BLACK, points, 2)
-        self.screen.blit(gem_text, (240, 10))
+        pygame.draw.polygon(surface, BLUE, points)
+        pygame.draw.polygon(surface, LIGHT_BLUE, [(215, 20), (220, 25), (215, 30), (210, 25)])
+        pygame.draw.polygon(surface, BLACK, points, 2)
+        surface.blit(gem_text, (240, 10))
         
-        level_text = self.font_medium.render(f"Level {self.level}", True, BLACK)
-        self.screen.blit(level_text, (420, 10))
+        level_text = self.font_medium.render(f"Level {self.view.level}", True, BLACK)
+        surface.blit(level_text, (420, 10))
         xp_bar_width = 200
-        xp_progress = (self.xp / self.xp_to_next_level) * xp_bar_width
-        pygame.draw.rect(self.screen, DARK_GRAY, (420, 40, xp_bar_width, 15), border_radius=7)
-        pygame.draw.rect(self.screen, GREEN, (420, 40, xp_progress, 15), border_radius=7)
-        pygame.draw.rect(self.screen, BLACK, (420, 40, xp_bar_width, 15), 2, border_radius=7)
-        xp_text = self.font_small.render(f"{self.xp}/{self.xp_to_next_level} XP", True, WHITE)
-        self.screen.blit(xp_text, (450, 42))
-        
-        self.draw_button("Build", 650, 10, 80, 40, BLUE)
-        self.draw_button("Quest", 740, 10, 80, 40, PURPLE)
-        self.draw_button("Deco", 830, 10, 70, 40, GREEN)
-        self.draw_button("Info", 910, 10, 70, 40, ORANGE)
-        self.draw_button("Expand", 990, 10, 90, 40, RED)
-        self.draw_button("Save", 1090, 10, 100, 40, (50, 150, 200))
-
-        self.screen.set_clip(None)
-        if self.show_shop_menu:
-            self.draw_shop_menu()
-        if self.show_decorate_menu:
-            self.draw_decorate_menu()
-        if self.show_quest_menu:
-            self.draw_quest_menu()
-        if self.show_mall_info:
-            self.draw_mall_info()
-        if self.show_expand_menu:
-            self.draw_expand_menu()
-        if self.show_save_menu:
-            self.draw_save_menu()
+        xp_progress = (self.view.xp / self.view.xp_to_next_level) * xp_bar_width
+        pygame.draw.rect(surface, DARK_GRAY, (420, 40, xp_bar_width, 15), border_radius=7)
+        pygame.draw.rect(surface, GREEN, (420, 40, xp_progress, 15), border_radius=7)
+        pygame.draw.rect(surface, BLACK, (420, 40, xp_bar_width, 15), 2, border_radius=7)
+        xp_text = self.font_small.render(f"{self.view.xp}/{self.view.xp_to_next_level} XP", True, WHITE)
+        surface.blit(xp_text, (450, 42))
+        
+        hovered = self.get_hovered_toolbar()
+        for text, menu, x, width, color in TOOLBAR_BUTTONS:
+            if hovered == "toolbar." + menu:
+                color = tuple(min(255, c + 40) for c in color)
+            self.draw_button(text, x, 10, width, 40, color, surface)
+
+    def draw_customer_count(self, surface):
+        customer_count_text = self.font_small.render(f"Customers: {self.view.customer_count}", True, BLACK)
+        surface.blit(customer_count_text, (0, 0))
     
-    def draw_button(self, text, x, y, width, height, color):
-        pygame.draw.rect(self.screen, DARK_GRAY, (x + 2, y + 2, width, height), border_radius=10)
-        pygame.draw.rect(self.screen, color, (x, y, width, height), border_radius=10)
-        pygame.draw.rect(self.screen, BLACK, (x, y, width, height), 2, border_radius=10)
+    def draw_button(self, text, x, y, width, height, color, surface):
+        pygame.draw.rect(surface, DARK_GRAY, (x + 2, y + 2, width, height), border_radius=10)
+        pygame.draw.rect(surface, color, (x, y, width, height), border_radius=10)
+        pygame.draw.rect(surface, BLACK, (x, y, width, height), 2, border_radius=10)
         text_surface = self.font_small.render(text, True, WHITE)
         text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
-        self.screen.blit(text_surface, text_rect)
+        surface.blit(text_surface, text_rect)
 
-    def draw_close_button(self, menu_rect):
+    def draw_close_button(self, surface, menu_rect):
+        # Posisi layar tombol (untuk klik) diatur draw_ui() dari posisi panel
         x = menu_rect.right - 30
         y = menu_rect.top + 6
-        self.close_button_rect.topleft = (x, y)
-        pygame.draw.rect(self.screen, RED, self.close_button_rect, border_radius=5)
-        pygame.draw.line(self.screen, WHITE, (x + 6, y + 6), (x + 18, y + 18), 3)
-        pygame.draw.line(self.screen, WHITE, (x + 18, y + 6), (x + 6, y + 18), 3)
+        pygame.draw.rect(surface, RED, (x, y, 24, 24), border_radius=5)
+        pygame.draw.line(surface, WHITE, (x + 6, y + 6), (x + 18, y + 18), 3)
+        pygame.draw.line(surface, WHITE, (x + 18, y + 6), (x + 6, y + 18), 3)
 
-    def draw_save_menu(self):
+    def draw_save_menu(self, surface):
         menu_width = 350
         menu_height = 200
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 200
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
         
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         
         title = self.font_large.render("Save Game", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
+        surface.blit(title, (menu_x + 20, menu_y + 20))
         
-        self.draw_close_button(menu_rect)
+        self.draw_close_button(surface, menu_rect)
         
         slot_text = self.font_medium.render(f"Slot: {self.save_slot}", True, BLACK)
-        self.screen.blit(slot_text, (menu_x + 20, menu_y + 70))
+        surface.blit(slot_text, (menu_x + 20, menu_y + 70))
         
-        self.draw_button("Save Now", menu_rect.centerx - 100, menu_y + 120, 200, 50, GREEN)
+        self.draw_button("Save Now", *self.save_button_rect, GREEN, surface)
     
-    def draw_shop_menu(self):
+    def draw_shop_menu(self, surface):
         menu_width = 400
         menu_height = 450
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 80
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
 
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         
         title = self.font_large.render("Build Shop", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
+        surface.blit(title, (menu_x + 20, menu_y + 20))
         
-        self.draw_close_button(menu_rect)
+        self.draw_close_button(surface, menu_rect)
         
-        content_height = menu_height - 90
-        content_rect = pygame.Rect(menu_x + 10, menu_y + 70, menu_width - 20, content_height)
+        # *** DIUBAH: hanya kartu yang terlihat yang digambar ***
+        self.shop_scroll_y = self.shop_list.clamp_scroll(self.shop_scroll_y, len(self.shop_menu_items))
+        self.shop_list.draw(surface, self.shop_menu_items, self.shop_scroll_y, self.draw_shop_card)
+
+    def draw_shop_card(self, surface, item, card_rect):
+        shop_type, template = item
+        locked = self.view.level < template["level_required"]
         
-        shop_list = SHOP_TEMPLATES.items()
-        sorted_shops = sorted(shop_list, key=lambda item: item[1]['level_required'])
+        color = GRAY if locked else (220, 220, 220)
+        pygame.draw.rect(surface, color, card_rect, border_radius=10)
+        pygame.draw.rect(surface, BLACK, card_rect, 2, border_radius=10)
         
-        total_content_height = len(sorted_shops) * 90
+        Shop.draw_preview(surface, card_rect.x + 10, card_rect.y + 15, shop_type) 
         
-        self.shop_scroll_y = min(0, self.shop_scroll_y)
-        max_scroll = content_height - total_content_height
-        if max_scroll > 0: 
-            max_scroll = 0
-        self.shop_scroll_y = max(self.shop_scroll_y, max_scroll)
-
-        self.screen.set_clip(content_rect)
-
-        y_offset = menu_y + 70 + self.shop_scroll_y
+        text_x = card_rect.x + 75 
         
-        for shop_type, template in sorted_shops:
-            locked = self.level < template["level_required"]
-            
-            card_rect = pygame.Rect(menu_x + 20, y_offset, menu_width - 40, 80)
-            color = GRAY if locked else (220, 220, 220)
-            pygame.draw.rect(self.screen, color, card_rect, border_radius=10)
-            pygame.draw.rect(self.screen, BLACK, card_rect, 2, border_radius=10)
-            
-            Shop.draw_preview(self.screen, menu_x + 30, y_offset + 15, shop_type) 
-            
-            text_x = menu_x + 95 
-            
-            name_text = self.font_medium.render(template["name"], True, BLACK)
-            self.screen.blit(name_text, (text_x, y_offset + 10))
-            
-            cost_text = self.font_small.render(f"Cost: {template['cost']} coins", True, BLACK)
-            self.screen.blit(cost_text, (text_x, y_offset + 40))
-            
-            income_text = self.font_small.render(f"Income: {template['income']}/cycle", True, BLACK)
-            self.screen.blit(income_text, (text_x, y_offset + 60))
-            
-            if locked:
-                lock_text = self.font_small.render(f"Unlock at Lv.{template['level_required']}", True, RED)
-                self.screen.blit(lock_text, (menu_x + menu_width - 120, y_offset + 30))
-            
-            y_offset += 90
+        name_text = self.font_medium.render(template["name"], True, BLACK)
+        surface.blit(name_text, (text_x, card_rect.y + 10))
+        
+        cost_text = self.font_small.render(f"Cost: {template['cost']} coins", True, BLACK)
+        surface.blit(cost_text, (text_x, card_rect.y + 40))
+        
+        income_text = self.font_small.render(f"Income: {template['income']}/cycle", True, BLACK)
+        surface.blit(income_text, (text_x, card_rect.y + 60))
         
-        self.screen.set_clip(None)
+        if locked:
+            lock_text = self.font_small.render(f"Unlock at Lv.{template['level_required']}", True, RED)
+            surface.blit(lock_text, (card_rect.right - 100, card_rect.y + 30))
 
-    def draw_decorate_menu(self):
+    def draw_decorate_menu(self, surface):
         menu_width = 400
         menu_height = 450
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 80
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         title = self.font_large.render("Decorate", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
-        self.draw_close_button(menu_rect)
-        content_height = menu_height - 90
-        content_rect = pygame.Rect(menu_x + 10, menu_y + 70, menu_width - 20, content_height)
-        total_content_height = len(DecorationType) * 90
-        self.decorate_scroll_y = min(0, self.decorate_scroll_y)
-        max_scroll = content_height - total_content_height
-        if max_scroll > 0: 
-            max_scroll = 0
-        self.decorate_scroll_y = max(self.decorate_scroll_y, max_scroll)
-        self.screen.set_clip(content_rect)
-        y_offset = menu_y + 70 + self.decorate_scroll_y
-        for dec_type in DecorationType:
-            template = DECORATION_TEMPLATES[dec_type]
-            card_rect = pygame.Rect(menu_x + 20, y_offset, menu_width - 40, 80)
-            pygame.draw.rect(self.screen, LIGHT_GRAY, card_rect, border_radius=10)
-            pygame.draw.rect(self.screen, BLACK, card_rect, 2, border_radius=10)
-            Decoration.draw_preview(self.screen, menu_x + 30, y_offset + 20, dec_type)
-            text_x = menu_x + 95
-            name_text = self.font_medium.render(template["name"], True, BLACK)
-            self.screen.blit(name_text, (text_x, y_offset + 15))
-            cost_text = self.font_small.render(f"Cost: {template['cost']} coins", True, BLACK)
-            self.screen.blit(cost_text, (text_x, y_offset + 45))
-            y_offset += 90
-        self.screen.set_clip(None)
-
-    def draw_quest_menu(self):
+        surface.blit(title, (menu_x + 20, menu_y + 20))
+        self.draw_close_button(surface, menu_rect)
+        # *** DIUBAH: hanya kartu yang terlihat yang digambar ***
+        self.decorate_scroll_y = self.decorate_list.clamp_scroll(self.decorate_scroll_y, len(self.decorate_menu_items))
+        self.decorate_list.draw(surface, self.decorate_menu_items, self.decorate_scroll_y, self.draw_decoration_card)
+
+    def draw_decoration_card(self, surface, item, card_rect):
+        dec_type, template = item
+        pygame.draw.rect(surface, LIGHT_GRAY, card_rect, border_radius=10)
+        pygame.draw.rect(surface, BLACK, card_rect, 2, border_radius=10)
+        Decoration.draw_preview(surface, card_rect.x + 10, card_rect.y + 20, dec_type)
+        text_x = card_rect.x + 75
+        name_text = self.font_medium.render(template["name"], True, BLACK)
+        surface.blit(name_text, (text_x, card_rect.y + 15))
+        cost_text = self.font_small.render(f"Cost: {template['cost']} coins", True, BLACK)
+        surface.blit(cost_text, (text_x, card_rect.y + 45))
+
+    def draw_quest_menu(self, surface):
         menu_width = 450
         menu_height = 400
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 100
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
         
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         
         title = self.font_large.render("Quests", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
+        surface.blit(title, (menu_x + 20, menu_y + 20))
         
-        self.draw_close_button(menu_rect)
+        self.draw_close_button(surface, menu_rect)
         
-        content_height = menu_height - 90
-        content_rect = pygame.Rect(menu_x + 10, menu_y + 70, menu_width - 20, content_height)
-        
-        total_content_height = len(self.quests) * 90
-        
-        self.quest_scroll_y = min(0, self.quest_scroll_y)
-        max_scroll = content_height - total_content_height
-        if max_scroll > 0: 
-            max_scroll = 0
-        self.quest_scroll_y = max(self.quest_scroll_y, max_scroll)
-        
-        self.screen.set_clip(content_rect)
+        # *** DIUBAH: hanya kartu yang terlihat yang digambar ***
+        self.quest_scroll_y = self.quest_list.clamp_scroll(self.quest_scroll_y, len(self.view.quests))
+        self.quest_list.draw(surface, self.view.quests, self.quest_scroll_y, self.draw_quest_card)
 
-        y_offset = menu_y + 70 + self.quest_scroll_y
-        
-        for quest in self.quests:
-            card_color = GREEN if quest.completed else LIGHT_GRAY
-            card_rect = pygame.Rect(menu_x + 20, y_offset, menu_width - 40, 80)
-            pygame.draw.rect(self.screen, card_color, card_rect, border_radius=10)
-            pygame.draw.rect(self.screen, BLACK, card_rect, 2, border_radius=10)
-            
-            desc_text = self.font_medium.render(quest.description, True, BLACK)
-            self.screen.blit(desc_text, (menu_x + 30, y_offset + 10))
-            progress_percent = min((quest.progress / quest.target) * 100, 100)
-            progress_width = int((menu_width - 80) * progress_percent / 100)
-            pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 30, y_offset + 40, menu_width - 80, 15), border_radius=7)
-            pygame.draw.rect(self.screen, BLUE, (menu_x + 30, y_offset + 40, progress_width, 15), border_radius=7)
-            progress_text = self.font_small.render(f"{quest.progress}/{quest.target}", True, BLACK)
-            self.screen.blit(progress_text, (menu_x + 30, y_offset + 57))
-            reward_text = self.font_small.render(f"Reward: {quest.reward_coins} coins, {quest.reward_xp} XP", True, BLACK)
-            self.screen.blit(reward_text, (menu_x + 200, y_offset + 57))
-            
-            y_offset += 90
-        
-        self.screen.set_clip(None)
+    def draw_quest_card(self, surface, quest, card_rect):
+        card_color = GREEN if quest.completed else LIGHT_GRAY
+        pygame.draw.rect(surface, card_color, card_rect, border_radius=10)
+        pygame.draw.rect(surface, BLACK, card_rect, 2, border_radius=10)
+        
+        x, y = card_rect.x + 10, card_rect.y
+        bar_width = card_rect.width - 40
+        desc_text = self.font_medium.render(quest.description, True, BLACK)
+        surface.blit(desc_text, (x, y + 10))
+        progress_percent = min((quest.progress / quest.target) * 100, 100)
+        progress_width = int(bar_width * progress_percent / 100)
+        pygame.draw.rect(surface, DARK_GRAY, (x, y + 40, bar_width, 15), border_radius=7)
+        pygame.draw.rect(surface, BLUE, (x, y + 40, progress_width, 15), border_radius=7)
+        progress_text = self.font_small.render(f"{quest.progress}/{quest.target}", True, BLACK)
+        surface.blit(progress_text, (x, y + 57))
+        reward_text = self.font_small.render(f"Reward: {quest.reward_coins} coins, {quest.reward_xp} XP", True, BLACK)
+        surface.blit(reward_text, (x + 170, y + 57))
 
-    def draw_mall_info(self):
+    def draw_mall_info(self, surface):
         menu_width = 400
-        menu_height = 300
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 150
+        menu_height = 340
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         title = self.font_large.render("Mall Information", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
-        self.draw_close_button(menu_rect)
+        surface.blit(title, (menu_x + 20, menu_y + 20))
+        self.draw_close_button(surface, menu_rect)
         y_offset = menu_y + 70
-        slots_x, slots_y = self.mall.get_shop_slots()
-        size_text = self.font_medium.render(f"Mall Size: {self.mall.width} x {self.mall.height} px", True, BLACK)
-        self.screen.blit(size_text, (menu_x + 30, y_offset))
+        slots_x, slots_y = self.view.mall.get_shop_slots()
+        size_text = self.font_medium.render(f"Mall Size: {self.view.mall.width} x {self.view.mall.height} px", True, BLACK)
+        surface.blit(size_text, (menu_x + 30, y_offset))
         y_offset += 35
-        tiles_text = self.font_medium.render(f"Total Tiles: {self.mall.width // TILE_SIZE} x {self.mall.height // TILE_SIZE}", True, BLACK)
-        self.screen.blit(tiles_text, (menu_x + 30, y_offset))
+        tiles_text = self.font_medium.render(f"Total Tiles: {self.view.mall.width // TILE_SIZE} x {self.view.mall.height // TILE_SIZE}", True, BLACK)
+        surface.blit(tiles_text, (menu_x + 30, y_offset))
         y_offset += 35
         slots_text = self.font_medium.render(f"Shop Slots: {slots_x} x {slots_y} ({slots_x * slots_y} total)", True, BLACK)
-        self.screen.blit(slots_text, (menu_x + 30, y_offset))
+        surface.blit(slots_text, (menu_x + 30, y_offset))
+        y_offset += 35
+        shops_text = self.font_medium.render(f"Shops Built: {self.view.shop_count}   Entrances: {len(self.view.mall.entrances)}", True, BLACK)
+        surface.blit(shops_text, (menu_x + 30, y_offset))
         y_offset += 35
-        shops_text = self.font_medium.render(f"Shops Built: {len(self.shops)}", True, BLACK)
-        self.screen.blit(shops_text, (menu_x + 30, y_offset))
+        # *** BARU: Ringkasan antrean semua toko ***
+        waiting, avg_wait = self.view.get_queue_summary()
+        queue_text = self.font_medium.render(f"In Queue: {waiting}  (avg wait {avg_wait:.1f}s)", True, BLACK)
+        surface.blit(queue_text, (menu_x + 30, y_offset))
         y_offset += 35
-        if self.mall.can_expand():
-            cost = self.mall.get_expand_cost()
+        if self.view.mall.can_expand():
+            cost = self.view.mall.get_expand_cost()
             expand_text = self.font_medium.render(f"Next Expansion Cost: {cost}", True, BLUE)
-            self.screen.blit(expand_text, (menu_x + 30, y_offset))
+            surface.blit(expand_text, (menu_x + 30, y_offset))
         else:
             max_text = self.font_medium.render("Mall at Maximum Size!", True, GREEN)
-            self.screen.blit(max_text, (menu_x + 30, y_offset))
-        
-    def draw_expand_menu(self):
+            surface.blit(max_text, (menu_x + 30, y_offset))
+        # *** BARU: membuka panel statistik (riwayat) ***
+        self.draw_button("Statistics", *self.stats_button_rect, PURPLE, surface)
+
+    def draw_stats_menu(self, surface):
+        """ *** BARU: grafik riwayat dari MetricsStore (koin/detik, customer, pemasukan per tipe toko) *** """
+        menu_width = 600
+        menu_height = 420
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
+        menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
+        title = self.font_large.render("Statistics", True, BLACK)
+        surface.blit(title, (menu_x + 20, menu_y + 20))
+        self.draw_close_button(surface, menu_rect)
+
+        metrics = self.view.metrics
+        income = metrics.series["income"]
+        minutes = income.count * metrics.interval / 60
+        window_text = self.font_small.render(f"last {minutes:.0f} min", True, DARK_GRAY)
+        surface.blit(window_text, (menu_x + 200, menu_y + 30))
+
+        chart_rect = pygame.Rect(menu_x + 30, menu_y + 95, 540, 110)
+        coins_per_sec = metrics.get_coins_per_second(chart_rect.width // 3, self.stats_chart_buffers.get("coins"))
+        self.stats_chart_buffers["coins"] = coins_per_sec
+        current = coins_per_sec[-1] if coins_per_sec else 0.0
+        label = self.font_medium.render(f"Coins / sec: {current:.1f}", True, BLACK)
+        surface.blit(label, (chart_rect.x, menu_y + 65))
+        self.draw_line_chart(surface, chart_rect, coins_per_sec, ORANGE)
+
+        chart_rect = pygame.Rect(menu_x + 30, menu_y + 255, 250, 130)
+        customers = metrics.series["customers"].downsample(chart_rect.width // 3, self.stats_chart_buffers.get("customers"))
+        self.stats_chart_buffers["customers"] = customers
+        label = self.font_medium.render(f"Customers: {int(metrics.series['customers'].latest())}", True, BLACK)
+        surface.blit(label, (chart_rect.x, menu_y + 225))
+        self.draw_line_chart(surface, chart_rect, customers, BLUE)
+
+        # Pemasukan per tipe toko dalam jendela riwayat, sebagai batang horizontal
+        label = self.font_medium.render("Revenue by shop", True, BLACK)
+        surface.blit(label, (menu_x + 320, menu_y + 225))
+        revenue = metrics.get_shop_revenue()
+        top = max((total for shop_type, total in revenue), default=0.0) or 1.0
+        y = menu_y + 255
+        for shop_type, total in revenue:
+            template = SHOP_TEMPLATES[shop_type]
+            name_text = self.font_small.render(template["name"], True, BLACK)
+            surface.blit(name_text, (menu_x + 320, y + 2))
+            bar_width = int(100 * total / top)
+            pygame.draw.rect(surface, template["color"], (menu_x + 430, y, max(1, bar_width), 16))
+            value_text = self.font_small.render(f"{int(total)}", True, DARK_GRAY)
+            surface.blit(value_text, (menu_x + 435 + bar_width, y + 2))
+            y += 22
+
+    def draw_line_chart(self, surface, rect, values, color):
+        pygame.draw.rect(surface, LIGHT_GRAY, rect)
+        pygame.draw.rect(surface, BLACK, rect, 1)
+        if len(values) < 2:
+            empty_text = self.font_small.render("Collecting data...", True, DARK_GRAY)
+            surface.blit(empty_text, empty_text.get_rect(center=rect.center))
+            return
+        low = min(values)
+        high = max(values)
+        span = (high - low) or 1.0
+        step = (rect.width - 4) / (len(values) - 1)
+        points = [(rect.x + 2 + index * step, rect.bottom - 3 - (value - low) / span * (rect.height - 6))
+                  for index, value in enumerate(values)]
+        pygame.draw.lines(surface, color, False, points, 2)
+        high_text = self.font_small.render(f"{high:.0f}", True, DARK_GRAY)
+        surface.blit(high_text, (rect.right - high_text.get_width() - 4, rect.y + 2))
+
+    def draw_expand_menu(self, surface):
         menu_width = 400
         menu_height = 300
-        menu_x = (SCREEN_WIDTH - menu_width) // 2
-        menu_y = 150
+        # Koordinat lokal surface panel; posisi layar ada di UIPanel (lihat init_panels)
+        menu_x = 0
+        menu_y = 0
         menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
         
-        pygame.draw.rect(self.screen, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
-        pygame.draw.rect(self.screen, WHITE, menu_rect, border_radius=15)
-        pygame.draw.rect(self.screen, BLACK, menu_rect, 3, border_radius=15)
+        pygame.draw.rect(surface, DARK_GRAY, (menu_x + 5, menu_y + 5, menu_width, menu_height), border_radius=15)
+        pygame.draw.rect(surface, WHITE, menu_rect, border_radius=15)
+        pygame.draw.rect(surface, BLACK, menu_rect, 3, border_radius=15)
         
         title = self.font_large.render("Expand Mall", True, BLACK)
-        self.screen.blit(title, (menu_x + 20, menu_y + 20))
-        self.draw_close_button(menu_rect)
+        surface.blit(title, (menu_x + 20, menu_y + 20))
+        self.draw_close_button(surface, menu_rect)
         
         y_offset = menu_y + 80
         
-        if self.mall.can_expand():
-            slots_x, slots_y = self.mall.get_shop_slots()
-            next_slots_str = self.mall.get_next_expansion_slots()
-            cost = self.mall.get_expand_cost()
+        if self.view.mall.can_expand():
+            slots_x, slots_y = self.view.mall.get_shop_slots()
+            next_slots_str = self.view.mall.get_next_expansion_slots()
+            cost = self.view.mall.get_expand_cost()
             
             current_text = self.font_medium.render(f"Current Size: {slots_x}x{slots_y} Slots", True, BLACK)
-            self.screen.blit(current_text, (menu_x + 30, y_offset))
+            surface.blit(current_text, (menu_x + 30, y_offset))
             y_offset += 40
             
             next_text = self.font_medium.render(f"Upgrade to: {next_slots_str} Slots", True, GREEN)
-            self.screen.blit(next_text, (menu_x + 30, y_offset))
+            surface.blit(next_text, (menu_x + 30, y_offset))
             y_offset += 60
             
             cost_text = self.font_large.render(f"Cost: {cost} Coins", True, BLACK)
             cost_rect = cost_text.get_rect(center=(menu_rect.centerx, y_offset))
-            self.screen.blit(cost_text, cost_rect)
+            surface.blit(cost_text, cost_rect)
             y_offset += 50
             
-            color = BLUE if self.coins >= cost else DARK_GRAY
-            self.draw_button("Upgrade", menu_rect.centerx - 100, y_offset, 200, 40, color)
+            color = BLUE if self.view.coins >= cost else DARK_GRAY
+            self.draw_button("Upgrade", *self.upgrade_button_rect, color, surface)
             
         else:
             max_text = self.font_medium.render("Mall is at Maximum Size!", True, RED)
             max_rect = max_text.get_rect(center=(menu_rect.centerx, menu_rect.centery))
-            self.screen.blit(max_text, max_rect)
+            surface.blit(max_text, max_rect)
 
 
     def handle_click(self, pos):
         x, y = pos
-        
-        any_menu_open = self.show_shop_menu or self.show_decorate_menu or self.show_quest_menu or self.show_mall_info or self.show_expand_menu or self.show_save_menu
-        if any_menu_open and self.close_button_rect.collidepoint(pos):
-            self.sound_manager.play_sfx('click')
-            self.show_shop_menu = False
-            self.show_decorate_menu = False
-            self.show_quest_menu = False
-            self.show_mall_info = False
-            self.show_expand_menu = False
-            self.show_save_menu = False
-            return 
 
-        if 650 <= x <= 730 and 10 <= y <= 50:
-            self.sound_manager.play_sfx('click')
-            self.show_shop_menu = not self.show_shop_menu
-            self.show_decorate_menu = False; self.show_quest_menu = False; self.show_mall_info = False; self.show_expand_menu = False; self.show_save_menu = False
-            self.shop_scroll_y = 0 
-        elif 740 <= x <= 820 and 10 <= y <= 50:
-            self.sound_manager.play_sfx('click')
-            self.show_quest_menu = not self.show_quest_menu
-            self.show_shop_menu = False; self.show_decorate_menu = False; self.show_mall_info = False; self.show_expand_menu = False; self.show_save_menu = False
+        # *** DIUBAH: klik dirutekan lewat registry widget (lihat init_widgets) ***
+        widget = self.widgets.hit(pos, self.active_widget_groups[self.get_open_menu()])
+        if widget is not None:
+            widget.on_click(pos)
+            return
+
+        # *** DIUBAH: posisi klik dikonversi lewat kamera dan zoom ***
+        internal_x, internal_y = self.screen_to_internal(pos)
+        if y > 60 and internal_y >= 0:
+            # *** DIUBAH: penempatan terjadi saat tombol dilepas; tarik untuk mengisi persegi ***
+            if (self.placing_shop and self.selected_shop_type) or \
+               (self.placing_decoration and self.selected_decoration_type):
+                self.placement_drag_start = (internal_x // SHOP_GRID_SIZE * SHOP_GRID_SIZE,
+                                             internal_y // SHOP_GRID_SIZE * SHOP_GRID_SIZE)
+
+    def handle_release(self, pos):
+        if self.placement_drag_start is None:
+            return
+        start_x, start_y = self.placement_drag_start
+        self.placement_drag_start = None
+        internal_x, internal_y = self.screen_to_internal(pos)
+        end_x = internal_x // SHOP_GRID_SIZE * SHOP_GRID_SIZE
+        end_y = max(0, internal_y) // SHOP_GRID_SIZE * SHOP_GRID_SIZE
+        if (end_x, end_y) == (start_x, start_y):
+            self.place_item_on_grid(start_x, start_y)
+            return
+        if self.placing_shop:
+            self.submit("build_area", "shop", self.selected_shop_type, start_x, start_y, end_x, end_y)
+        elif self.placing_decoration:
+            self.submit("build_area", "decoration", self.selected_decoration_type, start_x, start_y, end_x, end_y)
+        self.placing_shop = False
+        self.placing_decoration = False
+        self.selected_shop_type = None
+        self.selected_decoration_type = None
+
+
+    def handle_mouse_motion(self, pos):
+        self.hovered_widget = self.widgets.hit(pos, self.active_widget_groups[self.get_open_menu()])
+
+    def close_menus(self, pos=None):
+        self.sound_manager.play_sfx('click')
+        for name, flag in MENU_FLAGS:
+            setattr(self, flag, False)
+
+    def toggle_menu(self, menu):
+        self.sound_manager.play_sfx('click')
+        flag = dict(MENU_FLAGS)[menu]
+        opened = not getattr(self, flag)
+        for name, other in MENU_FLAGS:
+            setattr(self, other, False)
+        setattr(self, flag, opened)
+        if menu == "shop":
+            self.shop_scroll_y = 0
+        elif menu == "quest":
             self.quest_scroll_y = 0
-        elif 830 <= x <= 900 and 10 <= y <= 50:
-            self.sound_manager.play_sfx('click')
-            self.show_decorate_menu = not self.show_decorate_menu
-            self.show_shop_menu = False; self.show_quest_menu = False; self.show_mall_info = False; self.show_expand_menu = False; self.show_save_menu = False
-            self.decorate_scroll_y = 0 
-        elif 910 <= x <= 980 and 10 <= y <= 50:
-            self.sound_manager.play_sfx('click')
-            self.show_mall_info = not self.show_mall_info
-            self.show_shop_menu = False; self.show_decorate_menu = False; self.show_quest_menu = False; self.show_expand_menu = False; self.show_save_menu = False
-        elif 990 <= x <= 1080 and 10 <= y <= 50:
+        elif menu == "decorate":
+            self.decorate_scroll_y = 0
+
+    def click_shop_card(self, pos):
+        panel = self.panels["shop"]
+        index = self.shop_list.hit_test((pos[0] - panel.rect.x, pos[1] - panel.rect.y), self.shop_scroll_y, len(self.shop_menu_items))
+        if index is None:
+            return
+        shop_type, template = self.shop_menu_items[index]
+        if self.view.level >= template["level_required"] and self.view.coins >= template["cost"]:
             self.sound_manager.play_sfx('click')
-            self.show_expand_menu = not self.show_expand_menu
-            self.show_shop_menu = False; self.show_decorate_menu = False; self.show_quest_menu = False; self.show_mall_info = False; self.show_save_menu = False
-        elif 1090 <= x <= 1190 and 10 <= y <= 50:
+            self.selected_shop_type = shop_type
+            self.placing_shop = True
+            self.placing_decoration = False
+            self.show_shop_menu = False
+        else:
+            self.sound_manager.play_sfx('error')
+
+    def click_decoration_card(self, pos):
+        panel = self.panels["decorate"]
+        index = self.decorate_list.hit_test((pos[0] - panel.rect.x, pos[1] - panel.rect.y), self.decorate_scroll_y, len(self.decorate_menu_items))
+        if index is None:
+            return
+        dec_type, template = self.decorate_menu_items[index]
+        if self.view.coins >= template["cost"]:
             self.sound_manager.play_sfx('click')
-            self.show_save_menu = not self.show_save_menu
-            self.show_shop_menu = False; self.show_decorate_menu = False; self.show_quest_menu = False; self.show_mall_info = False; self.show_expand_menu = False
-        
-        if self.show_save_menu:
-            menu_width = 350
-            menu_x = (SCREEN_WIDTH - menu_width) // 2
-            menu_y = 200
-            save_btn_rect = pygame.Rect(menu_x + menu_width // 2 - 100, menu_y + 120, 200, 50)
-            if save_btn_rect.collidepoint(pos):
-                self.save_game_data()
-                self.show_save_menu = False
-                return
-        
-        if self.show_shop_menu:
-            menu_x = (SCREEN_WIDTH - 400) // 2
-            menu_y = 80
-            y_offset = menu_y + 70 + self.shop_scroll_y 
-            shop_list = SHOP_TEMPLATES.items()
-            sorted_shops = sorted(shop_list, key=lambda item: item[1]['level_required'])
-            
-            for shop_type, template in sorted_shops:
-                card_rect = pygame.Rect(menu_x + 20, y_offset, 360, 80)
-                content_rect = pygame.Rect(menu_x + 10, menu_y + 70, 380, 450 - 90)
-                if card_rect.collidepoint(pos) and content_rect.collidepoint(pos):
-                    if self.level >= template["level_required"] and self.coins >= template["cost"]:
-                        self.sound_manager.play_sfx('click')
-                        self.selected_shop_type = shop_type
-                        self.placing_shop = True
-                        self.placing_decoration = False
-                        self.show_shop_menu = False
-                    else:
-                        self.sound_manager.play_sfx('error')
-                    return
-                y_offset += 90
-
-        if self.show_decorate_menu:
-            menu_x = (SCREEN_WIDTH - 400) // 2
-            menu_y = 80
-            y_offset = menu_y + 70 + self.decorate_scroll_y 
-            for dec_type in DecorationType:
-                template = DECORATION_TEMPLATES[dec_type]
-                card_rect = pygame.Rect(menu_x + 20, y_offset, 360, 80)
-                content_rect = pygame.Rect(menu_x + 10, menu_y + 70, 380, 450 - 90)
-                if card_rect.collidepoint(pos) and content_rect.collidepoint(pos):
-                    if self.coins >= template["cost"]:
-                        self.sound_manager.play_sfx('click')
-                        self.selected_decoration_type = dec_type
-                        self.placing_decoration = True
-                        self.placing_shop = False
-                        self.show_decorate_menu = False
-                    else:
-                        self.sound_manager.play_sfx('error')
-                    return
-                y_offset += 90
-
-        if self.show_expand_menu:
-            menu_width = 400
-            menu_x = (SCREEN_WIDTH - menu_width) // 2
-            menu_y = 150
-            menu_center_x = menu_x + (menu_width // 2)
-            button_y = menu_y + 80 + 40 + 60 + 50
-            
-            upgrade_btn_rect = pygame.Rect(menu_center_x - 100, button_y, 200, 40)
-            
-            if upgrade_btn_rect.collidepoint(pos):
-                if self.mall.can_expand():
-                    cost = self.mall.get_expand_cost()
-                    if self.coins >= cost:
-                        self.sound_manager.play_sfx('build')
-                        self.coins -= cost
-                        self.mall.expand()
-                        self.add_xp(100)
-                        for quest in self.quests:
-                            if "expand" in quest.description.lower() and not quest.completed:
-                                quest.update_progress(1)
-                                if quest.completed:
-                                    self.sound_manager.play_sfx('quest_complete')
-                        self.show_expand_menu = False
-                    else:
-                        self.sound_manager.play_sfx('error')
-                return
+            self.selected_decoration_type = dec_type
+            self.placing_decoration = True
+            self.placing_shop = False
+            self.show_decorate_menu = False
+        else:
+            self.sound_manager.play_sfx('error')
 
-        mall_y_start = 170
-        if y > mall_y_start + BORDER_THICKNESS:
-            internal_x = x - self.camera_x - BORDER_THICKNESS
-            internal_y = y - self.camera_y - mall_y_start - BORDER_THICKNESS
-            
-            if self.placing_shop and self.selected_shop_type:
-                self.place_item_on_grid(internal_x, internal_y)
-            elif self.placing_decoration and self.selected_decoration_type:
-                self.place_item_on_grid(internal_x, internal_y)
+    def click_minimap(self, pos):
+        rect = self.widgets.widgets["minimap"].rect
+        self.center_camera_on(*self.minimap.to_internal((pos[0] - rect.x, pos[1] - rect.y)))
 
+    def click_save_button(self, pos):
+        self.submit("save_game_data")
+        self.show_save_menu = False
 
-    def is_grid_occupied(self, grid_x, grid_y):
-        item_rect = pygame.Rect(grid_x, grid_y, SHOP_GRID_SIZE, SHOP_GRID_SIZE)
-        for shop in self.shops:
-            if item_rect.colliderect(pygame.Rect(shop.x, shop.y, shop.width, shop.height)):
-                return True
-        return False
+    def click_upgrade_button(self, pos):
+        if self.view.mall.can_expand():
+            # Di mode thread hasilnya belum diketahui; koin dicek dari snapshot
+            if self.view.coins >= self.view.mall.get_expand_cost() and self.submit("expand_mall") is not False:
+                self.show_expand_menu = False
+            else:
+                self.sound_manager.play_sfx('error')
+
+    def is_grid_occupied(self, grid_x, grid_y, world=None):
+        # world: Game atau WorldSnapshot (default keadaan simulasi sendiri)
+        world = world if world is not None else self
+        # *** DIUBAH: grid okupansi chunk, O(1); snapshot membawa salinan bekunya ***
+        return world.chunks.is_shop_at(grid_x, grid_y)
 
     def place_item_on_grid(self, internal_x, internal_y):
         grid_x = (internal_x // SHOP_GRID_SIZE) * SHOP_GRID_SIZE
         grid_y = (internal_y // SHOP_GRID_SIZE) * SHOP_GRID_SIZE
-        if 0 <= grid_x <= self.mall.width - SHOP_GRID_SIZE and \
-           0 <= grid_y <= self.mall.height - SHOP_GRID_SIZE:
-            if not self.is_grid_occupied(grid_x, grid_y):
-                if self.placing_shop:
-                    template = SHOP_TEMPLATES[self.selected_shop_type]
-                    if self.coins >= template["cost"]:
-                        self.sound_manager.play_sfx('build')
-                        new_shop = Shop(self.selected_shop_type, grid_x, grid_y)
-                        self.shops.append(new_shop)
-                        new_shop.start_production()
-                        self.coins -= template["cost"]
-                        self.add_xp(20)
-                        for quest in self.quests:
-                            if "build" in quest.description.lower() and not quest.completed:
-                                quest.update_progress(1)
-                                if quest.completed:
-                                    self.sound_manager.play_sfx('quest_complete')
-                
-                elif self.placing_decoration:
-                    template = DECORATION_TEMPLATES[self.selected_decoration_type]
-                    if self.coins >= template["cost"]:
-                        self.sound_manager.play_sfx('build')
-                        dec_x = grid_x + (SHOP_GRID_SIZE // 2) - 20 
-                        dec_y = grid_y + (SHOP_GRID_SIZE // 2) - 20
-                        new_dec = Decoration(self.selected_decoration_type, dec_x, dec_y)
-                        self.decorations.append(new_dec)
-                        self.coins -= template["cost"]
-                        self.add_xp(5)
-                        for quest in self.quests:
-                            if "decorations" in quest.description.lower() and not quest.completed:
-                                quest.update_progress(1)
-                                if quest.completed:
-                                    self.sound_manager.play_sfx('quest_complete')
+        if self.placing_shop:
+            self.submit("build_shop", self.selected_shop_type, grid_x, grid_y)
+        elif self.placing_decoration:
+            self.submit("build_decoration", self.selected_decoration_type, grid_x, grid_y)
 
         self.placing_shop = False
         self.placing_decoration = False
         self.selected_shop_type = None
         self.selected_decoration_type = None
 
+    def is_grid_in_mall(self, grid_x, grid_y, world=None):
+        world = world if world is not None else self
+        return 0 <= grid_x <= world.mall.width - SHOP_GRID_SIZE and \
+               0 <= grid_y <= world.mall.height - SHOP_GRID_SIZE
+
+    def build_shop(self, shop_type, grid_x, grid_y):
+        """ Membangun toko di slot grid; True jika berhasil """
+        template = SHOP_TEMPLATES[shop_type]
+        if not self.is_grid_in_mall(grid_x, grid_y) or self.is_grid_occupied(grid_x, grid_y):
+            return False
+        if self.coins < template["cost"]:
+            return False
+        self.sound_manager.play_sfx('build')
+        new_shop = Shop(shop_type, grid_x, grid_y)
+        self.shops.append(new_shop)
+        self.demand.add_shop(new_shop)
+        self.chunks.add_shop(new_shop)
+        self.world_revision += 1
+        new_shop.start_production()
+        self.schedule_production(new_shop)
+        self.coins -= template["cost"]
+        self.add_xp(20)
+        self.progress_quests("build")
+        return True
+
+    def build_decoration(self, dec_type, grid_x, grid_y):
+        """ Menaruh dekorasi di tengah slot grid; True jika berhasil """
+        template = DECORATION_TEMPLATES[dec_type]
+        if not self.is_grid_in_mall(grid_x, grid_y) or self.is_grid_occupied(grid_x, grid_y):
+            return False
+        if self.coins < template["cost"]:
+            return False
+        self.sound_manager.play_sfx('build')
+        dec_x = grid_x + (SHOP_GRID_SIZE // 2) - 20 
+        dec_y = grid_y + (SHOP_GRID_SIZE // 2) - 20
+        new_dec = Decoration(dec_type, dec_x, dec_y)
+        self.decorations.append(new_dec)
+        self.chunks.add_decoration(new_dec)
+        self.world_revision += 1
+        # Peta pengaruh hanya ditambal di sekitar dekorasi baru, lalu bobot demand toko di sana
+        cell = self.influence.add_decoration(new_dec)
+        self.demand.refresh_around(cell)
+        self.coins -= template["cost"]
+        self.add_xp(5)
+        self.progress_quests("decorations")
+        return True
+
+    def plan_area(self, kind, item_type, x0, y0, x1, y1):
+        """
+        *** BARU: Validasi massal untuk build_area. Semua slot di persegi (x0, y0)..(x1, y1)
+        (pojok slot, inklusif, urutan bebas) dicek sekali jalan terhadap batas mall dan
+        grid okupansi chunk, lalu dipotong sesuai koin. Mengembalikan daftar slot yang akan dibangun.
+        """
+        template = SHOP_TEMPLATES[item_type] if kind == "shop" else DECORATION_TEMPLATES[item_type]
+        affordable = self.coins // template["cost"]
+        left, right = max(0, min(x0, x1)), min(max(x0, x1), self.mall.width - SHOP_GRID_SIZE)
+        top, bottom = max(0, min(y0, y1)), min(max(y0, y1), self.mall.height - SHOP_GRID_SIZE)
+        slots = []
+        for grid_y in range(top, bottom + 1, SHOP_GRID_SIZE):
+            for grid_x in range(left, right + 1, SHOP_GRID_SIZE):
+                if len(slots) >= affordable:
+                    return slots
+                if not self.chunks.is_shop_at(grid_x, grid_y):
+                    slots.append((grid_x, grid_y))
+        return slots
+
+    def build_area(self, kind, item_type, x0, y0, x1, y1):
+        """
+        *** BARU: Membangun toko/dekorasi di semua slot kosong sebuah persegi sebagai satu
+        transaksi: koin dipotong sekali, XP dan progres quest ditambahkan sekali untuk
+        totalnya. Mengembalikan jumlah yang dibangun (0 = tidak ada, koin tidak berubah).
+        """
+        slots = self.plan_area(kind, item_type, x0, y0, x1, y1)
+        if not slots:
+            return 0
+        if kind == "shop":
+            for grid_x, grid_y in slots:
+                new_shop = Shop(item_type, grid_x, grid_y)
+                self.shops.append(new_shop)
+                self.demand.add_shop(new_shop)
+                self.chunks.add_shop(new_shop)
+                new_shop.start_production()
+                self.schedule_production(new_shop)
+            cost, xp, keyword = SHOP_TEMPLATES[item_type]["cost"], 20, "build"
+        else:
+            cells = []
+            for grid_x, grid_y in slots:
+                new_dec = Decoration(item_type, grid_x + (SHOP_GRID_SIZE // 2) - 20, grid_y + (SHOP_GRID_SIZE // 2) - 20)
+                self.decorations.append(new_dec)
+                self.chunks.add_decoration(new_dec)
+                cells.append(self.influence.add_decoration(new_dec))
+            # Bobot demand toko di sekitar seluruh persegi dihitung ulang sekali
+            self.demand.refresh_cells(min(cx for cx, cy in cells), min(cy for cx, cy in cells),
+                                      max(cx for cx, cy in cells), max(cy for cx, cy in cells))
+            cost, xp, keyword = DECORATION_TEMPLATES[item_type]["cost"], 5, "decorations"
+        self.sound_manager.play_sfx('build')
+        self.world_revision += 1
+        self.coins -= cost * len(slots)
+        self.add_xp(xp * len(slots))
+        self.progress_quests(keyword, len(slots), cap_at_target=True)
+        return len(slots)
+
+    def expand_mall(self):
+        """ Memperluas mall jika koin cukup; True jika berhasil """
+        if not self.mall.can_expand():
+            return False
+        cost = self.mall.get_expand_cost()
+        if self.coins < cost:
+            return False
+        self.sound_manager.play_sfx('build')
+        self.coins -= cost
+        self.mall.expand()
+        self.world_revision += 1
+        self.influence.resize(*self.mall.get_shop_slots())
+        self.add_xp(100)
+        self.progress_quests("expand")
+        return True
+
+
+    def draw_world_area(self, area):
+        """ Menggambar ulang lapisan dunia statis di satu persegi layar pada buffer dunia """
+        surface = self.world_buffer
+        surface.set_clip(area)
+        surface.fill(LIGHT_GRAY, area)
+        self.draw_road_and_environment(surface)
+        self.draw_mall_building(surface, area)
+        # Zoom jauh: toko dan dekorasi sudah ada di petak chunk datar dari draw_mall_building()
+        level = self.zoom_level
+        if level < FLAT_DETAIL_LEVEL:
+            # Dibaca dari chunk (Game atau salinan beku di snapshot), bukan dari area kamera tick lalu
+            shops, decorations = self.get_entities_in_rect(self.get_area_rect(area, SHOP_GRID_SIZE), self.view.chunks)
+            internal_offset_x, internal_offset_y = self.get_internal_offset()
+            for decoration in decorations:
+                decoration.queue_draw(self.render_queue, internal_offset_x, internal_offset_y, level)
+            for shop in shops:
+                Shop.queue_sprite(self.render_queue, shop, internal_offset_x, internal_offset_y, level)
+            self.render_queue.flush(surface)
+        surface.set_clip(None)
+        self.world_redraw_area += area.width * area.height
+
+    def update_world_buffer(self):
+        """
+        *** BARU: Menyiapkan buffer dunia untuk frame ini. Isi dunia/zoom berubah: gambar
+        ulang penuh. Hanya kamera bergeser: isi lama di-scroll dengan Surface.scroll() dan
+        hanya strip yang baru terlihat yang digambar, jadi biayanya sebanding luas strip.
+        """
+        mall = self.view.mall
+        # Revisi dibaca sebelum menggambar: perubahan di tengah jalan tertangkap frame berikutnya
+        key = (self.view.chunks.world_id, self.view.world_revision, self.zoom_level, mall.width, mall.height)
+        camera = (self.camera_x, self.camera_y)
+        width, height = self.world_buffer.get_size()
+        self.world_redraw_area = 0
+        if key != self.world_buffer_key or self.world_buffer_camera is None:
+            self.draw_world_area(self.world_buffer.get_rect())
+        elif camera != self.world_buffer_camera:
+            dx = camera[0] - self.world_buffer_camera[0]
+            dy = camera[1] - self.world_buffer_camera[1]
+            if abs(dx) >= width or abs(dy) >= height:
+                self.draw_world_area(self.world_buffer.get_rect())
+            else:
+                self.world_buffer.scroll(dx, dy)
+                if dx > 0:
+                    self.draw_world_area(pygame.Rect(0, 0, dx, height))
+                elif dx < 0:
+                    self.draw_world_area(pygame.Rect(width + dx, 0, -dx, height))
+                # Strip horizontal tidak mengulang sudut yang sudah digambar strip vertikal
+                x0 = max(0, dx)
+                strip_width = width - abs(dx)
+                if dy > 0:
+                    self.draw_world_area(pygame.Rect(x0, 0, strip_width, dy))
+                elif dy < 0:
+                    self.draw_world_area(pygame.Rect(x0, height + dy, strip_width, -dy))
+        self.world_buffer_key = key
+        self.world_buffer_camera = camera
 
     def draw(self):
-        self.screen.fill(LIGHT_GRAY)
-        self.draw_road_and_environment()
-        self.draw_mall_building()
-        
-        mall_y_start = 170
-        internal_offset_x = self.camera_x + BORDER_THICKNESS
-        internal_offset_y = self.camera_y + mall_y_start + BORDER_THICKNESS
-        
-        for decoration in self.decorations:
-            decoration.draw(self.screen, internal_offset_x, internal_offset_y)
-        for shop in self.shops:
-            shop.draw(self.screen, internal_offset_x, internal_offset_y)
-        
-        for customer in self.customers:
-            in_mall_states = [ CustomerState.SHOPPING, CustomerState.EXITING_MALL ]
-            if customer.state in in_mall_states:
-                customer.draw(self.screen, internal_offset_x, internal_offset_y)
+        self.update_world_buffer()
+        self.screen.blit(self.world_buffer, (0, 0))
+        
+        level = self.zoom_level
+        zoom = self.zoom
+        internal_offset_x, internal_offset_y = self.get_internal_offset()
+        
+        # Progress bar berubah tiap frame, jadi digambar di atas buffer (bukan di dalamnya)
+        visible_shops = ()
+        if level <= PROGRESS_BAR_MAX_LEVEL:
+            visible_shops = self.view.get_shop_views()
+        
+        # *** BARU: Semua sprite dunia dikumpulkan lalu dikirim per layer dengan screen.blits() ***
+        # Customer yang tidur pasti di luar layar, cukup gambar yang bangun
+        for customer in self.view.get_customer_views():
+            if customer.in_mall:
+                Customer.queue_draw_view(self.render_queue, customer, internal_offset_x, internal_offset_y, level)
             else:
-                customer.draw(self.screen, self.camera_x, self.camera_y)
+                Customer.queue_draw_view(self.render_queue, customer, self.camera_x, self.camera_y, level)
+        self.render_queue.flush(self.screen)
+        
+        for shop in visible_shops:
+            Shop.draw_progress(self.screen, shop, internal_offset_x, internal_offset_y, zoom)
+        self.draw_particles(level, zoom, internal_offset_x, internal_offset_y)
         
         mouse_pos = pygame.mouse.get_pos()
-        if self.placing_shop or self.placing_decoration:
-            mall_y_start = 170
-            if mouse_pos[1] > mall_y_start + BORDER_THICKNESS:
-                internal_x = mouse_pos[0] - self.camera_x - BORDER_THICKNESS
-                internal_y = mouse_pos[1] - self.camera_y - mall_y_start - BORDER_THICKNESS
+        if self.placement_drag_start is not None and (self.placing_shop or self.placing_decoration):
+            self.draw_area_ghost(mouse_pos, zoom, internal_offset_x, internal_offset_y)
+        elif self.placing_shop or self.placing_decoration:
+            internal_x, internal_y = self.screen_to_internal(mouse_pos)
+            if mouse_pos[1] > 60 and internal_y >= 0:
                 grid_x = (internal_x // SHOP_GRID_SIZE) * SHOP_GRID_SIZE
                 grid_y = (internal_y // SHOP_GRID_SIZE) * SHOP_GRID_SIZE
-                draw_x = grid_x + internal_offset_x
-                draw_y = grid_y + internal_offset_y
+                draw_x = grid_x * zoom + internal_offset_x
+                draw_y = grid_y * zoom + internal_offset_y
+                ghost_size = max(1, round(SHOP_GRID_SIZE * zoom))
                 is_valid = True
-                if not (0 <= grid_x <= self.mall.width - SHOP_GRID_SIZE and \
-                        0 <= grid_y <= self.mall.height - SHOP_GRID_SIZE):
+                if not self.is_grid_in_mall(grid_x, grid_y, self.view):
                     is_valid = False
-                if self.is_grid_occupied(grid_x, grid_y):
+                if self.is_grid_occupied(grid_x, grid_y, self.view):
                     is_valid = False
                 if self.placing_shop:
                     ghost_color = (0, 255, 0, 100) if is_valid else (255, 0, 0, 100)
-                    ghost_surf = pygame.Surface((SHOP_GRID_SIZE, SHOP_GRID_SIZE), pygame.SRCALPHA)
+                    ghost_surf = pygame.Surface((ghost_size, ghost_size), pygame.SRCALPHA)
                     ghost_surf.fill(ghost_color)
                     self.screen.blit(ghost_surf, (draw_x, draw_y))
-                    pygame.draw.rect(self.screen, WHITE, (draw_x, draw_y, SHOP_GRID_SIZE, SHOP_GRID_SIZE), 2)
+                    pygame.draw.rect(self.screen, WHITE, (draw_x, draw_y, ghost_size, ghost_size), 2)
                 elif self.placing_decoration:
-                    dec_draw_x = draw_x + (SHOP_GRID_SIZE // 2) - 20
-                    dec_draw_y = draw_y + (SHOP_GRID_SIZE // 2) - 20
                     ghost_color = (0, 255, 0, 100) if is_valid else (255, 0, 0, 100)
-                    ghost_surf = pygame.Surface((SHOP_GRID_SIZE, SHOP_GRID_SIZE), pygame.SRCALPHA)
+                    ghost_surf = pygame.Surface((ghost_size, ghost_size), pygame.SRCALPHA)
                     ghost_surf.fill(ghost_color)
                     self.screen.blit(ghost_surf, (draw_x, draw_y))
-                    Decoration.draw_preview(self.screen, dec_draw_x, dec_draw_y, self.selected_decoration_type)
+                    if level == 0:
+                        dec_draw_x = draw_x + (SHOP_GRID_SIZE // 2) - 20
+                        dec_draw_y = draw_y + (SHOP_GRID_SIZE // 2) - 20
+                        Decoration.draw_preview(self.screen, dec_draw_x, dec_draw_y, self.selected_decoration_type)
+                    elif level < FLAT_DETAIL_LEVEL:
+                        sprite = Decoration.get_sprite(self.selected_decoration_type, level)
+                        self.screen.blit(sprite, (draw_x + (ghost_size - sprite.get_width()) // 2,
+                                                  draw_y + (ghost_size - sprite.get_height()) // 2))
 
         self.screen.set_clip(None) 
         self.draw_ui()
         
-        customer_count_text = self.font_small.render(f"Customers: {len(self.customers)}", True, BLACK)
-        self.screen.blit(customer_count_text, (10, SCREEN_HEIGHT - 25))
-        
         pygame.display.flip()
     
+    def draw_particles(self, level, zoom, offset_x, offset_y):
+        """ *** BARU: payout yang terlihat jadi koin meletup + teks "+N"; semua partikel digerakkan sekaligus *** """
+        now = game_clock.now()
+        dt = 0.0 if self.particle_time is None else min(0.1, now - self.particle_time)
+        self.particle_time = now
+        visible = level <= PROGRESS_BAR_MAX_LEVEL
+        events = self.payout_events
+        if events:
+            if visible:
+                left, top, right, bottom = self.get_view_rect(SHOP_GRID_SIZE)
+                while events:
+                    x, y, income = events.popleft()
+                    if left <= x <= right and top <= y <= bottom:
+                        self.particles.emit_payout(x, y, income)
+            else:
+                events.clear()
+        self.particles.update(dt)
+        if visible:
+            self.particles.draw(self.screen, offset_x, offset_y, zoom)
+
+    def draw_area_ghost(self, mouse_pos, zoom, offset_x, offset_y):
+        """ *** BARU: Persegi tarikan penempatan massal beserta perkiraan jumlah dan biayanya *** """
+        start_x, start_y = self.placement_drag_start
+        internal_x, internal_y = self.screen_to_internal(mouse_pos)
+        end_x = internal_x // SHOP_GRID_SIZE * SHOP_GRID_SIZE
+        end_y = max(0, internal_y) // SHOP_GRID_SIZE * SHOP_GRID_SIZE
+        mall = self.view.mall
+        left, right = max(0, min(start_x, end_x)), min(max(start_x, end_x), mall.width - SHOP_GRID_SIZE)
+        top, bottom = max(0, min(start_y, end_y)), min(max(start_y, end_y), mall.height - SHOP_GRID_SIZE)
+        if left > right or top > bottom:
+            return
+        if self.placing_shop:
+            template = SHOP_TEMPLATES[self.selected_shop_type]
+        else:
+            template = DECORATION_TEMPLATES[self.selected_decoration_type]
+        cells = ((right - left) // SHOP_GRID_SIZE + 1) * ((bottom - top) // SHOP_GRID_SIZE + 1)
+        # Perkiraan: slot yang sudah terisi baru diketahui saat build_area memvalidasi
+        count = min(cells, self.view.coins // template["cost"])
+
+        rect = pygame.Rect(round(left * zoom) + offset_x, round(top * zoom) + offset_y,
+                           round((right - left + SHOP_GRID_SIZE) * zoom), round((bottom - top + SHOP_GRID_SIZE) * zoom))
+        ghost_surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        ghost_surf.fill((0, 255, 0, 80) if count else (255, 0, 0, 80))
+        self.screen.blit(ghost_surf, rect)
+        pygame.draw.rect(self.screen, WHITE, rect, 2)
+        label = self.font_small.render(f"{count} x {template['name']}  ({count * template['cost']} coins)", True, WHITE, BLACK)
+        self.screen.blit(label, (mouse_pos[0] + 16, mouse_pos[1] + 16))
+
     def run(self):
+        if self.threaded_simulation:
+            self.sim_thread = SimulationThread(self, tick_rate=FPS)
+            self.sim_thread.start()
+        
         while self.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    self.save_game_data()
                     self.running = False
                 
                 elif event.type == pygame.MOUSEWHEEL:
@@ -864,41 +1718,62 @@ class Game:
                         self.decorate_scroll_y += event.y * 20
                     elif self.show_quest_menu:
                         self.quest_scroll_y += event.y * 20
+                    elif event.y and self.get_open_menu() is None:
+                        # *** BARU: scroll tanpa menu terbuka = zoom di sekitar kursor ***
+                        self.set_zoom_level(self.zoom_level - (1 if event.y > 0 else -1), pygame.mouse.get_pos())
                         
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1: 
                         self.handle_click(event.pos)
+
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    if event.button == 1:
+                        self.handle_release(event.pos)
+                
+                elif event.type == pygame.MOUSEMOTION:
+                    # *** BARU: tarik dengan tombol tengah/kanan untuk menggeser kamera ***
+                    if event.buttons[1] or event.buttons[2]:
+                        self.pan_camera(*event.rel)
+                    self.handle_mouse_motion(event.pos)
                         
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_LEFT:
-                        self.camera_x = min(self.camera_x + 50, 0)
-                    elif event.key == pygame.K_RIGHT:
-                        self.camera_x = max(self.camera_x - 50, -(self.mall.width + BORDER_THICKNESS*2 - SCREEN_WIDTH))
-                    elif event.key == pygame.K_UP:
-                        self.camera_y = min(self.camera_y + 50, 0)
-                    elif event.key == pygame.K_DOWN:
-                        self.camera_y = max(self.camera_y - 50, -(self.mall.height + BORDER_THICKNESS*2 - (SCREEN_HEIGHT - 170)))
+                    if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        self.set_zoom_level(self.zoom_level - 1)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.set_zoom_level(self.zoom_level + 1)
+                    elif event.key == pygame.K_m:
+                        self.toggle_minimap()
+                    elif event.key == pygame.K_t:
+                        self.toggle_menu("stats")
+            
+            # *** DIUBAH: panah ditahan / kursor di tepi layar menggeser kamera tiap frame ***
+            self.scroll_camera(self.clock.get_time() / 1000)
             
-            self.update()
+            if self.sim_thread is not None:
+                # Render hanya membaca snapshot terbaru; update() jalan di thread simulasi
+                self.view = self.sim_thread.latest()
+            else:
+                self.update()
             self.draw()
             self.clock.tick(FPS)
         
+        if self.sim_thread is not None:
+            self.sim_thread.stop()
+            self.sim_thread = None
+            self.view = self
+        self.save_game_data()
         pygame.quit()
 
 
 if __name__ == "__main__":
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-
-    sound_manager = SoundManager()
-    sound_manager.play_bgm("bgm_menu.mp3")
+    # *** DIUBAH: Semua subsistem dibuat sekali di bootstrap lalu dibagi ke menu dan game ***
+    app = bootstrap()
 
-    main_menu = MainMenu(screen, sound_manager)
+    main_menu = MainMenu(app.screen, app.sound_manager, on_first_frame=app.profiler.mark_first_frame)
     menu_result, slot = main_menu.run()
 
-    if menu_result == 'NEW_GAME':
-        game = Game(save_slot=slot, load_from_save=False)
+    if menu_result in ('NEW_GAME', 'LOAD_GAME'):
+        game = Game(save_slot=slot, load_from_save=(menu_result == 'LOAD_GAME'),
+                    screen=app.screen, sound_manager=app.sound_manager, save_manager=app.save_manager,
+                    threaded_simulation="--threaded-sim" in sys.argv)
         game.run()
-    elif menu_result == 'LOAD_GAME':
-        game = Game(save_slot=slot, load_from_save=True)
-        game.run()
\ No newline at end of file
@@ -1,16 +1,17 @@
 import pygame
 import sys
 from color import *
-from save_manager import SaveManager
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
 
 class MainMenu:
-    def __init__(self, screen, sound_manager):
+    def __init__(self, screen, sound_manager, save_manager=None, on_first_frame=None):
         self.screen = screen
         self.sound_manager = sound_manager
-        self.save_manager = SaveManager()
+        self.save_manager = save_manager
+        # Dipanggil sekali setelah frame menu pertama tampil (laporan startup)
+        self.on_first_frame = on_first_frame
 
         self.font_title = pygame.font.Font(None, 72)
         self.font_large = pygame.font.Font(None, 48)
@@ -84,6 +85,10 @@ class MainMenu:
                             pygame.quit()
                             sys.exit()
 
+            self.sound_manager.flush_sfx()
             self.draw_main_screen(mouse_pos)
             pygame.display.flip()
+            if self.on_first_frame is not None:
+                self.on_first_frame()
+                self.on_first_frame = None
             clock.tick(60)
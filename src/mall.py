@@ -1,13 +1,101 @@
+from collections import deque, namedtuple
 from shop import SHOP_SIZE # *** BARU: Impor ukuran grid toko ***
 
+# *** BARU: Satu pintu masuk per sekian px lebar mall ***
+ENTRANCE_SPACING = 800
+# Batas ukuran mall (slot per sisi)
+MAX_SLOTS = 200
+# Customer per detik yang bisa lewat satu pintu; sisanya antre di trotoar
+ENTRANCE_THROUGHPUT = 2.0
+
+class Entrance:
+    """
+    Pintu masuk mall dengan batas throughput. Tiap customer yang datang diberi
+    jadwal masuk (FIFO): paling cepat saat datang, paling lambat satu interval
+    setelah customer sebelumnya, jadi enqueue/dequeue O(1).
+    """
+    __slots__ = ("x", "interval", "next_free", "queue", "admitted", "total_wait", "max_queue_length")
+
+    def __init__(self, x, throughput=ENTRANCE_THROUGHPUT):
+        self.x = x
+        self.interval = 1.0 / throughput
+        self.next_free = None
+        # (waktu masuk, customer) yang masih menunggu, urut waktu masuk
+        self.queue = deque()
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_queue_length = 0
+
+    def request_entry(self, customer, now):
+        """ Mengembalikan waktu game customer boleh masuk """
+        admit_at = now if self.next_free is None else max(now, self.next_free)
+        self.next_free = admit_at + self.interval
+        self.total_wait += admit_at - now
+        if admit_at > now:
+            self.queue.append((admit_at, customer))
+            self.max_queue_length = max(self.max_queue_length, len(self.queue))
+        else:
+            self.admitted += 1
+        return admit_at
+
+    def get_queue_position(self, admit_at, now):
+        return max(0, int((admit_at - now) / self.interval))
+
+    def update(self, now):
+        """ Mengeluarkan customer yang jadwal masuknya sudah lewat dari antrean """
+        while self.queue and self.queue[0][0] <= now:
+            self.queue.popleft()
+            self.admitted += 1
+
+# *** BARU: Salinan mall yang dibaca thread render: ukuran, posisi pintu dan info perluasan ***
+EntranceView = namedtuple("EntranceView", "x")
+
+
+class MallView(namedtuple("MallView", "width height entrances shop_slots expandable expand_cost next_expansion_slots")):
+    """ Nama method sama dengan Mall agar kode gambar bisa membaca keduanya """
+    __slots__ = ()
+
+    def get_shop_slots(self):
+        return self.shop_slots
+
+    def can_expand(self):
+        return self.expandable
+
+    def get_expand_cost(self):
+        return self.expand_cost
+
+    def get_next_expansion_slots(self):
+        return self.next_expansion_slots
+
+
 class Mall:
     def __init__(self, width, height):
         # Pastikan ukuran awal sesuai dengan grid
         self.width = (width // SHOP_SIZE) * SHOP_SIZE
         self.height = (height // SHOP_SIZE) * SHOP_SIZE
-        self.entrance_x = self.width // 2
         self.entrance_y = 0
+        self.entrances = []
+        self.layout_entrances()
         self.level = 1
+
+    @property
+    def entrance_x(self):
+        """ Pintu utama (tengah), dipertahankan untuk kode lama """
+        return self.entrances[len(self.entrances) // 2].x
+
+    def layout_entrances(self):
+        """ *** BARU: Pintu ditambah seiring lebar mall dan disebar merata di dinding atas *** """
+        count = max(1, self.width // ENTRANCE_SPACING)
+        while len(self.entrances) < count:
+            self.entrances.append(Entrance(0))
+        for i, entrance in enumerate(self.entrances):
+            entrance.x = (2 * i + 1) * self.width // (2 * count)
+
+    def get_nearest_entrance(self, x):
+        """ Pintu terdekat dari posisi x internal, O(1) karena jaraknya sama rata """
+        count = len(self.entrances)
+        index = int(x * count // self.width) if self.width else 0
+        return self.entrances[min(max(index, 0), count - 1)]
         
     def get_total_area(self):
         return self.width * self.height
@@ -19,7 +107,8 @@ class Mall:
     def can_expand(self):
         """ *** DIUBAH: Batasi berdasarkan level/ukuran *** """
         slots_x, slots_y = self.get_shop_slots()
-        return slots_x < 20 or slots_y < 20 # Batas maks 20x20 slot
+        # *** DIUBAH: batas 20x20 dicabut; chunk membuat biaya per frame tidak bergantung ukuran mall ***
+        return slots_x < MAX_SLOTS or slots_y < MAX_SLOTS
     
     def get_expand_cost(self):
         """ *** DIUBAH: Biaya berdasarkan level/total slot *** """
@@ -51,5 +140,10 @@ class Mall:
             self.height += SHOP_SIZE
             
         self.level += 1
-        # Selalu pusatkan kembali pintu masuk
-        self.entrance_x = self.width // 2
\ No newline at end of file
+        # Pintu disebar ulang (dan ditambah jika mall cukup lebar)
+        self.layout_entrances()
+
+    def get_view(self):
+        return MallView(self.width, self.height, tuple(EntranceView(entrance.x) for entrance in self.entrances),
+                        self.get_shop_slots(), self.can_expand(), self.get_expand_cost(),
+                        self.get_next_expansion_slots())
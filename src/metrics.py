@@ -0,0 +1,207 @@
+import struct
+from array import array
+
+# Satu sampel tiap sekian detik waktu game
+METRICS_SAMPLE_INTERVAL = 1.0
+# Sampel per deret (1 jam pada interval 1 detik)
+METRICS_CAPACITY = 3600
+
+METRICS_MAGIC = b"MTR1"
+# magic, kapasitas, interval, jumlah sampel total, jumlah deret
+METRICS_HEADER = struct.Struct("<4sIdQH")
+# per deret: panjang nama, head, count
+METRICS_SERIES_HEADER = struct.Struct("<HII")
+
+
+class RingBuffer:
+    """
+    Deret angka berkapasitas tetap di atas array('d'). append() menimpa sampel
+    tertua tanpa alokasi; memori deret selalu kapasitas * 8 byte.
+    """
+    __slots__ = ("values", "capacity", "head", "count")
+
+    def __init__(self, capacity):
+        self.values = array('d', bytes(8 * capacity))
+        self.capacity = capacity
+        self.head = 0   # posisi tulis berikutnya
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.head] = value
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def copy(self):
+        ring = RingBuffer.__new__(RingBuffer)
+        ring.values = array('d', self.values)
+        ring.capacity = self.capacity
+        ring.head = self.head
+        ring.count = self.count
+        return ring
+
+    def latest(self, default=0.0):
+        if not self.count:
+            return default
+        return self.values[self.head - 1]
+
+    def get(self, index):
+        """ Sampel ke-index dari yang tertua (0) sampai terbaru (count - 1) """
+        return self.values[(self.head - self.count + index) % self.capacity]
+
+    def downsample(self, points, out=None):
+        """
+        Rata-rata count sampel terakhir ke `points` titik (atau kurang jika
+        sampelnya lebih sedikit). out: array('d') yang dipakai ulang antar panggilan.
+        """
+        if out is None:
+            out = array('d')
+        del out[:]
+        count = self.count
+        if not count:
+            return out
+        points = min(points, count)
+        values = self.values
+        start = self.head - count
+        capacity = self.capacity
+        for point in range(points):
+            lo = point * count // points
+            hi = (point + 1) * count // points
+            total = 0.0
+            for index in range(lo, hi):
+                total += values[(start + index) % capacity]
+            out.append(total / (hi - lo))
+        return out
+
+    def window_sum(self):
+        """ Jumlah semua sampel yang tersimpan """
+        if self.count == self.capacity:
+            return sum(self.values)
+        return sum(self.get(index) for index in range(self.count))
+
+
+class MetricsStore:
+    """
+    Riwayat statistik game: satu RingBuffer per deret, diisi dari tick
+    simulasi setiap METRICS_SAMPLE_INTERVAL detik. Pemasukan dikumpulkan di
+    akumulator array('d') di antara sampel, jadi mencatat payout dan mengambil
+    sampel tidak membuat objek baru.
+
+    Deret tetap: "coins", "income" (koin didapat per interval), "customers",
+    "level" (level + progres XP). Ditambah satu deret pemasukan per tipe toko
+    ("income:<tipe>").
+    """
+
+    BASE_SERIES = ("coins", "income", "customers", "level")
+
+    def __init__(self, shop_types, capacity=METRICS_CAPACITY, interval=METRICS_SAMPLE_INTERVAL):
+        self.capacity = capacity
+        self.interval = interval
+        self.shop_types = list(shop_types)
+        self.shop_index = {shop_type: index for index, shop_type in enumerate(self.shop_types)}
+        self.series = {name: RingBuffer(capacity) for name in self.BASE_SERIES}
+        self.shop_series = [RingBuffer(capacity) for _ in self.shop_types]
+        for shop_type, ring in zip(self.shop_types, self.shop_series):
+            self.series["income:" + shop_type.value] = ring
+        # Pemasukan sejak sampel terakhir, per tipe toko
+        self.pending_income = array('d', bytes(8 * len(self.shop_types)))
+        self.samples = 0
+        self.next_sample = None
+
+    def copy(self):
+        """ *** BARU: Salinan untuk thread render (isi array disalin utuh, tanpa akumulator) *** """
+        store = MetricsStore(self.shop_types, 0, self.interval)
+        store.capacity = self.capacity
+        store.series = {name: ring.copy() for name, ring in self.series.items()}
+        store.shop_series = [store.series["income:" + shop_type.value] for shop_type in self.shop_types]
+        store.samples = self.samples
+        store.next_sample = self.next_sample
+        return store
+
+    def add_income(self, shop_type, amount):
+        self.pending_income[self.shop_index[shop_type]] += amount
+
+    def tick(self, now, game):
+        """ Dipanggil tiap Game.update(); mengambil sampel jika sudah waktunya """
+        if self.next_sample is None:
+            self.next_sample = now + self.interval
+            return
+        if now < self.next_sample:
+            return
+        self.next_sample += self.interval
+        if self.next_sample <= now:
+            # Tertinggal jauh (misal setelah jeda): jangan mengejar dengan banyak sampel sekaligus
+            self.next_sample = now + self.interval
+        series = self.series
+        pending = self.pending_income
+        income = 0.0
+        for index, ring in enumerate(self.shop_series):
+            ring.append(pending[index])
+            income += pending[index]
+            pending[index] = 0.0
+        series["income"].append(income)
+        series["coins"].append(game.coins)
+        series["customers"].append(len(game.customers))
+        series["level"].append(game.level + game.xp / game.xp_to_next_level)
+        self.samples += 1
+
+    def get_coins_per_second(self, points, out=None):
+        """ Pemasukan per detik, diperkecil ke `points` titik untuk grafik """
+        out = self.series["income"].downsample(points, out)
+        for index in range(len(out)):
+            out[index] /= self.interval
+        return out
+
+    def get_shop_revenue(self):
+        """ [(tipe toko, total pemasukan dalam jendela riwayat)] """
+        return [(shop_type, ring.window_sum()) for shop_type, ring in zip(self.shop_types, self.shop_series)]
+
+    def to_bytes(self):
+        """ Format biner ringkas: header, lalu per deret nama + head/count + isi array mentah """
+        parts = [METRICS_HEADER.pack(METRICS_MAGIC, self.capacity, self.interval, self.samples, len(self.series))]
+        for name, ring in self.series.items():
+            encoded = name.encode("utf-8")
+            parts.append(METRICS_SERIES_HEADER.pack(len(encoded), ring.head, ring.count))
+            parts.append(encoded)
+            parts.append(ring.values.tobytes())
+        return b"".join(parts)
+
+    def load_bytes(self, data):
+        """
+        Memulihkan riwayat dari to_bytes(); False jika format/kapasitas tidak cocok.
+        Semua deret diurai ke buffer sementara dulu dan baru dipasang setelah seluruh
+        data valid, jadi file rusak/terpotong tidak meninggalkan riwayat setengah tertimpa.
+        """
+        try:
+            magic, capacity, interval, samples, series_count = METRICS_HEADER.unpack_from(data, 0)
+            if magic != METRICS_MAGIC or capacity != self.capacity or interval != self.interval:
+                return False
+            offset = METRICS_HEADER.size
+            parsed = {}
+            for _ in range(series_count):
+                name_length, head, count = METRICS_SERIES_HEADER.unpack_from(data, offset)
+                offset += METRICS_SERIES_HEADER.size
+                name = data[offset:offset + name_length].decode("utf-8")
+                offset += name_length
+                raw = data[offset:offset + 8 * capacity]
+                offset += 8 * capacity
+                if len(raw) != 8 * capacity:
+                    return False
+                if name not in self.series:
+                    continue  # tipe toko yang sudah tidak ada
+                ring = RingBuffer(0)
+                ring.values = array('d', raw)
+                ring.capacity = capacity
+                ring.head = head % capacity
+                ring.count = min(count, capacity)
+                parsed[name] = ring
+        except (struct.error, UnicodeDecodeError):
+            return False
+        for name, ring in parsed.items():
+            # Objek RingBuffer tetap sama (shop_series menunjuk ke sana), isinya yang ditukar
+            target = self.series[name]
+            target.values, target.head, target.count = ring.values, ring.head, ring.count
+        self.samples = samples
+        return True
@@ -0,0 +1,132 @@
+import pygame
+
+from shop import SHOP_SIZE, SHOP_TEMPLATES
+from world_chunks import CHUNK_SLOTS, CELL_EMPTY, CELL_DECORATION
+from color import *
+
+# Sisi terpanjang minimap di layar (px); mall kecil diperbesar kelipatan bulat
+MINIMAP_MAX_SIZE = 200
+MINIMAP_FLOOR_COLOR = (235, 225, 215)
+# Heatmap kepadatan customer diperbarui tiap sekian frame, bukan tiap frame
+MINIMAP_HEAT_INTERVAL = 30
+# Alpha merah per customer di satu sel, dan batas atasnya
+MINIMAP_HEAT_STEP = 60
+MINIMAP_HEAT_MAX = 200
+
+
+class Minimap:
+    """
+    Peta kecil seluruh mall: satu pixel per slot grid toko, diwarnai warna
+    tipe toko (SHOP_TEMPLATES) atau warna dekorasi. Surface-nya di-cache;
+    saat revisi dunia naik hanya chunk yang versinya berubah yang digambar
+    ulang, dan seluruh peta hanya dibangun ulang jika ukuran mall (expand)
+    atau dunianya (load) berubah.
+
+    Dunia dibaca dari Game atau salinan beku di WorldSnapshot, jadi semua
+    datanya datang lewat snapshot di mode thread.
+    """
+
+    def __init__(self, max_size=MINIMAP_MAX_SIZE):
+        self.max_size = max_size
+        self.world_id = None
+        self.revision = None
+        self.chunk_versions = {}
+        self.slots = (0, 0)
+        self.scale = 1
+        self.cells = None
+        self.heat = None
+        self.surface = None
+        self.changed = False
+        self.frames_since_heat = MINIMAP_HEAT_INTERVAL
+
+    def get_size(self):
+        return (self.slots[0] * self.scale, self.slots[1] * self.scale)
+
+    def cell_color(self, world, chunk, slot_x, slot_y):
+        cell = chunk.occupancy[chunk.cell_index(slot_x, slot_y)]
+        if cell == CELL_EMPTY:
+            return MINIMAP_FLOOR_COLOR
+        if cell != CELL_DECORATION:
+            return SHOP_TEMPLATES[world.shop_types[cell - 1]]["color"]
+        for decoration in chunk.decorations:
+            if (int((decoration.x + decoration.width // 2) // SHOP_SIZE) == slot_x and
+                    int((decoration.y + decoration.height // 2) // SHOP_SIZE) == slot_y):
+                return decoration.template["color"]
+        return MINIMAP_FLOOR_COLOR
+
+    def draw_chunk(self, world, chunk):
+        slots_x, slots_y = self.slots
+        for index, cell in enumerate(chunk.occupancy):
+            slot_x = chunk.cx * CHUNK_SLOTS + index % CHUNK_SLOTS
+            slot_y = chunk.cy * CHUNK_SLOTS + index // CHUNK_SLOTS
+            if slot_x < slots_x and slot_y < slots_y:
+                color = MINIMAP_FLOOR_COLOR if cell == CELL_EMPTY else self.cell_color(world, chunk, slot_x, slot_y)
+                self.cells.set_at((slot_x, slot_y), color)
+        self.chunk_versions[(chunk.cx, chunk.cy)] = chunk.version
+
+    def rebuild(self, world, revision, slots_x, slots_y):
+        self.world_id = world.world_id
+        self.revision = revision
+        self.chunk_versions = {}
+        self.slots = (slots_x, slots_y)
+        self.scale = max(1, self.max_size // max(slots_x, slots_y, 1))
+        self.cells = pygame.Surface((slots_x, slots_y))
+        self.cells.fill(MINIMAP_FLOOR_COLOR)
+        # Hanya chunk yang ada isinya yang perlu dikunjungi
+        for chunk in list(world.chunks.values()):
+            self.draw_chunk(world, chunk)
+        self.heat = pygame.Surface((slots_x, slots_y), pygame.SRCALPHA)
+        self.frames_since_heat = MINIMAP_HEAT_INTERVAL
+        self.changed = True
+
+    def apply_changes(self, world, revision):
+        """ Revisi dunia naik: gambar ulang chunk yang versinya beda dari yang terakhir digambar """
+        self.revision = revision
+        versions = self.chunk_versions
+        for key, chunk in list(world.chunks.items()):
+            if versions.get(key) != chunk.version:
+                self.draw_chunk(world, chunk)
+                self.changed = True
+
+    def set_density(self, density):
+        """ density: {(slot_x, slot_y): jumlah customer} """
+        self.heat.fill((0, 0, 0, 0))
+        slots_x, slots_y = self.slots
+        for (slot_x, slot_y), count in density.items():
+            if 0 <= slot_x < slots_x and 0 <= slot_y < slots_y:
+                self.heat.set_at((slot_x, slot_y), (255, 0, 0, min(MINIMAP_HEAT_MAX, count * MINIMAP_HEAT_STEP)))
+        self.changed = True
+
+    def update(self, world, revision, slots_x, slots_y, get_density):
+        """ Menyiapkan surface minimap untuk frame ini; get_density hanya dipanggil sesekali """
+        if world.world_id != self.world_id or (slots_x, slots_y) != self.slots:
+            self.rebuild(world, revision, slots_x, slots_y)
+        elif revision != self.revision:
+            self.apply_changes(world, revision)
+        self.frames_since_heat += 1
+        if self.frames_since_heat >= MINIMAP_HEAT_INTERVAL:
+            self.frames_since_heat = 0
+            self.set_density(get_density())
+        if self.changed:
+            combined = self.cells.copy()
+            combined.blit(self.heat, (0, 0))
+            self.surface = pygame.transform.scale(combined, self.get_size())
+            self.changed = False
+        return self.surface
+
+    def draw(self, screen, rect, view_rect):
+        """ Minimap di rect layar beserta persegi kamera (view_rect: internal left, top, right, bottom) """
+        screen.blit(self.surface, rect.topleft)
+        factor = self.scale / SHOP_SIZE
+        left, top, right, bottom = view_rect
+        camera_rect = pygame.Rect(rect.x + int(left * factor), rect.y + int(top * factor),
+                                  max(2, int((right - left) * factor)), max(2, int((bottom - top) * factor)))
+        screen.set_clip(rect)
+        pygame.draw.rect(screen, WHITE, camera_rect, 1)
+        screen.set_clip(None)
+        pygame.draw.rect(screen, BLACK, rect.inflate(4, 4), 2)
+
+    def to_internal(self, local_pos):
+        """ Titik di minimap (relatif pojok kiri-atasnya) ke koordinat internal mall """
+        factor = SHOP_SIZE / self.scale
+        return (local_pos[0] * factor, local_pos[1] * factor)
@@ -0,0 +1,22 @@
+import pygame
+
+# Faktor skala tiap level zoom kamera (0 = 1:1, makin besar makin jauh)
+ZOOM_LEVELS = (1.0, 0.5, 0.25, 0.125, 0.0625)
+# Level >= ini tidak memakai sprite lagi: toko jadi petak warna datar, customer jadi titik
+FLAT_DETAIL_LEVEL = 3
+
+
+def build_mips(surface, levels=FLAT_DETAIL_LEVEL):
+    """
+    Rantai mip untuk satu sprite: [level 0 (asli), level 1, ...]. Tiap level
+    dihaluskan dari level sebelumnya (bukan dari aslinya) agar hasil skala
+    kecil tidak berkedip, dan semuanya dibuat sekali saat sprite pertama
+    dipakai, bukan saat menggambar.
+    """
+    mips = [surface]
+    width, height = surface.get_size()
+    for level in range(1, levels):
+        zoom = ZOOM_LEVELS[level]
+        size = (max(1, round(width * zoom)), max(1, round(height * zoom)))
+        mips.append(pygame.transform.smoothscale(mips[-1], size))
+    return mips
@@ -0,0 +1,139 @@
+import random
+from array import array
+
+import pygame
+
+from color import *
+
+# Jumlah partikel maksimum yang hidup bersamaan; emit di atas ini diabaikan
+PARTICLE_CAPACITY = 2048
+PARTICLE_COIN = 0
+PARTICLE_TEXT = 1
+# Koin yang meletup per payout
+COIN_POP_COUNT = 3
+COIN_POP_LIFE = 0.8
+COIN_GRAVITY = 500.0
+TEXT_LIFE = 1.2
+TEXT_RISE_SPEED = 45.0
+# Batas jumlah surface teks "+N" yang di-cache sebelum cache dikosongkan
+TEXT_CACHE_SIZE = 256
+
+
+class ParticleSystem:
+    """
+    Partikel efek (koin meletup, teks "+100" melayang) dalam array paralel
+    berkapasitas tetap: posisi, kecepatan, sisa umur, jenis dan nilai. Partikel
+    hidup selalu rapat di indeks [0, count); partikel mati ditukar dengan yang
+    terakhir, jadi emit, update dan hapus tidak mengalokasi apa pun.
+
+    Posisi dalam koordinat internal mall, teks diambil dari cache surface.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        zeros = bytes(8 * capacity)
+        self.x = array('d', zeros)
+        self.y = array('d', zeros)
+        self.vx = array('d', zeros)
+        self.vy = array('d', zeros)
+        self.life = array('d', zeros)
+        self.value = array('d', zeros)
+        self.kind = array('b', bytes(capacity))
+        self.count = 0
+        self.dropped = 0
+        # Acak visual sendiri agar tidak menggeser urutan random simulasi
+        self.rng = random.Random()
+        self.font = None
+        self.text_cache = {}
+        self.coin_sprite = None
+
+    def emit(self, kind, x, y, vx, vy, life, value=0.0):
+        index = self.count
+        if index == self.capacity:
+            self.dropped += 1
+            return
+        self.x[index] = x
+        self.y[index] = y
+        self.vx[index] = vx
+        self.vy[index] = vy
+        self.life[index] = life
+        self.value[index] = value
+        self.kind[index] = kind
+        self.count = index + 1
+
+    def emit_payout(self, x, y, amount):
+        """ Koin meletup ke atas dan teks "+amount" di titik internal (x, y) """
+        rng = self.rng
+        for _ in range(COIN_POP_COUNT):
+            self.emit(PARTICLE_COIN, x, y, rng.uniform(-70.0, 70.0), rng.uniform(-220.0, -150.0),
+                      COIN_POP_LIFE * rng.uniform(0.8, 1.0))
+        self.emit(PARTICLE_TEXT, x, y - 10, 0.0, -TEXT_RISE_SPEED, TEXT_LIFE, amount)
+
+    def update(self, dt):
+        """ Satu lintasan untuk semua partikel: gerak, gravitasi koin, umur, hapus yang mati """
+        x, y, vx, vy, life, value, kind = self.x, self.y, self.vx, self.vy, self.life, self.value, self.kind
+        gravity = COIN_GRAVITY * dt
+        index = 0
+        count = self.count
+        while index < count:
+            remaining = life[index] - dt
+            if remaining <= 0:
+                count -= 1
+                x[index] = x[count]
+                y[index] = y[count]
+                vx[index] = vx[count]
+                vy[index] = vy[count]
+                life[index] = life[count]
+                value[index] = value[count]
+                kind[index] = kind[count]
+                continue
+            life[index] = remaining
+            x[index] += vx[index] * dt
+            y[index] += vy[index] * dt
+            if kind[index] == PARTICLE_COIN:
+                vy[index] += gravity
+            index += 1
+        self.count = count
+
+    def clear(self):
+        self.count = 0
+
+    def get_text(self, amount):
+        surface = self.text_cache.get(amount)
+        if surface is None:
+            if self.font is None:
+                self.font = pygame.font.Font(None, 26)
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            text = self.font.render(f"+{amount}", True, YELLOW)
+            outline = self.font.render(f"+{amount}", True, BLACK)
+            surface = pygame.Surface((text.get_width() + 2, text.get_height() + 2), pygame.SRCALPHA)
+            for dx, dy in ((0, 1), (2, 1), (1, 0), (1, 2)):
+                surface.blit(outline, (dx, dy))
+            surface.blit(text, (1, 1))
+            self.text_cache[amount] = surface
+        return surface
+
+    def get_coin_sprite(self):
+        if self.coin_sprite is None:
+            sprite = pygame.Surface((12, 12), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, YELLOW, (6, 6), 6)
+            pygame.draw.circle(sprite, ORANGE, (6, 6), 4)
+            pygame.draw.circle(sprite, BLACK, (6, 6), 6, 1)
+            self.coin_sprite = sprite
+        return self.coin_sprite
+
+    def draw(self, screen, offset_x, offset_y, zoom=1.0):
+        coin = self.get_coin_sprite()
+        coin_half = coin.get_width() // 2
+        x, y, life, value, kind = self.x, self.y, self.life, self.value, self.kind
+        for index in range(self.count):
+            screen_x = int(x[index] * zoom) + offset_x
+            screen_y = int(y[index] * zoom) + offset_y
+            if kind[index] == PARTICLE_COIN:
+                screen.blit(coin, (screen_x - coin_half, screen_y - coin_half))
+            else:
+                text = self.get_text(int(value[index]))
+                # Memudar di paruh akhir umurnya
+                text.set_alpha(min(255, int(255 * 2 * life[index] / TEXT_LIFE)))
+                screen.blit(text, (screen_x - text.get_width() // 2, screen_y))
@@ -1,4 +1,12 @@
+from collections import namedtuple
+
+# *** BARU: Data tampilan satu quest (tuple biasa, aman dibaca thread render) ***
+QuestView = namedtuple("QuestView", "description target progress reward_coins reward_xp completed")
+
+
 class Quest:
+    __slots__ = ("description", "target", "progress", "reward_coins", "reward_xp", "completed")
+
     def __init__(self, description, target, reward_coins, reward_xp):
         self.description = description
         self.target = target
@@ -10,4 +18,8 @@ class Quest:
     def update_progress(self, amount):
         self.progress += amount
         if self.progress >= self.target:
-            self.completed = True
\ No newline at end of file
+            self.completed = True
+
+    def get_view(self):
+        return QuestView(self.description, self.target, self.progress,
+                         self.reward_coins, self.reward_xp, self.completed)
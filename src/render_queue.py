@@ -0,0 +1,31 @@
+from itertools import groupby
+from operator import itemgetter
+
+# Urutan layer dunia (kecil digambar lebih dulu)
+LAYER_DECORATION = 0
+LAYER_SHOP = 1
+LAYER_SHADOW = 2
+LAYER_CUSTOMER = 3
+
+
+class RenderQueue:
+    """
+    Mengumpulkan pasangan (surface, posisi) untuk layer dunia, lalu
+    mengurutkannya sekali berdasarkan (layer, y layar) dan mengirim tiap layer
+    dengan satu panggilan screen.blits().
+    """
+
+    def __init__(self):
+        self.items = []
+        self.blit_calls = 0
+
+    def add(self, layer, sort_y, surface, pos):
+        self.items.append((layer, sort_y, surface, pos))
+
+    def flush(self, screen):
+        self.items.sort(key=itemgetter(0, 1))
+        self.blit_calls = 0
+        for _, group in groupby(self.items, key=itemgetter(0)):
+            screen.blits([(item[2], item[3]) for item in group], doreturn=False)
+            self.blit_calls += 1
+        self.items.clear()
@@ -15,6 +15,32 @@ class SaveManager:
         """Mendapatkan path file save untuk slot tertentu"""
         return os.path.join(self.save_dir, f"save_slot_{slot}.json")
     
+    def get_metrics_path(self, slot):
+        """Path file riwayat statistik (biner) yang menyertai save slot"""
+        return os.path.join(self.save_dir, f"save_slot_{slot}.metrics")
+    
+    def save_metrics(self, data, slot):
+        """Menyimpan riwayat statistik (bytes dari MetricsStore.to_bytes) di samping file save"""
+        try:
+            with open(self.get_metrics_path(slot), 'wb') as f:
+                f.write(data)
+            return True
+        except Exception as e:
+            print(f"✗ Error saving metrics: {e}")
+            return False
+    
+    def load_metrics(self, slot):
+        """Memuat riwayat statistik slot; None jika belum ada"""
+        try:
+            metrics_path = self.get_metrics_path(slot)
+            if not os.path.exists(metrics_path):
+                return None
+            with open(metrics_path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            print(f"✗ Error loading metrics: {e}")
+            return None
+    
     def save_exists(self, slot):
         """Cek apakah save slot sudah ada"""
         return os.path.exists(self.get_save_path(slot))
@@ -110,6 +136,8 @@ class SaveManager:
             save_path = self.get_save_path(slot)
             if os.path.exists(save_path):
                 os.remove(save_path)
+                if os.path.exists(self.get_metrics_path(slot)):
+                    os.remove(self.get_metrics_path(slot))
                 print(f"✓ Save slot {slot} deleted")
                 return True
             return False
@@ -1,11 +1,23 @@
-import time
+import game_clock
 import pygame
+from collections import deque, namedtuple
 from enum import Enum
 from color import *
+from render_queue import LAYER_SHOP
+from mipmap import ZOOM_LEVELS, build_mips
 
 # *** BARU: Konstanta ukuran grid ***
 SHOP_SIZE = 100 # 100x100
 
+# Ruang tambahan di sprite untuk atap (menonjol ke atas) dan bayangan (kanan-bawah)
+SPRITE_PAD_LEFT = 2
+SPRITE_PAD_TOP = 12
+SPRITE_PAD_RIGHT = 6
+SPRITE_PAD_BOTTOM = 6
+
+# Lama melayani satu customer diturunkan dari production_time template (detik)
+SERVICE_TIME_PER_PRODUCTION = 1 / 30
+
 class ShopType(Enum):
     FOOD = "Food"
     CLOTHING = "Clothing"
@@ -15,35 +27,50 @@ class ShopType(Enum):
     # *** BARU: Tambahkan tipe toko baru jika ada ***
     CAFE = "Cafe"
 
+# demand: bobot relatif seberapa sering customer memilih tipe toko ini
+# capacity: jumlah customer yang bisa dilayani bersamaan, sisanya antre
 SHOP_TEMPLATES = {
     ShopType.FOOD: {
         "name": "Food Court", "cost": 500, "production_time": 30, "income": 100,
-        "color": ORANGE, "icon_color": YELLOW, "level_required": 1
+        "color": ORANGE, "icon_color": YELLOW, "level_required": 1, "demand": 3.0, "capacity": 3
     },
     ShopType.CLOTHING: {
         "name": "Fashion Store", "cost": 1000, "production_time": 60, "income": 200,
-        "color": PINK, "icon_color": RED, "level_required": 2
+        "color": PINK, "icon_color": RED, "level_required": 2, "demand": 2.0, "capacity": 2
     },
     ShopType.ENTERTAINMENT: {
         "name": "Game Center", "cost": 1500, "production_time": 90, "income": 300,
-        "color": PURPLE, "icon_color": BLUE, "level_required": 3
+        "color": PURPLE, "icon_color": BLUE, "level_required": 3, "demand": 2.0, "capacity": 4
     },
     ShopType.ELECTRONICS: {
         "name": "Tech Store", "cost": 2000, "production_time": 120, "income": 400,
-        "color": BLUE, "icon_color": LIGHT_BLUE, "level_required": 4
+        "color": BLUE, "icon_color": LIGHT_BLUE, "level_required": 4, "demand": 1.5, "capacity": 2
     },
     ShopType.BOOKSTORE: {
         "name": "Book Haven", "cost": 800, "production_time": 45, "income": 150,
-        "color": BROWN, "icon_color": YELLOW, "level_required": 2
+        "color": BROWN, "icon_color": YELLOW, "level_required": 2, "demand": 1.0, "capacity": 2
     },
     # *** BARU: Template untuk toko baru ***
     ShopType.CAFE: {
         "name": "Coffee Shop", "cost": 600, "production_time": 35, "income": 120,
-        "color": (139, 69, 19), "icon_color": (245, 222, 179), "level_required": 1
+        "color": (139, 69, 19), "icon_color": (245, 222, 179), "level_required": 1, "demand": 2.5, "capacity": 3
     }
 }
 
+# *** BARU: Data gambar satu toko (tuple biasa, aman dibaca thread render) ***
+# progress None = tidak sedang produksi (atau data statis chunk yang tidak memuat progres)
+ShopView = namedtuple("ShopView", "type x y width height progress queue_length")
+
 class Shop:
+    __slots__ = (
+        "type", "template", "x", "y", "width", "height", "level",
+        "is_producing", "production_start", "customers_served",
+        # Antrean layanan: FIFO customer menunggu + customer yang sedang dilayani
+        "capacity", "service_time", "queue", "in_service", "next_ticket", "head_ticket",
+        "visits", "total_wait", "max_queue_length", "first_arrival",
+    )
+    sprite_cache = {}
+
     def __init__(self, shop_type, x, y):
         self.type = shop_type
         self.template = SHOP_TEMPLATES[shop_type]
@@ -57,23 +84,89 @@ class Shop:
         self.production_start = None
         self.customers_served = 0
         
+        self.capacity = self.template["capacity"]
+        self.service_time = self.template["production_time"] * SERVICE_TIME_PER_PRODUCTION
+        self.queue = deque()
+        self.in_service = []
+        # Nomor antrean: posisi customer di barisan = tiketnya - head_ticket, O(1)
+        self.next_ticket = 0
+        self.head_ticket = 0
+        self.visits = 0
+        self.total_wait = 0.0
+        self.max_queue_length = 0
+        self.first_arrival = None
+        
     def start_production(self):
         self.is_producing = True
-        self.production_start = time.time()
+        self.production_start = game_clock.now()
         
     def get_production_progress(self):
         if not self.is_producing:
             return 0
-        elapsed = time.time() - self.production_start
+        elapsed = game_clock.now() - self.production_start
         progress = (elapsed / self.template["production_time"]) * 100
         return min(progress, 100)
     
-    def collect_income(self):
+    def collect_income(self, influence=None):
+        # *** DIUBAH: bonus dekorasi sekitar dibaca O(1) dari InfluenceMap ***
         if self.is_producing and self.get_production_progress() >= 100:
             self.is_producing = False
-            return self.template["income"] * self.level
+            income = self.template["income"] * self.level
+            if influence is not None:
+                income = int(income * (1 + influence.get_bonus(self.x, self.y)))
+            return income
         return 0
     
+    # ================= ANTREAN LAYANAN =================
+    def arrive(self, customer, now):
+        """ Customer sampai di toko: langsung dilayani jika ada slot kosong, jika tidak antre """
+        if self.first_arrival is None:
+            self.first_arrival = now
+        customer.queue_ticket = self.next_ticket
+        customer.queued_at = now
+        self.next_ticket += 1
+        if len(self.in_service) < self.capacity and not self.queue:
+            self._start_service(customer, now)
+        else:
+            self.queue.append(customer)
+            self.max_queue_length = max(self.max_queue_length, len(self.queue))
+
+    def _start_service(self, customer, now):
+        self.head_ticket = customer.queue_ticket + 1
+        self.total_wait += now - customer.queued_at
+        self.in_service.append(customer)
+        customer.begin_service(now + self.service_time)
+
+    def finish(self, customer, now):
+        """ Customer selesai dilayani; slotnya langsung diisi customer terdepan di antrean """
+        self.in_service.remove(customer)
+        self.visits += 1
+        if self.queue:
+            self._start_service(self.queue.popleft(), now)
+
+    def get_queue_position(self, customer):
+        return customer.queue_ticket - self.head_ticket
+
+    def next_service_end(self):
+        """ Waktu paling awal sebuah slot layanan kosong, None jika tidak ada yang dilayani """
+        if not self.in_service:
+            return None
+        return min(customer.service_end for customer in self.in_service)
+
+    def get_service_stats(self, now=None):
+        """ visits, rata-rata tunggu (detik), panjang antrean, dan throughput (customer/menit) """
+        now = game_clock.now() if now is None else now
+        started = self.visits + len(self.in_service)
+        elapsed = now - self.first_arrival if self.first_arrival is not None else 0
+        return {
+            "visits": self.visits,
+            "avg_wait": self.total_wait / started if started else 0.0,
+            "queue_length": len(self.queue),
+            "max_queue_length": self.max_queue_length,
+            "in_service": len(self.in_service),
+            "throughput": self.visits / elapsed * 60 if elapsed > 0 else 0.0,
+        }
+
     @staticmethod
     def draw_preview(screen, x, y, shop_type):
         """ *** BARU: Menggambar pratinjau toko 50x50 untuk menu *** """
@@ -105,43 +198,84 @@ class Shop:
             print(f"Error drawing preview: {e}")
 
     
-    def draw(self, screen, offset_x, offset_y):
-        # *** DIUBAH: Ukuran 100x100 dan proporsi disesuaikan ***
-        draw_x = self.x + offset_x
-        draw_y = self.y + offset_y
-        
-        shadow_rect = pygame.Rect(draw_x + 4, draw_y + 4, self.width, self.height)
+    @staticmethod
+    def draw_body(screen, draw_x, draw_y, template, width, height):
+        """ Menggambar badan toko (bayangan, dinding, atap, pintu, jendela) dengan primitif """
+        shadow_rect = pygame.Rect(draw_x + 4, draw_y + 4, width, height)
         pygame.draw.rect(screen, DARK_GRAY, shadow_rect, border_radius=12)
         
-        shop_rect = pygame.Rect(draw_x, draw_y, self.width, self.height)
-        pygame.draw.rect(screen, self.template["color"], shop_rect, border_radius=12)
+        shop_rect = pygame.Rect(draw_x, draw_y, width, height)
+        pygame.draw.rect(screen, template["color"], shop_rect, border_radius=12)
         pygame.draw.rect(screen, BLACK, shop_rect, 3, border_radius=12)
         
         # Atap (disesuaikan untuk 100px)
         roof_points = [
             (draw_x, draw_y + 20),
-            (draw_x + self.width // 2, draw_y - 10),
-            (draw_x + self.width, draw_y + 20)
+            (draw_x + width // 2, draw_y - 10),
+            (draw_x + width, draw_y + 20)
         ]
-        pygame.draw.polygon(screen, self.template["icon_color"], roof_points)
+        pygame.draw.polygon(screen, template["icon_color"], roof_points)
         pygame.draw.polygon(screen, BLACK, roof_points, 2)
         
         # Pintu (disesuaikan untuk 100px)
-        door_rect = pygame.Rect(draw_x + self.width // 2 - 15, draw_y + 55, 30, 40)
+        door_rect = pygame.Rect(draw_x + width // 2 - 15, draw_y + 55, 30, 40)
         pygame.draw.rect(screen, (101, 67, 33), door_rect, border_radius=5)
-        pygame.draw.circle(screen, YELLOW, (draw_x + self.width // 2 + 8, draw_y + 75), 3)
+        pygame.draw.circle(screen, YELLOW, (draw_x + width // 2 + 8, draw_y + 75), 3)
         
         # Jendela (disesuaikan untuk 100px)
         window1 = pygame.Rect(draw_x + 15, draw_y + 30, 20, 20)
-        window2 = pygame.Rect(draw_x + self.width - 35, draw_y + 30, 20, 20)
+        window2 = pygame.Rect(draw_x + width - 35, draw_y + 30, 20, 20)
         pygame.draw.rect(screen, LIGHT_BLUE, window1, border_radius=3)
         pygame.draw.rect(screen, LIGHT_BLUE, window2, border_radius=3)
         pygame.draw.rect(screen, BLACK, window1, 1, border_radius=3)
         pygame.draw.rect(screen, BLACK, window2, 1, border_radius=3)
-        
-        # Progress bar
-        if self.is_producing:
-            progress = self.get_production_progress()
-            bar_width = int((self.width - 10) * progress / 100)
-            pygame.draw.rect(screen, DARK_GRAY, (draw_x + 5, draw_y - 15, self.width - 10, 8), border_radius=4)
-            pygame.draw.rect(screen, GREEN, (draw_x + 5, draw_y - 15, bar_width, 8), border_radius=4)
\ No newline at end of file
+
+    @classmethod
+    def get_sprite(cls, shop_type, level=0):
+        """ *** DIUBAH: Badan toko di-render sekali per tipe, lengkap dengan rantai mip untuk zoom *** """
+        mips = cls.sprite_cache.get(shop_type)
+        if mips is None:
+            sprite = pygame.Surface((SHOP_SIZE + SPRITE_PAD_LEFT + SPRITE_PAD_RIGHT,
+                                     SHOP_SIZE + SPRITE_PAD_TOP + SPRITE_PAD_BOTTOM), pygame.SRCALPHA)
+            Shop.draw_body(sprite, SPRITE_PAD_LEFT, SPRITE_PAD_TOP, SHOP_TEMPLATES[shop_type], SHOP_SIZE, SHOP_SIZE)
+            mips = cls.sprite_cache[shop_type] = build_mips(sprite)
+        return mips[level]
+
+    def get_view(self, static=False):
+        """ static: hanya posisi dan tipe (untuk salinan chunk), tanpa progres/antrean yang berubah tiap tick """
+        if static:
+            return ShopView(self.type, self.x, self.y, self.width, self.height, None, 0)
+        progress = self.get_production_progress() if self.is_producing else None
+        return ShopView(self.type, self.x, self.y, self.width, self.height, progress, len(self.queue))
+
+    @staticmethod
+    def queue_sprite(render_queue, shop, offset_x, offset_y, level=0):
+        """ shop: Shop atau ShopView; offset: posisi layar titik (0, 0) internal mall """
+        zoom = ZOOM_LEVELS[level]
+        sprite = Shop.get_sprite(shop.type, level)
+        pos = (int((shop.x - SPRITE_PAD_LEFT) * zoom) + offset_x, int((shop.y - SPRITE_PAD_TOP) * zoom) + offset_y)
+        render_queue.add(LAYER_SHOP, shop.y * zoom + offset_y, sprite, pos)
+
+    def queue_draw(self, render_queue, offset_x, offset_y, level=0):
+        Shop.queue_sprite(render_queue, self, offset_x, offset_y, level)
+
+    @staticmethod
+    def draw_progress(screen, view, offset_x, offset_y, zoom=1.0):
+        """ Progress bar produksi dari ShopView (tidak digambar jika progress None) """
+        if view.progress is None:
+            return
+        draw_x = view.x * zoom + offset_x
+        draw_y = view.y * zoom + offset_y
+        width = (view.width - 10) * zoom
+        bar_width = int(width * view.progress / 100)
+        pygame.draw.rect(screen, DARK_GRAY, (draw_x + 5 * zoom, draw_y - 15 * zoom, width, 8 * zoom), border_radius=4)
+        pygame.draw.rect(screen, GREEN, (draw_x + 5 * zoom, draw_y - 15 * zoom, bar_width, 8 * zoom), border_radius=4)
+
+    def draw_progress_bar(self, screen, offset_x, offset_y, zoom=1.0):
+        Shop.draw_progress(screen, self.get_view(), offset_x, offset_y, zoom)
+
+    def draw(self, screen, offset_x, offset_y):
+        # *** DIUBAH: Ukuran 100x100 dan proporsi disesuaikan ***
+        sprite = Shop.get_sprite(self.type)
+        screen.blit(sprite, (self.x + offset_x - SPRITE_PAD_LEFT, self.y + offset_y - SPRITE_PAD_TOP))
+        self.draw_progress_bar(screen, offset_x, offset_y)
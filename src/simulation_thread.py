@@ -0,0 +1,182 @@
+import queue
+import threading
+import time
+
+# Method Game yang boleh dipanggil lewat antrean perintah dari thread render
+SIM_COMMANDS = frozenset(("build_shop", "build_decoration", "build_area", "expand_mall", "save_game_data"))
+
+
+class WorldSnapshot:
+    """
+    Keadaan dunia pada satu tick simulasi untuk thread render. Isinya hanya tuple
+    biasa (ShopView, CustomerView, QuestView, MallView) dan salinan beku
+    (ChunkedWorld.freeze(), MetricsStore.copy()), tidak ada objek yang masih
+    diubah thread simulasi, jadi thread render bisa membacanya tanpa lock.
+    Nama atribut dan method-nya sama dengan Game sehingga kode gambar yang
+    sama bisa membaca dari Game maupun dari snapshot.
+
+    Bagian yang jarang berubah (mall, dunia statis, riwayat statistik) dipakai
+    ulang dari snapshot sebelumnya selama sumbernya tidak berubah.
+    """
+    __slots__ = ("tick", "coins", "gems", "level", "xp", "xp_to_next_level", "mall",
+                 "shop_views", "customer_views", "customer_count", "quests", "shop_count",
+                 "queue_summary", "customer_density", "chunks", "world_revision", "metrics")
+
+    # Ringkasan antrean dan kepadatan customer menjumlah semua toko/customer, jadi cukup dihitung ulang sesekali
+    QUEUE_SUMMARY_INTERVAL = 30
+
+    def __init__(self, game, tick, previous=None):
+        self.tick = tick
+        self.coins = game.coins
+        self.gems = game.gems
+        self.level = game.level
+        self.xp = game.xp
+        self.xp_to_next_level = game.xp_to_next_level
+        mall = game.mall
+        if previous is not None and (previous.mall.width, previous.mall.height) == (mall.width, mall.height):
+            self.mall = previous.mall
+        else:
+            self.mall = mall.get_view()
+        # Hanya toko di chunk sekitar kamera yang progress bar-nya perlu digambar
+        self.shop_views = game.get_shop_views()
+        # Customer yang tidur (LOD) ada di luar layar, jadi tidak perlu dipublikasikan
+        self.customer_views = game.get_customer_views()
+        self.customer_count = len(game.customers)
+        self.quests = tuple(quest.get_view() for quest in game.quests)
+        self.shop_count = game.shop_count
+        if previous is None or tick % self.QUEUE_SUMMARY_INTERVAL == 0:
+            self.queue_summary = game.get_queue_summary()
+            self.customer_density = game.get_customer_density()
+        else:
+            self.queue_summary = previous.queue_summary
+            self.customer_density = previous.customer_density
+        if (previous is not None and previous.world_revision == game.world_revision
+                and previous.chunks.world_id == game.chunks.world_id):
+            self.chunks = previous.chunks
+        else:
+            self.chunks = game.chunks.freeze(None if previous is None else previous.chunks)
+        self.world_revision = game.world_revision
+        if previous is not None and previous.metrics.samples == game.metrics.samples:
+            self.metrics = previous.metrics
+        else:
+            # Riwayat diambil sampelnya sekali per METRICS_SAMPLE_INTERVAL, jadi salinan jarang dibuat
+            self.metrics = game.metrics.copy()
+
+    def get_shop_views(self):
+        return self.shop_views
+
+    def get_customer_views(self):
+        return self.customer_views
+
+    def get_queue_summary(self):
+        return self.queue_summary
+
+    def get_customer_density(self):
+        return self.customer_density
+
+
+class SnapshotBuffer:
+    """ Double buffer: penulis mengisi slot belakang lalu menukarnya ke depan """
+
+    def __init__(self, initial=None):
+        self._slots = [initial, None]
+        self._front = 0
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._lock:
+            self._front = back
+
+    def latest(self):
+        with self._lock:
+            return self._slots[self._front]
+
+
+class SimulationThread:
+    """
+    Menjalankan Game.update() di thread sendiri dengan tick tetap. Perintah input
+    dari thread render diantrikan lalu dijalankan di awal tick berikutnya, dan
+    hasil tiap tick dipublikasikan sebagai WorldSnapshot.
+    """
+
+    def __init__(self, game, tick_rate=60, max_catch_up=5):
+        self.game = game
+        self.tick_interval = 1.0 / tick_rate
+        self.max_catch_up = max_catch_up
+        self.commands = queue.Queue()
+        self.tick = 0
+        self.buffer = SnapshotBuffer(WorldSnapshot(game, self.tick))
+        self._running = threading.Event()
+        self._thread = None
+
+        # Statistik waktu tick untuk melihat apakah simulasi tertinggal
+        self.tick_times = []
+        self.dropped_ticks = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._loop, name="simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Menghentikan thread dan menjalankan sisa perintah yang sudah diantrikan """
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._thread.join()
+        self._thread = None
+        self._drain_commands()
+
+    def submit(self, name, *args):
+        if name not in SIM_COMMANDS:
+            raise ValueError(f"Unknown simulation command: {name}")
+        self.commands.put((name, args))
+
+    def latest(self):
+        return self.buffer.latest()
+
+    def _drain_commands(self):
+        while True:
+            try:
+                name, args = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            getattr(self.game, name)(*args)
+
+    def _step(self):
+        t0 = time.perf_counter()
+        self._drain_commands()
+        self.game.update()
+        self.tick += 1
+        self.buffer.publish(WorldSnapshot(self.game, self.tick, self.buffer.latest()))
+        self.tick_times.append(time.perf_counter() - t0)
+        if len(self.tick_times) > 600:
+            del self.tick_times[:300]
+
+    def _loop(self):
+        next_tick = time.perf_counter()
+        while self._running.is_set():
+            self._step()
+            next_tick += self.tick_interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > self.tick_interval * self.max_catch_up:
+                # Terlalu tertinggal (misal save lambat): lewati tick, jangan kejar semuanya
+                skipped = int(-delay / self.tick_interval)
+                self.dropped_ticks += skipped
+                next_tick += skipped * self.tick_interval
+
+    def get_stats(self):
+        """ Rata-rata dan maksimum durasi tick (detik) serta tick yang dilewati """
+        if not self.tick_times:
+            return {"mean": 0.0, "max": 0.0, "dropped": self.dropped_ticks}
+        return {
+            "mean": sum(self.tick_times) / len(self.tick_times),
+            "max": max(self.tick_times),
+            "dropped": self.dropped_ticks,
+        }
@@ -0,0 +1,273 @@
+"""
+Simulator keseimbangan ekonomi: menjalankan banyak playthrough headless
+secara paralel (satu proses per core) dengan strategi pemain dan seed
+berbeda, lalu merangkum waktu naik level, kurva koin dan waktu quest.
+
+Contoh (dari folder src):
+    python simulator.py --runs 64 --duration 3600
+    python simulator.py --strategies greedy expander --json report.json
+    python simulator.py --runs 16 --baseline
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker tidak membuka jendela atau perangkat audio
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import game_clock
+from main import Game, SHOP_GRID_SIZE
+from shop import SHOP_TEMPLATES
+from decoration import DecorationType, DECORATION_TEMPLATES
+
+
+# ================= STRATEGI PEMAIN =================
+def _unlocked_shops(game):
+    return [shop_type for shop_type, template in SHOP_TEMPLATES.items()
+            if game.level >= template["level_required"]]
+
+
+def _free_slot(game, rng=None):
+    slots_x, slots_y = game.mall.get_shop_slots()
+    free = [(i * SHOP_GRID_SIZE, j * SHOP_GRID_SIZE)
+            for j in range(slots_y) for i in range(slots_x)
+            if not game.is_grid_occupied(i * SHOP_GRID_SIZE, j * SHOP_GRID_SIZE)]
+    if not free:
+        return None
+    return rng.choice(free) if rng else free[0]
+
+
+def _build_or_expand(game, shop_type, rng=None):
+    slot = _free_slot(game, rng)
+    if slot is None:
+        return game.expand_mall()
+    return game.build_shop(shop_type, *slot)
+
+
+def strategy_greedy(game, rng):
+    """ Selalu membangun toko dengan income per detik tertinggi yang terbuka """
+    best = max(_unlocked_shops(game), key=lambda t: SHOP_TEMPLATES[t]["income"] / SHOP_TEMPLATES[t]["production_time"])
+    _build_or_expand(game, best)
+
+
+def strategy_cheapest(game, rng):
+    """ Membangun toko termurah yang terbuka secepat mungkin """
+    cheapest = min(_unlocked_shops(game), key=lambda t: SHOP_TEMPLATES[t]["cost"])
+    _build_or_expand(game, cheapest)
+
+
+def strategy_expander(game, rng):
+    """ Memperluas mall begitu mampu, sisanya membangun toko termahal yang terbeli """
+    if game.expand_mall():
+        return
+    affordable = [t for t in _unlocked_shops(game) if SHOP_TEMPLATES[t]["cost"] <= game.coins]
+    if affordable:
+        best = max(affordable, key=lambda t: SHOP_TEMPLATES[t]["cost"])
+        _build_or_expand(game, best)
+
+
+def strategy_decorator(game, rng):
+    """ Menyelingi toko dengan dekorasi (satu dekorasi per dua toko) """
+    if len(game.decorations) * 2 < len(game.shops):
+        dec_type = min(DecorationType, key=lambda d: DECORATION_TEMPLATES[d]["cost"])
+        slot = _free_slot(game, rng)
+        if slot is not None:
+            game.build_decoration(dec_type, *slot)
+            return
+    strategy_greedy(game, rng)
+
+
+def strategy_random(game, rng):
+    """ Aksi acak: bangun toko acak, dekorasi, atau ekspansi """
+    roll = rng.random()
+    if roll < 0.7:
+        _build_or_expand(game, rng.choice(_unlocked_shops(game)), rng)
+    elif roll < 0.85:
+        slot = _free_slot(game, rng)
+        if slot is not None:
+            game.build_decoration(rng.choice(list(DecorationType)), *slot)
+    else:
+        game.expand_mall()
+
+
+STRATEGIES = {
+    "greedy": strategy_greedy,
+    "cheapest": strategy_cheapest,
+    "expander": strategy_expander,
+    "decorator": strategy_decorator,
+    "random": strategy_random,
+}
+
+
+# ================= PLAYTHROUGH =================
+def _init_worker():
+    pygame.init()
+    # Mode 1x1 di driver dummy agar gambar customer bisa convert_alpha()
+    pygame.display.set_mode((1, 1))
+
+
+def run_playthrough(job):
+    """ Menjalankan satu playthrough headless dengan jam simulasi; hasilnya dict kecil """
+    strategy_name, seed, duration, fps, sample_interval = job
+    started = time.perf_counter()
+    random.seed(seed)
+    rng = random.Random(seed)
+    clock = game_clock.SimulatedClock()
+    game_clock.use_clock(clock)
+    try:
+        game = Game(headless=True)
+        strategy = STRATEGIES[strategy_name]
+
+        level_times = {game.level: 0.0}
+        quest_times = {}
+        coin_curve = []
+        dt = 1.0 / fps
+        total_frames = int(duration * fps)
+        sample_every = max(1, int(sample_interval * fps))
+
+        for frame in range(total_frames + 1):
+            if frame % sample_every == 0:
+                coin_curve.append(game.coins)
+            if frame % fps == 0:
+                strategy(game, rng)
+            game.update()
+            clock.advance(dt)
+
+            sim_time = frame * dt
+            if game.level not in level_times:
+                for level in range(max(level_times) + 1, game.level + 1):
+                    level_times[level] = sim_time
+            for quest in game.quests:
+                if quest.completed and quest.description not in quest_times:
+                    quest_times[quest.description] = sim_time
+    finally:
+        game_clock.use_clock(None)
+
+    return {
+        "strategy": strategy_name,
+        "seed": seed,
+        "level_times": level_times,
+        "quest_times": quest_times,
+        "coin_curve": coin_curve,
+        "final_coins": game.coins,
+        "final_level": game.level,
+        "shops": len(game.shops),
+        "cpu_seconds": time.perf_counter() - started,
+    }
+
+
+# ================= LAPORAN =================
+def aggregate(results, strategies, sample_interval):
+    report = {}
+    for name in strategies:
+        runs = [r for r in results if r["strategy"] == name]
+        if not runs:
+            continue
+        levels = sorted({level for r in runs for level in r["level_times"]})
+        quests = sorted({q for r in runs for q in r["quest_times"]})
+        curve_len = min(len(r["coin_curve"]) for r in runs)
+        report[name] = {
+            "runs": len(runs),
+            "time_to_level": {
+                level: {
+                    "median": statistics.median(times),
+                    "reached": len(times) / len(runs),
+                }
+                for level in levels
+                for times in [[r["level_times"][level] for r in runs if level in r["level_times"]]]
+            },
+            "quest_completion": {
+                quest: {
+                    "median": statistics.median(times),
+                    "completed": len(times) / len(runs),
+                }
+                for quest in quests
+                for times in [[r["quest_times"][quest] for r in runs if quest in r["quest_times"]]]
+            },
+            "coin_curve": [
+                (i * sample_interval, statistics.mean(r["coin_curve"][i] for r in runs))
+                for i in range(curve_len)
+            ],
+            "final_level": statistics.mean(r["final_level"] for r in runs),
+            "final_coins": statistics.mean(r["final_coins"] for r in runs),
+        }
+    return report
+
+
+def print_report(report, wall_seconds, cpu_seconds, workers, baseline_seconds=None):
+    for name, data in report.items():
+        print(f"\n=== Strategi: {name} ({data['runs']} run) ===")
+        print(f"Level akhir rata-rata: {data['final_level']:.1f}, koin akhir rata-rata: {data['final_coins']:.0f}")
+        print("Waktu ke level (median):")
+        for level, info in data["time_to_level"].items():
+            print(f"  Lv.{level:<3} {info['median'] / 60:7.1f} menit  ({info['reached'] * 100:.0f}% run)")
+        print("Quest selesai (median):")
+        for quest, info in data["quest_completion"].items():
+            print(f"  {quest:<24} {info['median'] / 60:7.1f} menit  ({info['completed'] * 100:.0f}% run)")
+        print("Kurva koin rata-rata:")
+        step = max(1, len(data["coin_curve"]) // 10)
+        for t, coins in data["coin_curve"][::step]:
+            print(f"  {t / 60:6.1f} menit: {coins:10.0f}")
+    print(f"\nWaktu dinding {wall_seconds:.1f} s, total kerja {cpu_seconds:.1f} s, {workers} worker")
+    if baseline_seconds:
+        speedup = baseline_seconds / wall_seconds if wall_seconds else 0.0
+        print(f"Baseline 1 worker {baseline_seconds:.1f} s: speedup terukur {speedup:.2f}x, "
+              f"efisiensi paralel {speedup / workers * 100:.0f}%")
+    else:
+        # Tanpa baseline serial hanya bisa diperkirakan dari jumlah waktu kerja per run
+        efficiency = cpu_seconds / (wall_seconds * workers) if wall_seconds else 0.0
+        print(f"Efisiensi paralel (perkiraan) {efficiency * 100:.0f}%; pakai --baseline untuk speedup terukur")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulator keseimbangan ekonomi Cozy Idle Builder")
+    parser.add_argument("--runs", type=int, default=32, help="jumlah playthrough")
+    parser.add_argument("--duration", type=float, default=3600, help="durasi simulasi per run (detik game)")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=sorted(STRATEGIES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="jumlah proses (default: semua core)")
+    parser.add_argument("--seed", type=int, default=1, help="seed dasar; run ke-i memakai seed+i")
+    parser.add_argument("--fps", type=int, default=60, help="tick simulasi per detik game")
+    parser.add_argument("--sample-interval", type=float, default=60, help="jarak sampel kurva koin (detik game)")
+    parser.add_argument("--json", help="simpan laporan lengkap ke file JSON")
+    parser.add_argument("--baseline", action="store_true",
+                        help="jalankan ulang semua run dengan 1 worker untuk mengukur speedup sebenarnya")
+    args = parser.parse_args(argv)
+
+    jobs = [
+        (args.strategies[i % len(args.strategies)], args.seed + i, args.duration, args.fps, args.sample_interval)
+        for i in range(args.runs)
+    ]
+
+    started = time.perf_counter()
+    # Tiap run independen dan hasilnya kecil, jadi skala mengikuti jumlah core
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        results = list(pool.map(run_playthrough, jobs, chunksize=1))
+    wall_seconds = time.perf_counter() - started
+
+    baseline_seconds = None
+    if args.baseline:
+        # Job yang sama lewat pool 1 proses, jadi overhead proses ikut terhitung di kedua sisi
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1, initializer=_init_worker) as pool:
+            list(pool.map(run_playthrough, jobs, chunksize=1))
+        baseline_seconds = time.perf_counter() - started
+
+    report = aggregate(results, args.strategies, args.sample_interval)
+    print_report(report, wall_seconds, sum(r["cpu_seconds"] for r in results), args.workers, baseline_seconds)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "report": report, "runs": results}, f, indent=4)
+        print(f"✓ Laporan disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
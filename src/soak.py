@@ -0,0 +1,223 @@
+"""
+Soak test: menjalankan loop headless Game.update() dengan jam simulasi
+selama berhari-hari waktu game, lalu memeriksa bahwa memori, jumlah objek
+(Customer, Shop, pygame.Surface, pygame.mixer.Sound) dan waktu per tick
+tidak terus naik. Gagal (exit code 1) jika melewati ambang.
+
+Pemain membangun dengan strategi simulator selama warmup, lalu diam
+seperti pemain idle yang meninggalkan game berjalan; sejak itu dunia
+statis, jadi semua angka seharusnya datar.
+
+Secara default SoundManager (driver audio dummy), antrean sfx, payout
+events dan ParticleSystem ikut berjalan, dan draw() dipanggil berkala
+agar partikel serta cache teksnya ikut diawasi. --no-effects kembali ke
+Game(headless=True) murni.
+
+Contoh (dari folder src):
+    python soak.py --days 1
+    python soak.py --days 3 --fps 20 --draw-every 600 --json soak.json
+    python soak.py --days 1 --no-effects
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Tanpa jendela dan perangkat audio
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import game_clock
+from main import Game
+from customer import Customer
+from shop import Shop
+from simulator import STRATEGIES
+from sound_manager import SoundManager
+from particles import PARTICLE_CAPACITY
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+def count_objects():
+    """
+    Jumlah objek hidup per tipe. Surface dan Sound tidak dilacak gc, jadi
+    dihitung lewat referensi dari objek yang dilacak (cache dict/list, atribut).
+    """
+    counts = {"Customer": 0, "Shop": 0, "Surface": 0, "Sound": 0}
+    names = {Customer: "Customer", Shop: "Shop", pygame.Surface: "Surface", pygame.mixer.Sound: "Sound"}
+    seen = set()
+    for obj in gc.get_objects():
+        for candidate in (obj, *gc.get_referents(obj)):
+            name = names.get(type(candidate))
+            if name is not None and id(candidate) not in seen:
+                seen.add(id(candidate))
+                counts[name] += 1
+    return counts
+
+
+def take_sample(game, sim_time, window_ticks, window_seconds):
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "hours": sim_time / HOUR,
+        "traced_bytes": current,
+        "tick_us": window_seconds / window_ticks * 1e6 if window_ticks else 0.0,
+        "customers": len(game.customers),
+        "particles": game.particles.count,
+        "text_cache": len(game.particles.text_cache),
+        "sfx": game.sound_manager.get_sfx_stats(),
+        "objects": count_objects(),
+        "snapshot": tracemalloc.take_snapshot(),
+    }
+
+
+def print_sample(sample):
+    objects = sample["objects"]
+    print(f"  {sample['hours']:7.1f} jam  {sample['traced_bytes'] / 1e6:8.2f} MB  {sample['tick_us']:8.1f} us/tick  "
+          f"customers {sample['customers']:5d}  Customer {objects['Customer']:5d}  Shop {objects['Shop']:5d}  "
+          f"Surface {objects['Surface']:5d}  Sound {objects['Sound']:4d}  "
+          f"partikel {sample['particles']:4d}  teks {sample['text_cache']:3d}  sfx diputar {sample['sfx']['played']}")
+
+
+def check_drift(baseline, last, args):
+    """ Daftar pesan kegagalan (kosong = lolos) """
+    failures = []
+    growth = (last["traced_bytes"] - baseline["traced_bytes"]) / 1e6
+    if growth > args.max_memory_growth:
+        failures.append(f"memori naik {growth:.2f} MB (batas {args.max_memory_growth} MB)")
+    if baseline["tick_us"] > 0 and last["tick_us"] > baseline["tick_us"] * args.max_tick_drift:
+        failures.append(f"waktu tick {baseline['tick_us']:.1f} -> {last['tick_us']:.1f} us "
+                        f"(batas {args.max_tick_drift}x)")
+    for name, count in last["objects"].items():
+        base = baseline["objects"][name]
+        if count > base * args.max_object_growth + args.object_slack:
+            failures.append(f"{name} {base} -> {count}")
+    return failures
+
+
+def run_soak(args):
+    pygame.init()
+    # Mode 1x1 di driver dummy agar gambar customer bisa convert_alpha()
+    pygame.display.set_mode((1, 1))
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    clock = game_clock.SimulatedClock()
+    game_clock.use_clock(clock)
+    try:
+        if args.no_effects:
+            game = Game(headless=True)
+        else:
+            # Headless mematikan suara dan payout events; soak menyalakannya lagi
+            # (driver dummy) agar cache Sound, antrean sfx dan partikel ikut diuji
+            game = Game(headless=True, sound_manager=SoundManager(enabled=True))
+            game.payout_events = collections.deque(maxlen=PARTICLE_CAPACITY)
+        strategy = STRATEGIES[args.strategy]
+        dt = 1.0 / args.fps
+        total_ticks = int(args.days * DAY * args.fps)
+        warmup_ticks = int(args.warmup * HOUR * args.fps)
+        sample_ticks = max(1, int(args.sample_interval * HOUR * args.fps))
+
+        # Warmup: pemain aktif membangun, tanpa tracemalloc agar cepat
+        for tick in range(warmup_ticks):
+            if tick % args.fps == 0:
+                strategy(game, rng)
+            game.update()
+            clock.advance(dt)
+        print(f"Warmup {args.warmup} jam selesai: {len(game.shops)} toko, mall {game.mall.width}x{game.mall.height}")
+
+        tracemalloc.start()
+        baseline = take_sample(game, warmup_ticks * dt, 0, 0.0)
+        samples = []
+        window_ticks = 0
+        window_seconds = 0.0
+        started = time.perf_counter()
+        for tick in range(warmup_ticks, total_ticks):
+            t0 = time.perf_counter()
+            game.update()
+            window_seconds += time.perf_counter() - t0
+            window_ticks += 1
+            clock.advance(dt)
+            if args.draw_every and tick % args.draw_every == 0:
+                game.draw()
+            if window_ticks == sample_ticks:
+                sample = take_sample(game, (tick + 1) * dt, window_ticks, window_seconds)
+                print_sample(sample)
+                samples.append(sample)
+                if len(samples) > 1:
+                    # Hanya snapshot terakhir yang dibandingkan; yang lama dibuang agar tidak ikut menumpuk
+                    del samples[-2]["snapshot"]
+                if len(samples) == 1:
+                    # Waktu tick pembanding diambil dari jendela pertama yang diukur
+                    baseline["tick_us"] = sample["tick_us"]
+                window_ticks = 0
+                window_seconds = 0.0
+        wall_seconds = time.perf_counter() - started
+    finally:
+        game_clock.use_clock(None)
+
+    if not samples:
+        print("✗ Durasi terlalu pendek untuk satu sampel setelah warmup")
+        return 1, {}
+
+    last = samples[-1]
+    failures = check_drift(baseline, last, args)
+    simulated = (total_ticks - warmup_ticks) * dt
+    print(f"\n{simulated / HOUR:.1f} jam game dalam {wall_seconds:.1f} s ({simulated / wall_seconds:.0f}x real-time)")
+    if failures:
+        print("✗ Soak gagal:")
+        for failure in failures:
+            print(f"  - {failure}")
+        print("  Pertumbuhan alokasi terbesar sejak warmup:")
+        for stat in last["snapshot"].compare_to(baseline["snapshot"], "lineno")[:args.top]:
+            print(f"    {stat}")
+    else:
+        print("✓ Soak lolos: memori, objek dan waktu tick stabil")
+    tracemalloc.stop()
+
+    report = {
+        "args": vars(args),
+        "passed": not failures,
+        "failures": failures,
+        "samples": [{key: value for key, value in sample.items() if key != "snapshot"}
+                    for sample in [baseline] + samples],
+    }
+    return (1 if failures else 0), report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test memori dan waktu tick Cozy Idle Builder")
+    parser.add_argument("--days", type=float, default=1.0, help="durasi total (hari game)")
+    parser.add_argument("--fps", type=int, default=10, help="tick simulasi per detik game")
+    parser.add_argument("--warmup", type=float, default=1.0, help="jam game pertama: pemain membangun, belum diukur")
+    parser.add_argument("--sample-interval", type=float, default=2.0, help="jarak snapshot (jam game)")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy", help="strategi pemain saat warmup")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--draw-every", type=int, default=60, help="juga panggil draw() tiap N tick (0 = tidak)")
+    parser.add_argument("--no-effects", action="store_true",
+                        help="tanpa suara, payout events dan partikel (Game(headless=True) murni)")
+    parser.add_argument("--max-memory-growth", type=float, default=2.0, help="batas kenaikan memori sejak warmup (MB)")
+    parser.add_argument("--max-tick-drift", type=float, default=1.5, help="batas rasio waktu tick akhir / awal")
+    parser.add_argument("--max-object-growth", type=float, default=1.5, help="batas rasio jumlah objek akhir / awal")
+    parser.add_argument("--object-slack", type=int, default=50, help="toleransi absolut jumlah objek")
+    parser.add_argument("--top", type=int, default=10, help="baris alokasi yang ditampilkan saat gagal")
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    args = parser.parse_args(argv)
+
+    exit_code, report = run_soak(args)
+    if args.json and report:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"✓ Laporan disimpan ke {args.json}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
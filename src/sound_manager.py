@@ -1,9 +1,53 @@
+import io
+import threading
+import time
 import pygame
 import os
+from asset_manager import assets, SFX_MANIFEST
+
+# *** BARU: Prioritas sfx saat jumlah suara melebihi budget (besar = lebih penting) ***
+SFX_PRIORITY = {
+    "quest_complete": 5,
+    "levelup": 4,
+    "click": 3,
+    "error": 3,
+    "build": 2,
+    "coin": 1,
+    "happy": 0,
+}
+
+# *** BARU: Konfigurasi mixer; buffer kecil = jeda klik-ke-suara lebih pendek ***
+AUDIO_CONFIG = {
+    "frequency": 44100,
+    "size": -16,
+    "channels": 2,
+    "buffer": 256,
+}
 
 class SoundManager:
-    def __init__(self):
-        pygame.mixer.init()
+    def __init__(self, enabled=True, max_voices=8, coalesce_window=0.08, audio_config=None):
+        # enabled=False: tanpa mixer sama sekali (mode headless/simulator)
+        self.enabled = enabled
+        self.audio_config = dict(AUDIO_CONFIG, **(audio_config or {}))
+        if enabled:
+            # pygame.init() sebelumnya sudah membuka mixer dengan setelan default, dan
+            # pre_init/init tidak berpengaruh lagi; tutup dulu agar audio_config dipakai
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            pygame.mixer.pre_init(**self.audio_config)
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(max_voices)
+
+        # Budget suara sfx bersamaan dan jendela penggabungan sfx yang sama (detik)
+        self.max_voices = max_voices
+        self.coalesce_window = coalesce_window
+        self.sfx_queue = []
+        # play_sfx dipanggil dari thread simulasi dan thread render (--threaded-sim);
+        # lock menjaga append, pertukaran antrean dan penghitung sfx_stats
+        self.sfx_lock = threading.Lock()
+        self.active_voices = []
+        self.last_played = {}
+        self.sfx_stats = {"requested": 0, "played": 0, "merged": 0, "dropped": 0, "stolen": 0}
 
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.sounds_dir = os.path.join(self.base_dir, "sounds")
@@ -12,45 +56,139 @@ class SoundManager:
         self.sfx_volume = 0.7
 
         self.sfx = {}
+        self.current_bgm = None
 
-        # preload sfx (kalau belum ada file, aman)
-        self._load_sfx_safe("click", "click.wav")
-        self._load_sfx_safe("error", "error.wav")
+        # *** DIUBAH: sfx tidak lagi dimuat di sini; AssetManager memuatnya di latar belakang
+        # dan play_sfx mengambilnya dari cache saat pertama dipakai ***
+        self.sfx_files = dict(SFX_MANIFEST)
 
     def _load_sfx_safe(self, name, filename):
-        path = os.path.join(self.sounds_dir, filename)
-        if os.path.exists(path):
-            sound = pygame.mixer.Sound(path)
+        # Hasil None (file tidak ada) juga disimpan agar tidak dicari ulang
+        sound = assets.get_sound(filename)
+        if sound is not None:
             sound.set_volume(self.sfx_volume)
-            self.sfx[name] = sound
+        self.sfx[name] = sound
 
     # ================= BGM =================
     def play_bgm(self, filename, volume=None):
-        path = os.path.join(self.sounds_dir, filename)
-        if os.path.exists(path):
-            pygame.mixer.music.load(path)
+        if not self.enabled:
+            return
+        # Lagu yang sama sedang diputar: jangan dimuat ulang
+        if filename == self.current_bgm and pygame.mixer.music.get_busy():
+            return
+        data = assets.get_music(filename)
+        if data is not None:
+            pygame.mixer.music.load(io.BytesIO(data), filename)
             pygame.mixer.music.set_volume(volume if volume is not None else self.bgm_volume)
             pygame.mixer.music.play(-1)
+            self.current_bgm = filename
 
     def stop_bgm(self):
-        pygame.mixer.music.stop()
+        if self.enabled:
+            pygame.mixer.music.stop()
+        self.current_bgm = None
 
     def set_bgm_volume(self, volume):
         self.bgm_volume = max(0.0, min(1.0, volume))
-        pygame.mixer.music.set_volume(self.bgm_volume)
+        if self.enabled:
+            pygame.mixer.music.set_volume(self.bgm_volume)
 
     def get_bgm_volume(self):
         return self.bgm_volume
 
     # ================= SFX =================
     def play_sfx(self, name):
-        if name in self.sfx:
-            self.sfx[name].play()
+        """ *** DIUBAH: sfx hanya diantrikan; flush_sfx() memutarnya sekali per frame *** """
+        if not self.enabled:
+            return
+        with self.sfx_lock:
+            self.sfx_stats["requested"] += 1
+            self.sfx_queue.append(name)
+
+    def _get_sfx(self, name):
+        if name not in self.sfx:
+            if name not in self.sfx_files:
+                return None
+            self._load_sfx_safe(name, self.sfx_files[name])
+        return self.sfx[name]
+
+    def flush_sfx(self):
+        """
+        Memutar antrean sfx frame ini: duplikat digabung (dalam frame yang sama
+        atau dalam coalesce_window sejak terakhir diputar), lalu yang prioritasnya
+        tinggi didahulukan sampai budget max_voices penuh.
+        """
+        if not self.sfx_queue:
+            return
+        with self.sfx_lock:
+            # Antrean ditukar di dalam lock: play_sfx dari thread lain masuk ke antrean baru
+            queued, self.sfx_queue = self.sfx_queue, []
+        # Dedup dan pemutaran di luar lock: _get_sfx bisa menunggu preload atau disk,
+        # dan play_sfx di thread render tidak boleh ikut tertahan
+        self._play_queued(queued)
+
+    def _play_queued(self, queued):
+        now = time.monotonic()
+        counts = {"merged": 0, "dropped": 0, "stolen": 0, "played": 0}
+        unique = []
+        for name in queued:
+            if name in unique or now - self.last_played.get(name, -1e9) < self.coalesce_window:
+                counts["merged"] += 1
+            else:
+                unique.append(name)
+
+        voices = [v for v in self.active_voices if v[1].get_busy()]
+        played = []
+        unique.sort(key=lambda n: SFX_PRIORITY.get(n, 0), reverse=True)
+        for name in unique:
+            sound = self._get_sfx(name)
+            if sound is None:
+                continue
+            priority = SFX_PRIORITY.get(name, 0)
+            if len(voices) >= self.max_voices:
+                lowest = min(voices, key=lambda v: v[0])
+                if lowest[0] >= priority:
+                    counts["dropped"] += 1
+                    continue
+                lowest[1].stop()
+                voices.remove(lowest)
+                counts["stolen"] += 1
+            channel = sound.play()
+            if channel is None:
+                counts["dropped"] += 1
+                continue
+            voices.append((priority, channel))
+            played.append(name)
+            counts["played"] += 1
+
+        # Lock diambil lagi hanya untuk menulis hasilnya
+        with self.sfx_lock:
+            for key, value in counts.items():
+                self.sfx_stats[key] += value
+            for name in played:
+                self.last_played[name] = now
+            self.active_voices = voices
+
+    def get_output_latency(self):
+        """
+        Perkiraan teoretis latensi output mixer (detik) dari ukuran buffer yang
+        diminta di audio_config; driver audio bisa membulatkan buffer tersebut
+        """
+        if not self.enabled or not pygame.mixer.get_init():
+            return 0.0
+        frequency = pygame.mixer.get_init()[0]
+        return self.audio_config["buffer"] / frequency
+
+    def get_sfx_stats(self):
+        """ Penghitung sfx: requested, played, merged, dropped, stolen """
+        with self.sfx_lock:
+            return dict(self.sfx_stats)
 
     def set_sfx_volume(self, volume):
         self.sfx_volume = max(0.0, min(1.0, volume))
         for s in self.sfx.values():
-            s.set_volume(self.sfx_volume)
+            if s is not None:
+                s.set_volume(self.sfx_volume)
 
     def get_sfx_volume(self):
         return self.sfx_volume
@@ -0,0 +1,162 @@
+import pygame
+
+# Bayangan panel menu (kanan-bawah), ikut masuk ke surface panel
+PANEL_SHADOW = 5
+
+
+class UIPanel:
+    """
+    Panel UI retained-mode. Isi panel di-render sekali ke Surface sendiri lalu
+    cukup di-blit tiap frame; render ulang hanya jika nilai bind() (data yang
+    ditampilkan panel: koin, level, progres quest, posisi scroll, ...) berubah.
+
+    render(surface) menggambar panel di koordinat lokal (0, 0 = pojok panel).
+    bind() mengembalikan tuple yang bisa dibandingkan.
+    alpha=False untuk panel yang menutup penuh persegi-nya (blit tanpa blending).
+    """
+
+    def __init__(self, rect, render, bind, alpha=True):
+        self.rect = pygame.Rect(rect)
+        self.render = render
+        self.bind = bind
+        self.alpha = alpha
+        self.surface = None
+        self.key = None
+        self.render_count = 0
+
+    def invalidate(self):
+        self.key = None
+        self.surface = None
+
+    def draw(self, screen):
+        key = self.bind()
+        if self.surface is None or key != self.key:
+            if self.surface is None:
+                self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA if self.alpha else 0)
+            elif self.alpha:
+                self.surface.fill((0, 0, 0, 0))
+            self.render(self.surface)
+            # bind() dibaca ulang: render boleh merapikan datanya sendiri (misal clamp scroll)
+            self.key = self.bind()
+            self.render_count += 1
+        screen.blit(self.surface, self.rect.topleft)
+
+
+class VirtualList:
+    """
+    Daftar kartu yang bisa di-scroll dengan tinggi baris tetap. Rentang indeks
+    yang terlihat dihitung langsung dari posisi scroll, jadi menggambar dan
+    mengecek klik hanya menyentuh baris yang tampak di content_rect, berapa
+    pun jumlah item di daftar.
+
+    scroll_y <= 0 (0 = paling atas), disimpan oleh pemilik daftar.
+    """
+
+    def __init__(self, content_rect, row_height=90, card_height=80, card_inset=10):
+        self.rect = pygame.Rect(content_rect)
+        self.row_height = row_height
+        self.card_height = card_height
+        self.card_inset = card_inset
+
+    def clamp_scroll(self, scroll_y, count):
+        max_scroll = min(0, self.rect.height - count * self.row_height)
+        return max(max_scroll, min(0, scroll_y))
+
+    def visible_range(self, scroll_y, count):
+        """ (first, last): indeks baris yang beririsan dengan content_rect, last eksklusif """
+        first = max(0, -scroll_y // self.row_height)
+        last = min(count, (self.rect.height - scroll_y + self.row_height - 1) // self.row_height)
+        return first, max(first, last)
+
+    def card_rect(self, index, scroll_y):
+        return pygame.Rect(self.rect.left + self.card_inset,
+                           self.rect.top + scroll_y + index * self.row_height,
+                           self.rect.width - 2 * self.card_inset, self.card_height)
+
+    def draw(self, surface, items, scroll_y, draw_row):
+        """ draw_row(surface, item, card_rect) dipanggil hanya untuk baris yang terlihat """
+        surface.set_clip(self.rect)
+        first, last = self.visible_range(scroll_y, len(items))
+        for index in range(first, last):
+            draw_row(surface, items[index], self.card_rect(index, scroll_y))
+        surface.set_clip(None)
+
+    def hit_test(self, pos, scroll_y, count):
+        """ Indeks kartu di titik pos (koordinat lokal panel), atau None. O(1) """
+        x, y = pos
+        if not self.rect.collidepoint(x, y):
+            return None
+        if not self.rect.left + self.card_inset <= x < self.rect.right - self.card_inset:
+            return None
+        offset = y - self.rect.top - scroll_y
+        index = offset // self.row_height
+        if index < 0 or index >= count or offset - index * self.row_height >= self.card_height:
+            return None
+        return index
+
+
+class Widget:
+    """ Satu area UI yang bisa diklik: persegi layar, grup (panel pemiliknya), dan aksinya """
+    __slots__ = ("widget_id", "rect", "group", "on_click", "z")
+
+    def __init__(self, widget_id, rect, group, on_click, z=0):
+        self.widget_id = widget_id
+        self.rect = pygame.Rect(rect)
+        self.group = group
+        self.on_click = on_click
+        self.z = z
+
+
+class WidgetRegistry:
+    """
+    Daftar widget yang didaftarkan saat layout dibuat, dikelompokkan ke bucket
+    grid berukuran tetap. Mencari widget di satu titik cukup memeriksa satu
+    bucket, jadi klik dan hover tidak bergantung pada jumlah widget.
+
+    Widget hanya ikut dicari jika grupnya aktif (misal "hud" dan menu yang
+    sedang terbuka); bila bertumpuk, z terbesar yang menang.
+    """
+
+    def __init__(self, bucket_size=64):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.widgets = {}
+
+    def _bucket_range(self, rect):
+        size = self.bucket_size
+        for by in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for bx in range(rect.left // size, (rect.right - 1) // size + 1):
+                yield bx, by
+
+    def register(self, widget_id, rect, group, on_click, z=0):
+        if widget_id in self.widgets:
+            self.unregister(widget_id)
+        widget = Widget(widget_id, rect, group, on_click, z)
+        self.widgets[widget_id] = widget
+        for key in self._bucket_range(widget.rect):
+            self.buckets.setdefault(key, []).append(widget)
+        return widget
+
+    def unregister(self, widget_id):
+        widget = self.widgets.pop(widget_id, None)
+        if widget is None:
+            return
+        for key in self._bucket_range(widget.rect):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.remove(widget)
+                if not bucket:
+                    del self.buckets[key]
+
+    def hit(self, pos, active_groups):
+        """ Widget teratas dari grup aktif yang memuat pos, atau None """
+        x, y = pos
+        bucket = self.buckets.get((x // self.bucket_size, y // self.bucket_size))
+        if not bucket:
+            return None
+        best = None
+        for widget in bucket:
+            if widget.group in active_groups and widget.rect.collidepoint(x, y):
+                if best is None or widget.z > best.z:
+                    best = widget
+        return best
@@ -0,0 +1,132 @@
+import itertools
+
+from shop import SHOP_SIZE
+
+# Satu chunk = CHUNK_SLOTS x CHUNK_SLOTS slot toko
+CHUNK_SLOTS = 8
+CHUNK_SIZE = CHUNK_SLOTS * SHOP_SIZE
+
+# Isi sel pada grid okupansi chunk
+CELL_EMPTY = 0
+CELL_DECORATION = 255  # toko disimpan sebagai 1 + indeks tipe toko
+
+# Nomor unik tiap dunia (game baru/load), dibawa juga oleh salinan beku-nya
+_world_ids = itertools.count(1)
+
+
+class Chunk:
+    """ Potongan mall berukuran tetap dengan daftar entitas dan grid okupansinya sendiri """
+    __slots__ = ("cx", "cy", "shops", "decorations", "occupancy", "version")
+
+    def __init__(self, cx, cy):
+        self.cx = cx
+        self.cy = cy
+        self.shops = []
+        self.decorations = []
+        self.occupancy = bytearray(CHUNK_SLOTS * CHUNK_SLOTS)
+        # Naik setiap isi chunk berubah, untuk membatalkan cache gambar per chunk
+        self.version = 0
+
+    def cell_index(self, slot_x, slot_y):
+        return (slot_y - self.cy * CHUNK_SLOTS) * CHUNK_SLOTS + (slot_x - self.cx * CHUNK_SLOTS)
+
+    def freeze(self):
+        """ *** BARU: Salinan yang tidak berubah lagi: toko sebagai ShopView statis, okupansi bytes *** """
+        frozen = Chunk(self.cx, self.cy)
+        frozen.shops = tuple(shop.get_view(static=True) for shop in self.shops)
+        # Dekorasi tidak pernah berubah setelah ditaruh, objeknya bisa dipakai bersama
+        frozen.decorations = tuple(self.decorations)
+        frozen.occupancy = bytes(self.occupancy)
+        frozen.version = self.version
+        return frozen
+
+
+class ChunkedWorld:
+    """
+    Penyimpanan entitas mall per chunk. Chunk hanya dibuat saat ada isinya, jadi
+    mall besar yang masih kosong tidak memakan memori, dan pencarian okupansi
+    maupun entitas di sekitar kamera tidak bergantung pada jumlah total toko.
+    """
+
+    def __init__(self, shop_types=(), shops=(), decorations=()):
+        # Urutan tipe toko untuk kode sel okupansi (1 + indeks)
+        self.shop_types = list(shop_types)
+        self.chunks = {}
+        self.world_id = next(_world_ids)
+        for shop in shops:
+            self.add_shop(shop)
+        for decoration in decorations:
+            self.add_decoration(decoration)
+
+    @staticmethod
+    def chunk_of(x, y):
+        return (int(x // CHUNK_SIZE), int(y // CHUNK_SIZE))
+
+    def get_chunk(self, cx, cy, create=False):
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None and create:
+            chunk = self.chunks[(cx, cy)] = Chunk(cx, cy)
+        return chunk
+
+    def _set_cell(self, x, y, value):
+        cx, cy = self.chunk_of(x, y)
+        chunk = self.get_chunk(cx, cy, create=True)
+        chunk.occupancy[chunk.cell_index(int(x // SHOP_SIZE), int(y // SHOP_SIZE))] = value
+        return chunk
+
+    def add_shop(self, shop):
+        chunk = self._set_cell(shop.x, shop.y, 1 + self.shop_types.index(shop.type))
+        chunk.shops.append(shop)
+        chunk.version += 1
+
+    def add_decoration(self, decoration):
+        x = decoration.x + decoration.width // 2
+        y = decoration.y + decoration.height // 2
+        cx, cy = self.chunk_of(x, y)
+        chunk = self.get_chunk(cx, cy, create=True)
+        index = chunk.cell_index(int(x // SHOP_SIZE), int(y // SHOP_SIZE))
+        # Toko yang sudah ada di sel itu tetap tercatat di okupansi
+        if chunk.occupancy[index] == CELL_EMPTY:
+            chunk.occupancy[index] = CELL_DECORATION
+        chunk.decorations.append(decoration)
+        chunk.version += 1
+
+    def get_cell(self, x, y):
+        cx, cy = self.chunk_of(x, y)
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            return CELL_EMPTY
+        return chunk.occupancy[chunk.cell_index(int(x // SHOP_SIZE), int(y // SHOP_SIZE))]
+
+    def is_shop_at(self, x, y):
+        """ O(1): ada toko di slot yang memuat titik internal (x, y) """
+        cell = self.get_cell(x, y)
+        return cell != CELL_EMPTY and cell != CELL_DECORATION
+
+    def chunk_coords_in_rect(self, left, top, right, bottom):
+        """ Koordinat semua chunk (ada isinya atau tidak) yang beririsan dengan persegi internal """
+        cx0, cy0 = self.chunk_of(left, top)
+        cx1, cy1 = self.chunk_of(right, bottom)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                yield cx, cy
+
+    def chunks_in_rect(self, left, top, right, bottom):
+        for cx, cy in self.chunk_coords_in_rect(left, top, right, bottom):
+            chunk = self.chunks.get((cx, cy))
+            if chunk is not None:
+                yield chunk
+
+    def freeze(self, previous=None):
+        """
+        *** BARU: Salinan beku untuk thread render (WorldSnapshot). Chunk yang versinya
+        sama dengan salinan sebelumnya (previous) dipakai ulang, jadi biayanya sebanding
+        jumlah chunk yang berubah, bukan jumlah toko.
+        """
+        frozen = ChunkedWorld(self.shop_types)
+        frozen.world_id = self.world_id
+        reuse = previous.chunks if previous is not None and previous.world_id == self.world_id else {}
+        for key, chunk in list(self.chunks.items()):
+            old = reuse.get(key)
+            frozen.chunks[key] = old if old is not None and old.version == chunk.version else chunk.freeze()
+        return frozen